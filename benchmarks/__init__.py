@@ -0,0 +1 @@
+""" Benchmarks for propositionalcalc, run with 'python -m benchmarks' from the repository root. """
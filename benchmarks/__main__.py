@@ -0,0 +1,47 @@
+import argparse
+import sys
+from .run import run, compare, save, load
+
+def main(args = None):
+    """ Runs the benchmarks from the repository root.
+    'python -m benchmarks run --output results.json' times every case and saves the results.
+    'python -m benchmarks compare baseline.json results.json' flags the cases which got slower,
+    and exits with status 1 if there are any.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--output', help='the JSON file to save the results to')
+    run_parser.add_argument('--quick', action='store_true', help='only run the smaller sizes')
+    run_parser.add_argument('--repeat', type=int, default=3, help='timings per case, the fastest is kept')
+    run_parser.add_argument('--filter', help='only run the cases whose name contains this string')
+    run_parser.add_argument('--baseline', help='a JSON file of earlier results to compare with')
+    run_parser.add_argument('--threshold', type=float, default=1.25)
+    compare_parser = commands.add_parser('compare', help='compare two saved results')
+    compare_parser.add_argument('baseline', help='the JSON file of the baseline results')
+    compare_parser.add_argument('current', help='the JSON file of the new results')
+    compare_parser.add_argument('--threshold', type=float, default=1.25,
+                                help='the time ratio above which a case is flagged as a slowdown')
+    args = parser.parse_args(args)
+
+    if args.command == 'run':
+        results = run(args.quick, args.repeat, args.filter, log=sys.stdout)
+        if args.output:
+            save(results, args.output)
+        if not args.baseline:
+            return 0
+        baseline = load(args.baseline)
+    else:
+        baseline = load(args.baseline)
+        results = load(args.current)
+
+    rows = compare(baseline, results, args.threshold)
+    print('{:<40} {:>11} {:>11} {:>7}'.format('case', 'baseline', 'current', 'ratio'))
+    for name, base, new, ratio, slowdown in rows:
+        print('{:<40} {:10.6f}s {:10.6f}s {:6.2f}x{}'.format(name, base, new, ratio, '  SLOWER' if slowdown else ''))
+    slowdowns = sum(1 for row in rows if row[4])
+    print(slowdowns, 'of', len(rows), 'cases slower than', args.threshold, 'times the baseline')
+    return 1 if slowdowns else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
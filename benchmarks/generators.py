@@ -0,0 +1,80 @@
+import random
+
+connectives = ['&', '||', '->', '<->']
+
+def var_name(i):
+    """ Returns a variable name made of letters for a variable index, like 'va', 'vb', ..., 'vba'. """
+    letters = ''
+    while True:
+        letters = chr(ord('a') + i % 26) + letters
+        i //= 26
+        if i == 0:
+            return 'v' + letters
+
+def literal(rng, n_vars):
+    name = var_name(rng.randrange(n_vars))
+    return '~' + name if rng.random() < 0.5 else name
+
+def random_kcnf(n_vars, n_clauses, k = 3, seed = 0):
+    """ Returns a random k-CNF formula string with n_clauses clauses of k literals. """
+    rng = random.Random(seed)
+    clauses = ['(' + ' || '.join(literal(rng, n_vars) for _ in range(k)) + ')' for _ in range(n_clauses)]
+    return ' & '.join(clauses)
+
+def deep_formula(depth, n_vars = 8, seed = 0):
+    """ Returns a formula string of random connectives nested depth levels deep on the right. """
+    rng = random.Random(seed)
+    formula = literal(rng, n_vars)
+    for _ in range(depth):
+        formula = '(' + literal(rng, n_vars) + ' ' + rng.choice(connectives) + ' ' + formula + ')'
+    return formula
+
+def wide_formula(width, n_vars = 16, seed = 0):
+    """ Returns a flat formula string of width literals joined by random connectives, without parentheses. """
+    rng = random.Random(seed)
+    parts = [literal(rng, n_vars)]
+    for _ in range(width - 1):
+        parts.append(rng.choice(connectives))
+        parts.append(literal(rng, n_vars))
+    return ' '.join(parts)
+
+def pigeonhole(pigeons, holes):
+    """ Returns the premises and conclusion of an argument that the pigeons fit in the holes,
+    one pigeon per hole. The premises are unsatisfiable when there are more pigeons than holes,
+    so the argument concluding 'false' is valid exactly then.
+    """
+    def name(pigeon, hole):
+        return var_name(pigeon * holes + hole)
+
+    premises = ['(' + ' || '.join(name(p, h) for h in range(holes)) + ')' for p in range(pigeons)]
+    for h in range(holes):
+        for p in range(pigeons):
+            for q in range(p + 1, pigeons):
+                premises.append('~(' + name(p, h) + ' & ' + name(q, h) + ')')
+    return premises, 'false'
+
+def chain(length):
+    """ Returns a valid argument from a chain of implications: a -> b, b -> c, ... therefore a -> z. """
+    premises = [var_name(i) + ' -> ' + var_name(i + 1) for i in range(length)]
+    return premises, var_name(0) + ' -> ' + var_name(length)
+
+readme_premises = ['raining -> (wet & ~sunny)', '~raining -> ~wet', 'wet <-> ~tennis', 'tennis -> ~(movie || hiking)']
+readme_conclusion = 'movie -> ~sunny'
+
+def readme_scaled(copies):
+    """ Returns the valid argument from the README repeated for copies independent sets of variables,
+    concluding the conjunction of the copies' conclusions.
+    """
+    premises = []
+    conclusions = []
+    for copy in range(copies):
+        suffix = var_name(copy)
+
+        def rename(formula):
+            for word in ('raining', 'wet', 'sunny', 'tennis', 'movie', 'hiking'):
+                formula = formula.replace(word, word + suffix)
+            return formula
+
+        premises.extend(rename(premise) for premise in readme_premises)
+        conclusions.append('(' + rename(readme_conclusion) + ')')
+    return premises, ' & '.join(conclusions)
@@ -0,0 +1,138 @@
+import json
+import platform
+import time
+import propositionalcalc as pc
+from propositionalcalc import proposition
+from . import generators
+
+def time_call(case, repeat = 3):
+    """ Returns the fastest of repeat timings of a case, in seconds.
+    A case is a function which sets up its inputs and returns the function to time.
+    Propositions are interned and cache their simplified form, bound program, string and
+    variable names, so the caches are emptied before every setup; otherwise a proposition
+    parsed again, or kept alive by the case, would only time the first run of those steps.
+    """
+    best = None
+    for _ in range(repeat):
+        proposition.clear_caches()
+        function = case()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        # drops the propositions, so the next setup parses new ones instead of finding these
+        del function
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def parse_case(formula):
+    return lambda: lambda: pc.parse_proposition(formula)
+
+def truth_table_case(n_vars):
+    names = [generators.var_name(i) for i in range(n_vars)]
+    return lambda: lambda: pc.TruthTable(names)
+
+def add_proposition_case(formula):
+    def setup():
+        prop = pc.parse_proposition(formula)
+        names = prop.get_var_names()
+
+        def function():
+            table = pc.TruthTable(names)
+            table.add_proposition(prop)
+        return function
+    return setup
+
+def is_valid_case(argument, engine = 'sat'):
+    def setup():
+        premises = [pc.parse_proposition(premise) for premise in argument[0]]
+        conclusion = pc.parse_proposition(argument[1])
+        # a new Argument each time, so the incremental solver does not carry over between runs
+        return lambda: pc.Argument(premises, conclusion).is_valid(engine)
+    return setup
+
+def get_cases(quick = False):
+    """ Returns a list of (name, case) benchmark cases, each timed by time_call.
+    Names have the form 'operation/family/size', so results of different runs can be matched.
+    With quick, only the smaller sizes are included.
+    """
+    def sizes(*values):
+        return values[:2] if quick else values
+
+    cases = []
+    for n in sizes(100, 1000, 10000):
+        cases.append(('parse/kcnf/' + str(n), parse_case(generators.random_kcnf(n // 4 + 3, n))))
+        cases.append(('parse/wide/' + str(n), parse_case(generators.wide_formula(n))))
+    for n in sizes(50, 200, 800):
+        cases.append(('parse/deep/' + str(n), parse_case(generators.deep_formula(n))))
+    for n in sizes(10, 16, 20):
+        cases.append(('truthtable/variables/' + str(n), truth_table_case(n)))
+    for n in sizes(10, 14, 18):
+        cases.append(('add_proposition/kcnf/' + str(n), add_proposition_case(generators.random_kcnf(n, 4 * n, seed=n))))
+    for n in sizes(50, 200, 500):
+        cases.append(('add_proposition/deep/' + str(n), add_proposition_case(generators.deep_formula(n, 12))))
+    for n in sizes(50, 200, 800):
+        cases.append(('is_valid/chain/' + str(n), is_valid_case(generators.chain(n))))
+    for n in sizes(4, 5, 6):
+        cases.append(('is_valid/pigeonhole/' + str(n), is_valid_case(generators.pigeonhole(n + 1, n))))
+    for n in sizes(1, 10, 50):
+        cases.append(('is_valid/readme/' + str(n), is_valid_case(generators.readme_scaled(n))))
+    for n in sizes(1, 2, 3):
+        cases.append(('is_valid/readme_truthtable/' + str(n), is_valid_case(generators.readme_scaled(n), 'truthtable')))
+    return cases
+
+def run(quick = False, repeat = 3, pattern = None, log = None):
+    """ Runs the benchmark cases.
+    Params
+    ------
+    quick: only run the smaller sizes.
+    repeat: the number of timings of each case, of which the fastest is kept.
+    pattern: only run the cases whose name contains this string.
+    log: a text file object which receives a line for each case as it finishes.
+    Returns
+    -------
+    results: a dictionary which can be saved as JSON, with the seconds of each case under 'results'.
+    """
+    results = {}
+    for name, case in get_cases(quick):
+        if pattern is not None and pattern not in name:
+            continue
+        results[name] = time_call(case, repeat)
+        if log is not None:
+            log.write('{:<40} {:10.6f}s\n'.format(name, results[name]))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+def compare(baseline, current, threshold = 1.25, min_seconds = 0.001):
+    """ Compares two sets of benchmark results.
+    Params
+    ------
+    baseline, current: results returned by run, or loaded from their JSON files.
+    threshold: the ratio of current to baseline time above which a case is a slowdown.
+    min_seconds: cases faster than this in both runs are too noisy to flag.
+    Returns
+    -------
+    rows: a list of (name, baseline seconds, current seconds, ratio, slowdown) tuples
+          for the cases in both results.
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        if name not in current['results']:
+            continue
+        new = current['results'][name]
+        ratio = new / base if base > 0 else float('inf')
+        slowdown = ratio > threshold and max(base, new) >= min_seconds
+        rows.append((name, base, new, ratio, slowdown))
+    return rows
+
+def save(results, path):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
@@ -0,0 +1,50 @@
+import unittest
+import propositionalcalc as pc
+from propositionalcalc import proposition
+from .run import compare, time_call
+
+class TestRun(unittest.TestCase):
+
+    def test_compare(self):
+        baseline = {'results': {'a': 1.0, 'b': 0.5, 'c': 0.0001, 'd': 0.0, 'removed': 1.0}}
+        current = {'results': {'a': 1.2, 'b': 1.0, 'c': 0.0005, 'd': 0.01, 'added': 1.0}}
+        rows = {row[0]: row[1:] for row in compare(baseline, current)}
+        # only cases in both results are compared
+        self.assertEqual(set(rows), {'a', 'b', 'c', 'd'})
+        self.assertEqual(rows['a'], (1.0, 1.2, 1.2, False))
+        self.assertEqual(rows['b'], (0.5, 1.0, 2.0, True))
+        # 5 times slower, but too fast in both runs to flag
+        self.assertFalse(rows['c'][3])
+        self.assertEqual(rows['d'][2], float('inf'))
+        self.assertTrue(rows['d'][3])
+        self.assertTrue(compare(baseline, current, threshold=1.1)[0][4])
+        self.assertFalse(compare(baseline, current, threshold=2.5)[1][4])
+
+    def test_time_call(self):
+        setups = []
+
+        def case():
+            setups.append(None)
+            return lambda: None
+        self.assertGreaterEqual(time_call(case, repeat=4), 0)
+        # every timing gets a fresh setup
+        self.assertEqual(len(setups), 4)
+
+    def test_time_call_cold(self):
+        # a case which keeps its proposition alive between timings still finds no cached values
+        prop = pc.parse_proposition('(a & b) -> ~c')
+        hits = []
+
+        def case():
+            hits.append(prop in proposition.str_cache or prop in proposition.bound_cache)
+
+            def function():
+                str(prop)
+                prop.bind()
+            return function
+        time_call(case, repeat=3)
+        self.assertEqual(hits, [False, False, False])
+        self.assertIn(prop, proposition.str_cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,4 +3,9 @@ from .proposition import Proposition, Variable, Constant
 from .logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
 from .propositionparser import parse_proposition
 from .truthtable import TruthTable
-from .argument import Argument
\ No newline at end of file
+from .argument import Argument
+from .knowledgebase import KnowledgeBase
+from .sat import SATSolver
+from .cnf import CNF, TseitinEncoder, to_cnf
+from .bdd import BDD
+from .modelcount import ModelCounter, count_models
\ No newline at end of file
@@ -0,0 +1,44 @@
+import argparse
+import sys
+from .argument import Argument
+from .pipeline import validate_file
+
+def main(args = None):
+    """ Runs the command line interface.
+    'python -m propositionalcalc validate --input args.jsonl --workers 4' validates every argument
+    in a JSONL or CSV file and writes one JSON result per line, in input order.
+    """
+    parser = argparse.ArgumentParser(prog='python -m propositionalcalc')
+    commands = parser.add_subparsers(dest='command', required=True)
+    validate = commands.add_parser('validate', help='validate the arguments in a JSONL or CSV file')
+    validate.add_argument('--input', required=True, help='the input file, or - for standard input')
+    validate.add_argument('--output', default='-', help='the output file, standard output by default')
+    validate.add_argument('--format', choices=['jsonl', 'csv'],
+                          help='the input format, inferred from the input file extension by default')
+    validate.add_argument('--workers', type=int, default=None, help='the number of worker processes')
+    validate.add_argument('--engine', choices=Argument.engines, default='sat')
+    validate.add_argument('--batch-size', type=int, default=100,
+                          help='the number of arguments sent to a worker at a time')
+    validate.add_argument('--summary', action='store_true',
+                          help='print the number of valid, invalid and unparsable arguments at the end')
+    args = parser.parse_args(args)
+
+    format = args.format
+    if format is None:
+        format = 'csv' if args.input.lower().endswith('.csv') else 'jsonl'
+    input_file = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        counts = validate_file(input_file, output_file, format, args.workers, args.engine, args.batch_size)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    if args.summary:
+        # standard error, so the summary does not mix with results written to standard output
+        print(counts['valid'], 'valid,', counts['invalid'], 'invalid,', counts['error'], 'errors', file=sys.stderr)
+    return 1 if counts['error'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
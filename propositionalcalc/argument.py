@@ -1,9 +1,30 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
 from .truthtable import TruthTable
+from .sat import SATSolver
+from .cnf import TseitinEncoder
+from .bdd import BDD
+from .modelcount import count_models
+from .unionfind import DisjointSets
+from .simulation import sample_counterexample
+from .logicalconnective import Negation
+from .proposition import Constant
+from . import instrumentation
 
 class Argument():
     """ A class representing an argument with multiple propositions as premises and one conclusion.
     """
 
+    # names of the engines which can decide validity
+    engines = ('sat', 'bdd', 'truthtable')
+
+    # number of random assignments checked before running an engine, 0 to always run the engine
+    simulation_samples = 256
+
+    # the solver of the 'sat' engine is rebuilt once removed premises and old conclusions
+    # take more solver variables than the current ones, and at least this many
+    max_retired = 1 << 12
+
     def __init__(self, premises, conclusion):
         """ Initializes an argument given premises and a conclusion
         Params
@@ -12,38 +33,318 @@ class Argument():
                   Premises are the propostions which are given to be true.
         conclusion: The proposition which is to be concluded from the premises.
         """
-        self.premises = premises
+        self.premises = list(premises)
+        self.conclusion = conclusion
+        # the truth table is only built when it is requested
+        self.truth_table = None
+        self.counterexample = None
+        # the 'sat' engine keeps one solver for the lifetime of the argument, see _find_counterexample_sat
+        self.solver = None
+        self.encoder = None
+        # the guard literal, literal and number of solver variables of each encoded proposition
+        self.encoded = {}
+        self._update_variables()
+
+    def add_premise(self, premise):
+        """ Adds a premise to the argument. """
+        self.premises.append(premise)
+        self._update_variables()
+
+    def remove_premise(self, premise):
+        """ Removes a premise from the argument.
+        Raises ValueError if the proposition is not a premise.
+        """
+        if premise not in self.premises:
+            raise ValueError("The proposition is not a premise of the argument.")
+        self.premises.remove(premise)
+        self._update_variables()
+
+    def set_conclusion(self, conclusion):
+        """ Replaces the conclusion of the argument. """
         self.conclusion = conclusion
+        self._update_variables()
+
+    def _update_variables(self):
+        # called whenever the premises or conclusion change
         variables = set()
-        for prop in premises:
+        for prop in self.premises:
             variables = variables.union(prop.get_var_names())
-        variables = variables.union(conclusion.get_var_names())
-        self.truth_table = TruthTable(variables)
-        for prop in premises:
-            self.truth_table.add_proposition(prop)
-        self.truth_table.add_proposition(conclusion)
+        variables = variables.union(self.conclusion.get_var_names())
+        self.variables = variables
+        self.truth_table = None
+        self.counterexample = None
 
-    def is_valid(self):
+    def is_valid(self, engine = 'sat', workers = None):
         """ Determines if the argument is valid.
         An argument is valid if the conclusion is true in every case where all premises are true.
+        Params
+        ------
+        engine: 'sat' to search for a counterexample with a SAT solver, which scales to many variables,
+                'bdd' to build a binary decision diagram of the premises and conclusion,
+                which scales to many variables when the diagram is compact,
+                or 'truthtable' to check the rows of the argument's truth table in chunks,
+                stopping at the first counterexample.
+        workers: the number of processes the 'truthtable' engine splits the rows between.
+                 Defaults to checking every row in this process.
         """
-        premise_cols = []
-        for premise in self.premises:
-            premise_cols.append(self.truth_table.get_proposition_col(premise))
-        conclusion_col = self.truth_table.get_proposition_col(self.conclusion)
-        argument_valid = True
-        for i in range(len(conclusion_col)):
-            premises_true = True
-            for premise_col in premise_cols:
-                if not premise_col[i]:
-                    premises_true = False
-            # if there is a case where all premises are true and the conclusion is false
-            # then the argument is invalid
-            if premises_true and not conclusion_col[i]:
-                argument_valid = False
-        return argument_valid
+        stats = instrumentation.active
+        if stats is None:
+            return self._check(engine, workers)
+        description = engine + ': ' + ', '.join(str(premise) for premise in self.premises) \
+            + ' ∴ ' + str(self.conclusion)
+        with instrumentation.measure_argument(stats, description[:500]):
+            return self._check(engine, workers)
+
+    def _check(self, engine, workers):
+        if engine not in self.engines:
+            raise ValueError("Unknown engine ", engine)
+        # every engine works on the simplified propositions, which may have fewer variables
+        premises = [premise.simplify() for premise in self.premises]
+        premises = [premise for premise in premises if premise is not Constant(True)]
+        conclusion = self.conclusion.simplify()
+
+        # most invalid arguments have many counterexamples, so a few random assignments
+        # simulated bit-parallel usually find one without running the engine
+        if self.simulation_samples > 0:
+            model = sample_counterexample(premises, conclusion, self.simulation_samples)
+            if model is not None:
+                self.counterexample = {name: model.get(name, False) for name in sorted(self.variables)}
+                return False
+
+        # premises which share no variables with the conclusion, even through other premises,
+        # cannot make it true. They only matter if they are unsatisfiable, which makes the
+        # argument valid. So the argument is valid exactly when the premises connected to the
+        # conclusion imply it, or some other group of premises is unsatisfiable.
+        related, unrelated = split_premises(premises, conclusion)
+        if engine != 'truthtable':
+            # solvers handle independent groups together as well as separately, in one call
+            unrelated = [[premise for group in unrelated for premise in group]] if unrelated else []
+        # one pool checks the rows of every group
+        pool = WorkerPool(workers) if engine == 'truthtable' and workers is not None and workers > 1 else None
+        try:
+            model = {}
+            # the smallest groups are the quickest to check
+            for group in sorted(unrelated, key=len):
+                group_model = self._find_counterexample(engine, group, Constant(False), pool)
+                if group_model is None:
+                    self.counterexample = None
+                    return True
+                model.update(group_model)
+            related_model = self._find_counterexample(engine, related, conclusion, pool)
+            if related_model is None:
+                self.counterexample = None
+                return True
+            model.update(related_model)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        # variables which simplified away can take any value
+        self.counterexample = {name: model.get(name, False) for name in sorted(self.variables)}
+        return False
+
+    def _find_counterexample(self, engine, premises, conclusion, pool):
+        # returns an assignment of the variables of the propositions where all premises
+        # are true and the conclusion is false, or None if there is none.
+        # pool is the WorkerPool of the 'truthtable' engine, or None to check the rows here
+        if engine == 'sat':
+            model = self._find_counterexample_sat(premises, conclusion)
+        elif engine == 'bdd':
+            model = self._find_counterexample_bdd(premises, conclusion)
+        else:
+            model = self._find_counterexample_truthtable(premises, conclusion, pool)
+        if model is None:
+            return None
+        # the engines may also assign variables of other propositions, which are left out
+        variables = set(conclusion.get_var_names())
+        for premise in premises:
+            variables |= premise.get_var_names()
+        return {name: model[name] for name in variables}
+
+    def get_counterexample(self, engine = 'sat', workers = None):
+        """ Returns an assignment of every variable in the argument where all premises are true
+        and the conclusion is false, or None if the argument is valid.
+        """
+        self.is_valid(engine, workers)
+        return self.counterexample
+
+    def count_counterexamples(self):
+        """ Returns the number of assignments of the argument's variables where all premises are true
+        and the conclusion is false, counted without enumerating the truth table.
+        """
+        premises = [premise.simplify() for premise in self.premises]
+        return count_models(premises + [Negation(self.conclusion).simplify()], self.variables)
+
+    def _find_counterexample_sat(self, premises, conclusion):
+        # the argument is valid exactly when premises ∧ ¬conclusion is unsatisfiable
+        # one solver is kept between checks. Every proposition is encoded once, with clauses
+        # guarded by its own activation literal like the conclusions of a KnowledgeBase, and
+        # the current premises and negated conclusion are passed as assumptions with their
+        # guards. So editing the argument never removes clauses, the learnt clauses stay valid,
+        # and a premise which is added again reuses its encoding. Once removed premises and
+        # old conclusions take more of the solver than the current ones, it is rebuilt.
+        if self.solver is None or self._retired(premises + [conclusion]):
+            self._build_solver()
+        assumptions = []
+        for premise in premises:
+            guard, lit, n_vars = self._encode(premise)
+            assumptions += [guard, lit]
+        guard, lit, n_vars = self._encode(conclusion)
+        assumptions += [guard, -lit]
+        if not self.solver.solve(assumptions):
+            return None
+        model = self.solver.get_model()
+        return {name: model[var] for name, var in self.encoder.var_ids.items()}
+
+    def _build_solver(self):
+        # starts a new solver, in which propositions are encoded as they are checked
+        self.solver = SATSolver()
+        self.encoder = TseitinEncoder(self.solver)
+        self.encoded = {}
+
+    def _encode(self, prop):
+        # the guard literal, literal and number of solver variables of a proposition
+        encoded = self.encoded.get(prop)
+        if encoded is None:
+            solver = self.solver
+            n_vars = solver.n_vars
+            guard = solver.new_var()
+            lit = self.encoder.encode_guarded(prop, guard)
+            encoded = self.encoded[prop] = (guard, lit, solver.n_vars - n_vars)
+        return encoded
+
+    def _retired(self, props):
+        # whether the encoded propositions other than props have grown the solver enough to rebuild it
+        size = sum(self.encoded[prop][2] for prop in set(props) if prop in self.encoded)
+        retired = self.solver.n_vars - size
+        return retired > max(size, self.max_retired)
+
+    def _find_counterexample_bdd(self, premises, conclusion):
+        bdd = BDD()
+        premise_nodes = [bdd.from_proposition(premise) for premise in premises]
+        # conjoining from the bottom of the variable order up only walks the top of the conjunction
+        # built so far, so a chain of premises over many variables is conjoined in linear time
+        premises_node = BDD.TRUE
+        for node in sorted(premise_nodes, key=lambda node: bdd.levels[node], reverse=True):
+            premises_node = bdd.conjoin(node, premises_node)
+        conclusion_node = bdd.from_proposition(conclusion)
+        return bdd.get_model(bdd.conjoin(premises_node, bdd.negate(conclusion_node)))
+
+    def _find_counterexample_truthtable(self, premises, conclusion, pool = None):
+        variables = set(conclusion.get_var_names())
+        for premise in premises:
+            variables |= premise.get_var_names()
+        variables = sorted(variables)
+        if pool is None:
+            row = find_counterexample_row(variables, premises, conclusion)
+            return None if row is None else TruthTable(variables, streaming=True).get_row(row)
+
+        # each worker checks the rows for one assignment of the first few variables
+        # as soon as any worker finds a counterexample, the others are told to stop
+        truth_table = TruthTable(variables, streaming=True)
+        futures = [pool.executor.submit(find_counterexample_row, variables, premises, conclusion, start, stop)
+                   for start, stop in truth_table.slices(pool.workers)]
+        try:
+            for future in as_completed(futures):
+                row = future.result()
+                if row is not None:
+                    return truth_table.get_row(row)
+            return None
+        finally:
+            pool.stop_all(futures)
 
     def get_truth_table(self):
         """ Returns a truth table object which includes the premises and conclusion of the argument.
         """
-        return self.truth_table
\ No newline at end of file
+        if self.truth_table is None:
+            self.truth_table = TruthTable(self.variables)
+            self.truth_table.add_propositions(list(self.premises) + [self.conclusion])
+        return self.truth_table
+
+class WorkerPool:
+    """ A process pool which checks truth table rows for one call to Argument.is_valid.
+    The workers share an event, which tells the ones still checking rows to stop early.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        context = multiprocessing.get_context()
+        self.stop = context.Event()
+        self.executor = ProcessPoolExecutor(workers, mp_context=context,
+                                            initializer=set_stop_event, initargs=(self.stop,))
+
+    def stop_all(self, futures):
+        """ Stops the workers running any of the futures and waits for them,
+        so the pool is ready for the next check.
+        """
+        self.stop.set()
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        self.stop.clear()
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+# the event of the WorkerPool which started this worker process, see set_stop_event
+stop_event = None
+
+def set_stop_event(event):
+    """ Stores the stop event in a worker process of a WorkerPool. """
+    global stop_event
+    stop_event = event
+
+def split_premises(premises, conclusion):
+    """ Groups premises by the variables they share, directly or through other premises.
+    Returns
+    -------
+    related: the premises connected to the conclusion's variables.
+    unrelated: a list of groups of the other premises, which share no variables with
+               each other or with the related premises. A premise without variables is
+               a group on its own.
+    """
+    sets = DisjointSets()
+    conclusion_vars = conclusion.get_var_names()
+    premise_vars = [premise.get_var_names() for premise in premises]
+    conclusion_root = sets.union(conclusion_vars)
+    for names in premise_vars:
+        sets.union(names)
+    if conclusion_root is not None:
+        conclusion_root = sets.find(conclusion_root)
+
+    related = []
+    groups = {}
+    for premise, names in zip(premises, premise_vars):
+        if not names:
+            groups[id(premise)] = [premise]
+            continue
+        root = sets.find(next(iter(names)))
+        if root == conclusion_root:
+            related.append(premise)
+        else:
+            groups.setdefault(root, []).append(premise)
+    return related, list(groups.values())
+
+def find_counterexample_row(var_names, premises, conclusion, start = 0, stop = None):
+    """ Streams the truth table rows from start to stop and returns the index of the first
+    row where all premises are true and the conclusion is false, or None if there is none.
+    This runs in a worker process when an argument is checked in parallel.
+    """
+    truth_table = TruthTable(var_names, streaming=True)
+    truth_table.add_propositions(list(premises) + [conclusion])
+    if stop is None:
+        stop = truth_table.n_rows
+    chunk_bits = min(TruthTable.default_chunk_bits, (stop - start).bit_length() - 1)
+    for chunk_start, size, columns in truth_table.iter_chunks(chunk_bits, start, stop):
+        if stop_event is not None and stop_event.is_set():
+            # another worker found a counterexample
+            return None
+        premises_col = (1 << size) - 1
+        for premise in premises:
+            premises_col &= columns[premise]
+        # if there is a case where all premises are true and the conclusion is false
+        # then the argument is invalid
+        counterexamples = premises_col & ~columns[conclusion]
+        if counterexamples:
+            # the lowest set bit is the first counterexample row in the chunk
+            return chunk_start + (counterexamples & -counterexamples).bit_length() - 1
+    return None
@@ -0,0 +1,270 @@
+from collections import OrderedDict
+from .proposition import Variable, Constant
+from .logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+
+class BDD:
+    """ A manager for reduced ordered binary decision diagrams (ROBDDs).
+
+    Nodes are ints. 0 and 1 are the false and true terminals, every other node tests
+    one variable and has a low child for false and a high child for true.
+    Nodes are hash-consed through a unique table, so two nodes are equal exactly when
+    they represent the same boolean function. Operations go through if-then-else (ITE),
+    whose results are kept in a computed cache of bounded size with least recently
+    used eviction.
+    """
+
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, var_order = None, cache_size = 1 << 16):
+        """ Creates a BDD manager.
+        Params
+        ------
+        var_order: the variable names from the top of the diagram to the bottom.
+                   Variables which are not listed are added below them when first used.
+        cache_size: the maximum number of entries in the ITE computed cache.
+        """
+        self.var_order = []
+        self.var_levels = {}
+        # variable level, low child and high child of each node
+        # the terminals have a level below every variable
+        self.levels = [float('inf'), float('inf')]
+        self.lows = [0, 1]
+        self.highs = [0, 1]
+        self.unique_table = {}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        for name in var_order or []:
+            self.add_var(name)
+
+    def add_var(self, name):
+        """ Adds a variable at the bottom of the order and returns its level. """
+        name = name.lower()
+        if name not in self.var_levels:
+            self.var_levels[name] = len(self.var_order)
+            self.var_order.append(name)
+        return self.var_levels[name]
+
+    def var(self, name):
+        """ Returns the node for a variable. """
+        return self._make(self.add_var(name), self.FALSE, self.TRUE)
+
+    def _make(self, level, low, high):
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique_table.get(key)
+        if node is None:
+            node = len(self.levels)
+            self.levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.unique_table[key] = node
+        return node
+
+    def ite(self, f, g, h):
+        """ Returns the node for 'if f then g else h'.
+        The cofactors are computed with an explicit stack instead of recursion,
+        so diagrams with more levels than the recursion limit can be combined.
+        """
+        cache = self.cache
+        levels = self.levels
+        results = []
+        # a call to compute (f, g, h) has no level, and is followed by the entry with the
+        # level of its top variable, which combines the results of its two cofactors
+        stack = [(f, g, h, None)]
+        while stack:
+            f, g, h, level = stack.pop()
+            key = (f, g, h)
+            if level is not None:
+                high = results.pop()
+                low = results.pop()
+                result = self._make(level, low, high)
+                cache[key] = result
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+                results.append(result)
+                continue
+            if f == self.TRUE:
+                results.append(g)
+                continue
+            if f == self.FALSE or g == h:
+                results.append(h)
+                continue
+            if g == self.TRUE and h == self.FALSE:
+                results.append(f)
+                continue
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                results.append(result)
+                continue
+            level = min(levels[f], levels[g], levels[h])
+            f_low, f_high = self._cofactors(f, level)
+            g_low, g_high = self._cofactors(g, level)
+            h_low, h_high = self._cofactors(h, level)
+            stack.append((f, g, h, level))
+            # the low cofactor is computed first, so its result is below the high one
+            stack.append((f_high, g_high, h_high, None))
+            stack.append((f_low, g_low, h_low, None))
+        return results[0]
+
+    def _cofactors(self, node, level):
+        if self.levels[node] == level:
+            return self.lows[node], self.highs[node]
+        return node, node
+
+    def negate(self, f):
+        return self.ite(f, self.FALSE, self.TRUE)
+
+    def conjoin(self, f, g):
+        return self.ite(f, g, self.FALSE)
+
+    def disjoin(self, f, g):
+        return self.ite(f, self.TRUE, g)
+
+    def implies(self, f, g):
+        return self.ite(f, g, self.TRUE)
+
+    def iff(self, f, g):
+        return self.ite(f, g, self.negate(g))
+
+    def from_proposition(self, prop):
+        """ Returns the node representing a proposition.
+        Subformulas are built bottom up without recursion, so deep propositions can be built.
+        """
+        built = {}
+        stack = [(prop, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in built:
+                continue
+            children = node.get_children()
+            if not expanded and children:
+                stack.append((node, True))
+                # reversed so the left operand is built first
+                stack.extend((child, False) for child in reversed(children))
+                continue
+            built[node] = self._build(node, built)
+        return built[prop]
+
+    def _build(self, prop, built):
+        # the node of a proposition whose children are already built
+        if isinstance(prop, Variable):
+            return self.var(prop.name)
+        if isinstance(prop, Constant):
+            return self.TRUE if prop.value else self.FALSE
+        if isinstance(prop, Negation):
+            return self.negate(built[prop.proposition])
+        f = built[prop.left_proposition]
+        g = built[prop.right_proposition]
+        if isinstance(prop, Conjunction):
+            return self.conjoin(f, g)
+        if isinstance(prop, Disjunction):
+            return self.disjoin(f, g)
+        if isinstance(prop, Conditional):
+            return self.implies(f, g)
+        if isinstance(prop, Biconditional):
+            return self.iff(f, g)
+        raise ValueError("Unsupported proposition type ", type(prop).__name__)
+
+    def is_tautology(self, f):
+        return f == self.TRUE
+
+    def is_satisfiable(self, f):
+        return f != self.FALSE
+
+    def is_equivalent(self, f, g):
+        # nodes are canonical, so equal functions are the same node
+        return f == g
+
+    def count_models(self, f, n_vars = None):
+        """ Counts the assignments which satisfy f, in time proportional to the size of f.
+        Params
+        ------
+        n_vars: the number of variables to count over, which are the variables at the first
+                n_vars levels of the order. Every variable f depends on must be one of them.
+                Defaults to every variable known to the manager.
+        """
+        if n_vars is None:
+            n_vars = len(self.var_order)
+        levels, lows, highs = self.levels, self.lows, self.highs
+        counts = {self.FALSE: 0, self.TRUE: 1}
+
+        def level(node):
+            # the terminals are below every counted variable
+            return n_vars if node <= self.TRUE else levels[node]
+
+        # nodes are counted bottom up without recursion, after both of their children
+        stack = [f]
+        while stack:
+            node = stack[-1]
+            if node in counts:
+                stack.pop()
+                continue
+            if levels[node] >= n_vars:
+                raise ValueError("f depends on a variable which is not counted ", self.var_order[levels[node]])
+            low, high = lows[node], highs[node]
+            if low in counts and high in counts:
+                stack.pop()
+                counts[node] = (counts[low] << (level(low) - level(node) - 1)) \
+                    + (counts[high] << (level(high) - level(node) - 1))
+            else:
+                stack.append(low)
+                stack.append(high)
+        return counts[f] << level(f)
+
+    def get_model(self, f):
+        """ Returns a satisfying assignment of f as a dictionary, or None if f is unsatisfiable.
+        Variables which f does not depend on are set to False.
+        """
+        if f == self.FALSE:
+            return None
+        model = {name: False for name in self.var_order}
+        while f != self.TRUE:
+            name = self.var_order[self.levels[f]]
+            if self.highs[f] != self.FALSE:
+                model[name] = True
+                f = self.highs[f]
+            else:
+                f = self.lows[f]
+        return model
+
+    def to_bitset(self, f, columns, mask):
+        """ Computes the truth table column of f from bitset variable columns.
+        This takes one bitwise operation per node of the diagram.
+        """
+        cols = {self.FALSE: mask ^ mask, self.TRUE: mask}
+        # nodes are computed bottom up without recursion, after both of their children
+        stack = [f]
+        while stack:
+            node = stack[-1]
+            if node in cols:
+                stack.pop()
+                continue
+            low, high = self.lows[node], self.highs[node]
+            if low in cols and high in cols:
+                stack.pop()
+                var_col = columns[self.var_order[self.levels[node]]]
+                cols[node] = (var_col & cols[high]) | ((mask ^ var_col) & cols[low])
+            else:
+                stack.append(low)
+                stack.append(high)
+        return cols[f]
+
+    def size(self, f):
+        """ Returns the number of nodes, including terminals, reachable from f. """
+        seen = set()
+        stack = [f]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                if node > self.TRUE:
+                    stack.append(self.lows[node])
+                    stack.append(self.highs[node])
+        return len(seen)
+
+    def clear_cache(self):
+        """ Empties the ITE computed cache. """
+        self.cache.clear()
@@ -0,0 +1,283 @@
+import os
+import subprocess
+import tempfile
+from .proposition import Variable, Constant
+from .logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+from .sat import SATSolver
+
+class CNF:
+    """ A formula in conjunctive normal form.
+
+    Clauses are lists of non-zero ints in the DIMACS convention: variable v is the
+    literal v and its negation is the literal -v. Variables which stand for a
+    proposition variable keep its name, auxiliary variables have no name.
+    """
+
+    def __init__(self):
+        """ Creates an empty formula with no variables and no clauses. """
+        self.n_vars = 0
+        self.clauses = []
+        # name of each named variable, keyed by variable
+        self.names = {}
+
+    def new_var(self, name = None):
+        """ Adds a variable to the formula and returns its positive literal. """
+        self.n_vars += 1
+        if name is not None:
+            self.names[self.n_vars] = name
+        return self.n_vars
+
+    def add_clause(self, clause):
+        """ Adds a clause, given as an iterable of DIMACS literals, to the formula. """
+        clause = list(clause)
+        for lit in clause:
+            if lit == 0 or abs(lit) > self.n_vars:
+                raise ValueError("Clause contains an unknown literal ", lit)
+        self.clauses.append(clause)
+        return True
+
+    def get_var_ids(self):
+        """ Returns a dictionary with the variable of each proposition variable name. """
+        return {name: var for var, name in self.names.items()}
+
+    def to_solver(self, solver = None):
+        """ Adds the formula to a SAT solver, creating a new one if none is given.
+        The variables of the formula keep their numbers in the solver if it starts empty.
+        """
+        if solver is None:
+            solver = SATSolver()
+        while solver.n_vars < self.n_vars:
+            solver.new_var()
+        for clause in self.clauses:
+            solver.add_clause(clause)
+        return solver
+
+    def to_dimacs(self, file):
+        """ Writes the formula to a text file object in the DIMACS CNF format.
+        The names of the proposition variables are written as 'c var <variable> <name>' comments.
+        """
+        for var in sorted(self.names):
+            file.write('c var ' + str(var) + ' ' + self.names[var] + '\n')
+        file.write('p cnf ' + str(self.n_vars) + ' ' + str(len(self.clauses)) + '\n')
+        for clause in self.clauses:
+            file.write(' '.join(map(str, clause)) + ' 0\n')
+
+    @classmethod
+    def from_dimacs(cls, file):
+        """ Reads a formula from a text file object in the DIMACS CNF format. """
+        cnf = cls()
+        for item in read_dimacs(file):
+            if item[0] == 'var':
+                cnf.names[item[1]] = item[2]
+            elif item[0] == 'header':
+                cnf.n_vars = item[1]
+            else:
+                cnf.add_clause(item[1])
+        return cnf
+
+def read_dimacs(file):
+    """ Reads a DIMACS CNF file object line by line without holding it in memory.
+    Yields
+    ------
+    ('var', variable, name) for each variable name comment,
+    ('header', n_vars, n_clauses) for the problem line and
+    ('clause', literals) for each clause. Clauses may span several lines and end with 0.
+    """
+    clause = []
+    for line in file:
+        tokens = line.split()
+        if not tokens or tokens[0] == '%':
+            continue
+        if tokens[0] == 'c':
+            if len(tokens) == 4 and tokens[1] == 'var':
+                yield ('var', int(tokens[2]), tokens[3])
+            continue
+        if tokens[0] == 'p':
+            if len(tokens) != 4 or tokens[1] != 'cnf':
+                raise ValueError("Invalid DIMACS problem line:", line.strip())
+            yield ('header', int(tokens[2]), int(tokens[3]))
+            continue
+        for token in tokens:
+            lit = int(token)
+            if lit == 0:
+                yield ('clause', clause)
+                clause = []
+            else:
+                clause.append(lit)
+    if clause:
+        yield ('clause', clause)
+
+class TseitinEncoder:
+    """ Converts propositions to equisatisfiable CNF with the Tseitin encoding.
+
+    Each connective gets an auxiliary variable which is constrained to be equivalent
+    to its subformula, so the CNF grows linearly with the proposition. Subformulas
+    with the same connective and the same operand literals share one auxiliary variable.
+    The clauses are added to a target, which is a CNF or a SATSolver.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        # variable for each proposition variable name
+        self.var_ids = {}
+        # auxiliary variable for each (connective, left literal, right literal)
+        self.aux_ids = {}
+        # literal of each encoded proposition, so re-encoding a proposition is a lookup
+        self.literals = {}
+        self.true_lit = None
+        # literal whose negation is added to every clause while encoding a guarded proposition
+        self.guard = None
+
+    def encode(self, prop):
+        """ Returns a DIMACS literal which is true exactly when the proposition is true.
+        Subformulas are encoded bottom up without recursion, so deep propositions can be encoded.
+        """
+        literals = self.literals
+        lit = literals.get(prop)
+        if lit is not None:
+            return lit
+        stack = [(prop, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in literals:
+                continue
+            children = node.get_children()
+            if not expanded and children:
+                stack.append((node, True))
+                # reversed so the left operand is encoded first
+                stack.extend((child, False) for child in reversed(children) if child not in literals)
+                continue
+            literals[node] = self._encode(node)
+        return literals[prop]
+
+    def encode_guarded(self, prop, guard):
+        """ Returns a literal for a proposition like encode, but every clause added for it
+        only holds while the guard literal is true. Adding the unit clause -guard to the
+        target retires the clauses. The subformulas encoded here are not remembered, so a
+        later proposition does not reuse their retired literals, while those which were
+        already encoded are reused.
+        """
+        literals, aux_ids = self.literals, self.aux_ids
+        n_literals, n_aux = len(literals), len(aux_ids)
+        true_lit = self.true_lit
+        self.guard = guard
+        try:
+            return self.encode(prop)
+        finally:
+            self.guard = None
+            # dictionaries pop their last inserted items first
+            while len(literals) > n_literals:
+                literals.popitem()
+            while len(aux_ids) > n_aux:
+                aux_ids.popitem()
+            self.true_lit = true_lit
+
+    def _add_clause(self, clause):
+        if self.guard is not None:
+            clause = clause + [-self.guard]
+        self.target.add_clause(clause)
+
+    def _encode(self, prop):
+        # the literal of a proposition whose children are already encoded
+        if isinstance(prop, Variable):
+            return self.encode_variable(prop.name)
+        if isinstance(prop, Constant):
+            if self.true_lit is None:
+                self.true_lit = self.target.new_var()
+                self._add_clause([self.true_lit])
+            return self.true_lit if prop.value else -self.true_lit
+        if isinstance(prop, Negation):
+            return -self.literals[prop.proposition]
+        a = self.literals[prop.left_proposition]
+        b = self.literals[prop.right_proposition]
+        return self.encode_connective(type(prop), a, b)
+
+    def encode_variable(self, name):
+        """ Returns the variable for a proposition variable name, adding it if needed. """
+        if name not in self.var_ids:
+            if isinstance(self.target, CNF):
+                self.var_ids[name] = self.target.new_var(name)
+            else:
+                self.var_ids[name] = self.target.new_var()
+        return self.var_ids[name]
+
+    def encode_connective(self, connective, a, b):
+        """ Returns the auxiliary variable for a connective applied to literals a and b. """
+        if connective is not Conditional and b < a:
+            # the other connectives are commutative, so both operand orders share a variable
+            a, b = b, a
+        key = (connective, a, b)
+        if key in self.aux_ids:
+            return self.aux_ids[key]
+        x = self.target.new_var()
+        if connective is Conjunction:
+            clauses = [[-x, a], [-x, b], [x, -a, -b]]
+        elif connective is Disjunction:
+            clauses = [[-x, a, b], [x, -a], [x, -b]]
+        elif connective is Conditional:
+            clauses = [[-x, -a, b], [x, a], [x, -b]]
+        elif connective is Biconditional:
+            clauses = [[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]]
+        else:
+            raise ValueError("Unsupported proposition type ", connective.__name__)
+        for clause in clauses:
+            self._add_clause(clause)
+        self.aux_ids[key] = x
+        return x
+
+    def add_proposition(self, prop):
+        """ Adds clauses to the target which require the proposition to be true. """
+        self.target.add_clause([self.encode(prop)])
+
+def to_cnf(propositions):
+    """ Converts a proposition, or a list of propositions which must all be true, to CNF.
+    Returns
+    -------
+    cnf: a CNF object which is satisfiable exactly when the propositions are.
+    """
+    if not isinstance(propositions, (list, tuple)):
+        propositions = [propositions]
+    cnf = CNF()
+    encoder = TseitinEncoder(cnf)
+    for prop in propositions:
+        encoder.add_proposition(prop)
+    return cnf
+
+def solve_external(cnf, command, timeout = None):
+    """ Solves a CNF with an external DIMACS solver binary run as a local subprocess.
+    The solver must print the usual 's SATISFIABLE' or 's UNSATISFIABLE' line and 'v' lines.
+    Params
+    ------
+    cnf: the CNF object to solve.
+    command: the solver command as a list of arguments. The DIMACS file path is appended to it.
+    timeout: seconds to wait for the solver before raising subprocess.TimeoutExpired.
+    Returns
+    -------
+    model: a dictionary with the value of each named variable, or None if the CNF is unsatisfiable.
+    """
+    fd, path = tempfile.mkstemp(suffix='.cnf')
+    try:
+        with os.fdopen(fd, 'w') as file:
+            cnf.to_dimacs(file)
+        result = subprocess.run(list(command) + [path], stdout=subprocess.PIPE,
+                                universal_newlines=True, timeout=timeout)
+    finally:
+        os.remove(path)
+    status = None
+    values = {}
+    for line in result.stdout.splitlines():
+        tokens = line.split()
+        if not tokens:
+            continue
+        if tokens[0] == 's':
+            status = ' '.join(tokens[1:])
+        elif tokens[0] == 'v':
+            for token in tokens[1:]:
+                lit = int(token)
+                if lit != 0:
+                    values[abs(lit)] = lit > 0
+    if status == 'UNSATISFIABLE':
+        return None
+    if status != 'SATISFIABLE':
+        raise ValueError("External solver did not report a result:", status)
+    return {name: values.get(var, False) for var, name in cnf.names.items()}
@@ -0,0 +1,472 @@
+import heapq
+from array import array
+from .proposition import Variable, Constant
+from .logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+
+# opcode of each node type in a flat proposition
+VARIABLE = 0
+CONSTANT = 1
+NEGATION = 2
+CONJUNCTION = 3
+DISJUNCTION = 4
+CONDITIONAL = 5
+BICONDITIONAL = 6
+
+opcodes = {
+    Variable: VARIABLE,
+    Constant: CONSTANT,
+    Negation: NEGATION,
+    Conjunction: CONJUNCTION,
+    Disjunction: DISJUNCTION,
+    Conditional: CONDITIONAL,
+    Biconditional: BICONDITIONAL,
+}
+
+# name of the proposition class of each opcode
+opcode_names = {opcode: cls.__name__ for cls, opcode in opcodes.items()}
+
+binary_connectives = {
+    CONJUNCTION: Conjunction,
+    DISJUNCTION: Disjunction,
+    CONDITIONAL: Conditional,
+    BICONDITIONAL: Biconditional,
+}
+
+class VariableTable:
+    """ An interned table of variable names shared by many flat propositions.
+    Flat propositions store the index of a name in the table instead of the name itself.
+    """
+
+    __slots__ = ('names', 'indices')
+
+    def __init__(self):
+        self.names = []
+        self.indices = {}
+
+    def index(self, name):
+        """ Returns the index of a variable name, adding it to the table if needed. """
+        index = self.indices.get(name)
+        if index is None:
+            index = self.indices[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+# table used by flat propositions when no other table is given
+default_variable_table = VariableTable()
+
+class FlatProposition:
+    """ A compact array-based encoding of a proposition.
+
+    Nodes are stored in three parallel arrays in post-order, so every child comes before
+    its parent and the root is the last node. For node i, opcodes[i] is its type and
+    left[i] and right[i] are the indices of its children. A variable stores its index in
+    the variable table in left[i] and a constant stores its value there.
+    Subformulas which are shared in the proposition DAG are stored once.
+    """
+
+    __slots__ = ('opcodes', 'left', 'right', 'variable_table')
+
+    def __init__(self, opcodes, left, right, variable_table = None):
+        """ Creates a flat proposition from its arrays.
+        Params
+        ------
+        opcodes: an array('B') with the opcode of each node.
+        left, right: arrays('i') with the operands of each node, -1 when unused.
+        variable_table: the VariableTable the variable indices refer to.
+        """
+        self.opcodes = opcodes
+        self.left = left
+        self.right = right
+        self.variable_table = variable_table if variable_table is not None else default_variable_table
+
+    @classmethod
+    def from_proposition(cls, prop, variable_table = None):
+        """ Encodes a proposition tree into a flat proposition without recursion. """
+        if variable_table is None:
+            variable_table = default_variable_table
+        # lists are converted to arrays at the end so the arrays are not over-allocated
+        ops, left, right, roots = flatten([prop], variable_table)
+        return cls(array('B', ops), array('i', left), array('i', right), variable_table)
+
+    def to_proposition(self):
+        """ Decodes the flat proposition back into a proposition tree. """
+        names = self.variable_table.names
+        nodes = []
+        for opcode, left, right in zip(self.opcodes, self.left, self.right):
+            if opcode == VARIABLE:
+                nodes.append(Variable(names[left]))
+            elif opcode == CONSTANT:
+                nodes.append(Constant(bool(left)))
+            elif opcode == NEGATION:
+                nodes.append(Negation(nodes[left]))
+            else:
+                nodes.append(binary_connectives[opcode](nodes[left], nodes[right]))
+        return nodes[-1]
+
+    def __len__(self):
+        """ Returns the number of stored nodes. """
+        return len(self.opcodes)
+
+    def get_var_names(self):
+        """ Returns a set containing all the variable names used in this proposition. """
+        names = self.variable_table.names
+        return set(names[left] for opcode, left in zip(self.opcodes, self.left) if opcode == VARIABLE)
+
+    def evaluate(self, variable_values = None):
+        """ Evaluates the proposition to a single boolean value.
+        Params
+        ------
+        variable_values: a dictionary with the variable symbols as the key and
+                         a boolean as the value of the variable.
+        """
+        lowered = {name.lower(): value for name, value in (variable_values or {}).items()}
+        return self._run(lambda name: bool(lowered[name]), True, False)
+
+    def evaluate_bitwise(self, columns, mask):
+        """ Evaluates the proposition over many rows at once, like Proposition.evaluate_bitwise. """
+        return self._run(lambda name: columns[name], mask, mask ^ mask)
+
+    def _run(self, lookup, true, false):
+        names = self.variable_table.names
+        try:
+            return run(self.opcodes, self.left, self.right, lambda index: lookup(names[index]), true, false)
+        except KeyError as error:
+            raise ValueError("Parameter variable_values does not contain value for variable ", error.args[0])
+
+    def bind(self, var_order):
+        """ Returns a BoundProposition evaluating this proposition from positional values.
+        Params
+        ------
+        var_order: the lowercase variable names in the order of the values.
+        """
+        slots = {name: i for i, name in enumerate(var_order)}
+        names = self.variable_table.names
+        left = array('i', self.left)
+        for i, opcode in enumerate(self.opcodes):
+            if opcode == VARIABLE:
+                name = names[left[i]]
+                if name not in slots:
+                    raise ValueError("Parameter var_order does not contain variable ", name)
+                left[i] = slots[name]
+        return BoundProposition(tuple(var_order), self.opcodes, left, self.right)
+
+    def to_bytes(self):
+        """ Serializes the arrays, without the variable table, into bytes. """
+        n = array('i', [len(self.opcodes)])
+        return n.tobytes() + self.opcodes.tobytes() + self.left.tobytes() + self.right.tobytes()
+
+    @classmethod
+    def from_bytes(cls, buffer, variable_table = None):
+        """ Deserializes a flat proposition written by to_bytes, using the same variable table. """
+        view = memoryview(buffer)
+        itemsize = array('i').itemsize
+        n = view[:itemsize].cast('i')[0]
+        offset = itemsize
+        ops = array('B', view[offset:offset + n])
+        offset += n
+        left = array('i', view[offset:offset + n * itemsize].cast('i'))
+        offset += n * itemsize
+        right = array('i', view[offset:offset + n * itemsize].cast('i'))
+        return cls(ops, left, right, variable_table)
+
+def from_arrays(opcodes, left, right, names):
+    """ Rebuilds a proposition from the arrays of a flat proposition and the names of its variable table.
+    Deep propositions are pickled as a call to this function, see Proposition._reduce_flat.
+    """
+    table = VariableTable()
+    for name in names:
+        table.index(name)
+    return FlatProposition(opcodes, left, right, table).to_proposition()
+
+class BoundProposition:
+    """ A flat proposition whose variables are bound to positional slots.
+
+    Each variable node holds the index of its value in a sequence instead of a name,
+    so evaluation does no name lookups. Use Proposition.bind to create one.
+    """
+
+    __slots__ = ('var_order', 'opcodes', 'left', 'right')
+
+    def __init__(self, var_order, opcodes, left, right):
+        """ Creates a bound proposition from flat arrays where variable operands are slots.
+        Params
+        ------
+        var_order: the variable names in slot order.
+        opcodes, left, right: the arrays of a FlatProposition, see FlatProposition.__init__.
+        """
+        self.var_order = var_order
+        self.opcodes = opcodes
+        self.left = left
+        self.right = right
+
+    def evaluate(self, values):
+        """ Evaluates the proposition to a single boolean value.
+        Params
+        ------
+        values: a tuple or list with a boolean for each variable in var_order.
+                Other values are converted with bool.
+        """
+        if len(values) != len(self.var_order):
+            raise ValueError("Parameter values must have one value for each variable in var_order")
+        values = [bool(value) for value in values]
+        return run(self.opcodes, self.left, self.right, values.__getitem__, True, False)
+
+    def node_counts(self):
+        """ Returns the number of nodes evaluated per evaluation for each proposition class name. """
+        return node_counts(self.opcodes)
+
+    def evaluate_bitwise(self, columns, mask):
+        """ Evaluates the proposition over many rows at once.
+        Params
+        ------
+        columns: a tuple or list with a bitset column for each variable in var_order.
+        mask: a bitset with a 1 in every row.
+        """
+        if len(columns) != len(self.var_order):
+            raise ValueError("Parameter columns must have one column for each variable in var_order")
+        return run(self.opcodes, self.left, self.right, columns.__getitem__, mask, mask ^ mask)
+
+class IncrementalEvaluator:
+    """ Evaluates propositions on one assignment at a time, where each assignment differs
+    from the previous one by a single variable.
+
+    The propositions are flattened together, so subformulas they share are stored once,
+    and the current value of every node is kept. When a variable flips, only nodes above
+    its variable node are recomputed, and a change stops propagating at any node whose
+    value stays the same.
+    """
+
+    __slots__ = ('var_order', 'opcodes', 'left', 'right', 'roots', 'parents', 'var_nodes', 'values')
+
+    def __init__(self, props, var_order):
+        """ Creates an evaluator with every variable false.
+        Params
+        ------
+        props: the propositions to evaluate.
+        var_order: the lowercase variable names, which must include every variable of props.
+        """
+        self.var_order = tuple(var_order)
+        slots = {name: i for i, name in enumerate(self.var_order)}
+        variable_table = VariableTable()
+        ops, left, right, self.roots = flatten(props, variable_table)
+        self.opcodes = ops
+        self.left = left
+        self.right = right
+        # parents[i] lists the nodes with node i as an operand
+        self.parents = [[] for _ in ops]
+        # var_nodes[slot] is the variable node of the variable in that slot, or -1 if it is unused
+        self.var_nodes = [-1] * len(self.var_order)
+        for i, opcode in enumerate(ops):
+            if opcode == VARIABLE:
+                name = variable_table.names[left[i]]
+                if name not in slots:
+                    raise ValueError("Parameter var_order does not contain variable ", name)
+                self.var_nodes[slots[name]] = i
+            elif opcode != CONSTANT:
+                self.parents[left[i]].append(i)
+                if right[i] != left[i] and right[i] >= 0:
+                    self.parents[right[i]].append(i)
+        self.values = []
+        self.reset([False] * len(self.var_order))
+
+    def reset(self, values):
+        """ Evaluates every node from scratch.
+        Params
+        ------
+        values: a boolean for each variable in var_order.
+        """
+        node_values = self.values = []
+        append = node_values.append
+        var_slots = {node: slot for slot, node in enumerate(self.var_nodes) if node >= 0}
+        for i, opcode in enumerate(self.opcodes):
+            if opcode == VARIABLE:
+                append(bool(values[var_slots[i]]))
+            else:
+                append(self._compute(i))
+
+    def _compute(self, i):
+        # the value of a connective or constant node from the current values of its operands
+        opcode, l, r = self.opcodes[i], self.left[i], self.right[i]
+        values = self.values
+        if opcode == CONJUNCTION:
+            return values[l] and values[r]
+        if opcode == DISJUNCTION:
+            return values[l] or values[r]
+        if opcode == NEGATION:
+            return not values[l]
+        if opcode == CONDITIONAL:
+            return not values[l] or values[r]
+        if opcode == BICONDITIONAL:
+            return values[l] == values[r]
+        return bool(l)
+
+    def flip(self, slot):
+        """ Complements the variable in a slot of var_order and updates the nodes above it. """
+        node = self.var_nodes[slot]
+        if node < 0:
+            return
+        values = self.values
+        parents = self.parents
+        values[node] = not values[node]
+        # nodes are in post-order, so recomputing the lowest pending node first
+        # recomputes each one at most once, after all of its operands
+        pending = list(parents[node])
+        heapq.heapify(pending)
+        queued = set(pending)
+        while pending:
+            i = heapq.heappop(pending)
+            value = self._compute(i)
+            if value == values[i]:
+                continue
+            values[i] = value
+            for parent in parents[i]:
+                if parent not in queued:
+                    queued.add(parent)
+                    heapq.heappush(pending, parent)
+
+    def get_values(self):
+        """ Returns a list with the current value of each proposition. """
+        values = self.values
+        return [values[root] for root in self.roots]
+
+def flatten(props, variable_table):
+    """ Flattens propositions into shared post-order node lists without recursion.
+    See FlatProposition for the meaning of the lists.
+    Returns
+    -------
+    opcodes, left, right: lists with the opcode and the operands of each node.
+    roots: a list with the index of the node of each proposition.
+    """
+    ops, left, right = [], [], []
+    indices = {}
+    roots = []
+    for prop in props:
+        stack = [(prop, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in indices:
+                continue
+            if isinstance(node, Negation) and not expanded:
+                stack.append((node, True))
+                stack.append((node.proposition, False))
+                continue
+            if isinstance(node, (Conjunction, Disjunction, Conditional, Biconditional)) and not expanded:
+                stack.append((node, True))
+                stack.append((node.right_proposition, False))
+                stack.append((node.left_proposition, False))
+                continue
+
+            opcode = opcodes.get(type(node))
+            if opcode is None:
+                raise ValueError("Unsupported proposition type ", type(node).__name__)
+            ops.append(opcode)
+            if opcode == VARIABLE:
+                left.append(variable_table.index(node.name))
+                right.append(-1)
+            elif opcode == CONSTANT:
+                left.append(int(node.value))
+                right.append(-1)
+            elif opcode == NEGATION:
+                left.append(indices[node.proposition])
+                right.append(-1)
+            else:
+                left.append(indices[node.left_proposition])
+                right.append(indices[node.right_proposition])
+            indices[node] = len(ops) - 1
+        roots.append(indices[prop])
+    return ops, left, right, roots
+
+class BoundPropositions:
+    """ Several propositions flattened and bound to positional slots together.
+
+    Subformulas shared by the propositions are stored once, so they are computed once
+    per evaluation however many of the propositions contain them. Use bind_all to create one.
+    """
+
+    __slots__ = ('var_order', 'opcodes', 'left', 'right', 'roots')
+
+    def __init__(self, var_order, opcodes, left, right, roots):
+        """ Creates bound propositions from shared flat arrays.
+        Params
+        ------
+        var_order, opcodes, left, right: see BoundProposition.__init__.
+        roots: the index of the node of each proposition.
+        """
+        self.var_order = var_order
+        self.opcodes = opcodes
+        self.left = left
+        self.right = right
+        self.roots = roots
+
+    def node_counts(self):
+        """ Returns the number of nodes evaluated per evaluation for each proposition class name. """
+        return node_counts(self.opcodes)
+
+    def evaluate_bitwise(self, columns, mask):
+        """ Evaluates every proposition over many rows at once.
+        Params
+        ------
+        columns: a tuple or list with a bitset column for each variable in var_order.
+        mask: a bitset with a 1 in every row.
+        Returns
+        -------
+        cols: a list with the bitset column of each proposition.
+        """
+        if len(columns) != len(self.var_order):
+            raise ValueError("Parameter columns must have one column for each variable in var_order")
+        values = run_all(self.opcodes, self.left, self.right, columns.__getitem__, mask, mask ^ mask)
+        return [values[root] for root in self.roots]
+
+def bind_all(props, var_order):
+    """ Flattens and binds propositions together, see BoundPropositions.
+    Params
+    ------
+    props: a list of propositions.
+    var_order: the lowercase variable names in slot order, including every variable of props.
+    """
+    variable_table = VariableTable()
+    ops, left, right, roots = flatten(props, variable_table)
+    flat = FlatProposition(array('B', ops), array('i', left), array('i', right), variable_table)
+    bound = flat.bind(var_order)
+    return BoundPropositions(bound.var_order, bound.opcodes, bound.left, bound.right, roots)
+
+def node_counts(opcodes):
+    """ Returns the number of nodes of each proposition class name in an opcode array. """
+    counts = {}
+    for opcode in opcodes:
+        name = opcode_names[opcode]
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+def run(opcodes, left, right, variable, true, false):
+    """ Evaluates flat proposition arrays in post-order and returns the value of the root.
+    Params
+    ------
+    variable: a function returning the value of a variable node from its operand.
+    true, false: the true and false values. With booleans, complementing is 'true ^ value',
+                 and with bitsets true is the mask of every row, so the same operations apply.
+    """
+    return run_all(opcodes, left, right, variable, true, false)[-1]
+
+def run_all(opcodes, left, right, variable, true, false):
+    """ Evaluates flat proposition arrays in post-order and returns the list of every node's value.
+    See run for the parameters.
+    """
+    values = []
+    append = values.append
+    for opcode, l, r in zip(opcodes, left, right):
+        if opcode == VARIABLE:
+            append(variable(l))
+        elif opcode == CONJUNCTION:
+            append(values[l] & values[r])
+        elif opcode == DISJUNCTION:
+            append(values[l] | values[r])
+        elif opcode == NEGATION:
+            append(true ^ values[l])
+        elif opcode == CONDITIONAL:
+            append((true ^ values[l]) | values[r])
+        elif opcode == BICONDITIONAL:
+            append(true ^ (values[l] ^ values[r]))
+        else:
+            append(true if l else false)
+    return values
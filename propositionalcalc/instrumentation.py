@@ -0,0 +1,145 @@
+import heapq
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class Stats:
+    """ Counters recorded while instrumentation is enabled.
+
+    The counters may be read at any time, for example by a metrics exporter polling
+    from another thread. snapshot returns a consistent copy of all of them.
+    """
+
+    # number of slowest argument checks which are kept
+    max_slowest_arguments = 10
+
+    def __init__(self, track_memory = False):
+        """ Creates a stats object with every counter at zero.
+        Params
+        ------
+        track_memory: if True, the peak memory of each argument check is measured with
+                      tracemalloc, which slows python down while it is tracing.
+        """
+        self.track_memory = track_memory
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """ Sets every counter back to zero. """
+        with self.lock:
+            # node evaluations per proposition class name, like 'Conjunction'
+            self.node_evaluations = {}
+            self.parse_calls = 0
+            self.parse_tokenize_seconds = 0.0
+            self.parse_build_seconds = 0.0
+            # truth table columns computed and the rows they were computed for
+            self.truth_table_columns = 0
+            self.truth_table_rows = 0
+            self.argument_checks = 0
+            self.argument_seconds = 0.0
+            self.argument_peak_memory = 0
+            # heap of (seconds, peak memory, description) for the slowest argument checks
+            self.slowest_arguments = []
+
+    def record_parse(self, tokenize_seconds, build_seconds):
+        with self.lock:
+            self.parse_calls += 1
+            self.parse_tokenize_seconds += tokenize_seconds
+            self.parse_build_seconds += build_seconds
+
+    def record_evaluations(self, counts, times = 1):
+        """ Adds node evaluation counts, given as a dictionary from class name to count. """
+        with self.lock:
+            for name, count in counts.items():
+                self.node_evaluations[name] = self.node_evaluations.get(name, 0) + count * times
+
+    def record_columns(self, n_columns, n_rows):
+        with self.lock:
+            self.truth_table_columns += n_columns
+            self.truth_table_rows += n_rows
+
+    def record_argument(self, seconds, peak_memory, description):
+        with self.lock:
+            self.argument_checks += 1
+            self.argument_seconds += seconds
+            self.argument_peak_memory = max(self.argument_peak_memory, peak_memory)
+            entry = (seconds, peak_memory, description)
+            if len(self.slowest_arguments) < self.max_slowest_arguments:
+                heapq.heappush(self.slowest_arguments, entry)
+            else:
+                heapq.heappushpop(self.slowest_arguments, entry)
+
+    def snapshot(self):
+        """ Returns a dictionary with a copy of every counter.
+        'slowest_arguments' lists (seconds, peak memory in bytes, description) from the slowest.
+        """
+        with self.lock:
+            return {
+                'node_evaluations': dict(self.node_evaluations),
+                'parse_calls': self.parse_calls,
+                'parse_tokenize_seconds': self.parse_tokenize_seconds,
+                'parse_build_seconds': self.parse_build_seconds,
+                'truth_table_columns': self.truth_table_columns,
+                'truth_table_rows': self.truth_table_rows,
+                'argument_checks': self.argument_checks,
+                'argument_seconds': self.argument_seconds,
+                'argument_peak_memory': self.argument_peak_memory,
+                'slowest_arguments': sorted(self.slowest_arguments, reverse=True),
+            }
+
+# the stats object receiving records, or None when instrumentation is disabled
+# instrumented code checks this once per call, which is the only cost when disabled
+active = None
+
+def enable(stats = None):
+    """ Enables instrumentation for every thread and returns the stats object receiving the records.
+    Params
+    ------
+    stats: the Stats object to record into. Defaults to a new one.
+    """
+    global active
+    active = stats if stats is not None else Stats()
+    return active
+
+def disable():
+    """ Disables instrumentation. """
+    global active
+    active = None
+
+@contextmanager
+def enabled(stats = None, track_memory = False):
+    """ A context manager which enables instrumentation in its block and yields the stats object.
+    The previously active stats object, if any, is restored at the end of the block.
+    """
+    global active
+    previous = active
+    if stats is None:
+        stats = Stats(track_memory)
+    active = stats
+    try:
+        yield stats
+    finally:
+        active = previous
+
+@contextmanager
+def measure_argument(stats, description):
+    """ Records the time and, if the stats track memory, the peak memory used in its block. """
+    tracing = stats.track_memory
+    started_tracing = tracing and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if tracing:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_memory = 0
+        if tracing:
+            peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+        if started_tracing:
+            tracemalloc.stop()
+        stats.record_argument(seconds, peak_memory, description)
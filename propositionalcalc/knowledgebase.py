@@ -0,0 +1,187 @@
+import threading
+from .sat import SATSolver
+from .cnf import TseitinEncoder
+from .bdd import BDD
+from .proposition import Constant
+from .simulation import simulate, get_row, lowest_row
+from . import instrumentation
+
+class KnowledgeBase:
+    """ A fixed set of premises compiled once to answer whether they entail many conclusions.
+
+    With the 'sat' engine, the premises are Tseitin encoded into a solver as hard clauses.
+    Every query only encodes its conclusion, with clauses guarded by a new activation
+    literal, and solves with the activation literal and the negated conclusion as
+    assumptions, so the clauses learnt by earlier queries keep helping. The clauses of
+    the conclusion are retired after the query. With the 'bdd' engine, the conjunction of
+    the premises is built once as a decision diagram. Since retired clauses and the nodes
+    of old conclusions stay in the engine, it is rebuilt from the premises once the
+    conclusions have added more than the premises took, see max_retired.
+
+    Models of the premises found by earlier queries are kept as bitset columns, where
+    bit i is the value in model i. A conclusion which is false in one of them is not
+    entailed, which is found by evaluating the conclusion once over all of them,
+    without running the engine.
+
+    The knowledge base can be queried from many threads, queries run one at a time.
+    """
+
+    # names of the engines which can decide entailment
+    engines = ('sat', 'bdd')
+
+    # maximum number of models of the premises kept to refute conclusions
+    max_models = 256
+
+    # the engine is rebuilt once conclusions have added more solver variables or diagram nodes
+    # than the premises took, and at least this many
+    max_retired = 1 << 12
+
+    def __init__(self, premises, engine = 'sat'):
+        """ Compiles the premises of a knowledge base.
+        Params
+        ------
+        premises: a list of propositions which are given to be true.
+        engine: 'sat' to keep a SAT solver with the premises encoded,
+                or 'bdd' to build a binary decision diagram of the premises.
+        """
+        if engine not in self.engines:
+            raise ValueError("Unknown engine ", engine)
+        self.premises = list(premises)
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.variables = set()
+        for premise in self.premises:
+            self.variables |= premise.get_var_names()
+        simplified = [premise.simplify() for premise in self.premises]
+        self.simplified = [premise for premise in simplified if premise is not Constant(True)]
+
+        # known models of the premises, as a bitset column for each variable
+        self.model_columns = {name: 0 for name in self.variables}
+        self.n_models = 0
+        if engine == 'sat':
+            self._build_solver()
+            self.consistent = self.solver.solve()
+            if self.consistent:
+                self._add_model(self._sat_model())
+        else:
+            self._build_bdd()
+            self.consistent = self.bdd.is_satisfiable(self.premises_node)
+            if self.consistent:
+                self._add_model(self.bdd.get_model(self.premises_node))
+
+    def _build_solver(self):
+        # encodes the premises into a new solver
+        self.solver = SATSolver()
+        self.encoder = TseitinEncoder(self.solver)
+        for premise in self.simplified:
+            self.encoder.add_proposition(premise)
+        self.premise_size = self.solver.n_vars
+
+    def _build_bdd(self):
+        # builds the conjunction of the premises in a new diagram
+        self.bdd = BDD(sorted(self.variables))
+        self.premises_node = BDD.TRUE
+        for premise in self.simplified:
+            self.premises_node = self.bdd.conjoin(self.premises_node, self.bdd.from_proposition(premise))
+        self.premise_size = len(self.bdd.levels)
+
+    def entails(self, conclusion):
+        """ Returns True if the conclusion is true in every case where all premises are true.
+        Inconsistent premises entail every conclusion.
+        """
+        return self.get_counterexample(conclusion) is None
+
+    def entails_many(self, conclusions):
+        """ Returns a list with whether the premises entail each conclusion in a list.
+        Every conclusion is first evaluated over the known models of the premises, and the
+        engine only runs for the conclusions which none of them refute.
+        """
+        with self.lock:
+            refuted = self._refuted([conclusion.simplify() for conclusion in conclusions])
+            return [not refuted[i] and self._check(conclusion) is None
+                    for i, conclusion in enumerate(conclusions)]
+
+    def get_counterexample(self, conclusion):
+        """ Returns an assignment of the variables of the premises and the conclusion where
+        all premises are true and the conclusion is false, or None if the conclusion is entailed.
+        """
+        with self.lock:
+            return self._check(conclusion)
+
+    def _check(self, conclusion):
+        # finds a counterexample for one conclusion, the lock must be held
+        stats = instrumentation.active
+        if stats is None:
+            return self._find_counterexample(conclusion)
+        with instrumentation.measure_argument(stats, ('knowledge base ∴ ' + str(conclusion))[:500]):
+            return self._find_counterexample(conclusion)
+
+    def _find_counterexample(self, conclusion):
+        if not self.consistent:
+            return None
+        variables = self.variables | conclusion.get_var_names()
+        conclusion = conclusion.simplify()
+        if conclusion is Constant(True):
+            return None
+
+        columns = self.model_columns.copy()
+        columns.update(self._columns(conclusion))
+        mask = (1 << self.n_models) - 1
+        col = mask ^ simulate(conclusion, columns, mask)
+        if col:
+            model = get_row(columns, lowest_row(col))
+        elif self.engine == 'sat':
+            solver = self.solver
+            guard = solver.new_var()
+            lit = self.encoder.encode_guarded(conclusion, guard)
+            model = self._sat_model() if solver.solve([guard, -lit]) else None
+            solver.add_clause([-guard])
+            if model is not None:
+                self._add_model(model)
+            if self._retired(solver.n_vars):
+                self._build_solver()
+        else:
+            bdd = self.bdd
+            model = bdd.get_model(bdd.conjoin(self.premises_node, bdd.negate(bdd.from_proposition(conclusion))))
+            if model is not None:
+                self._add_model(model)
+            if self._retired(len(bdd.levels)):
+                self._build_bdd()
+        if model is None:
+            return None
+        # variables which simplified away can take any value
+        return {name: model.get(name, False) for name in sorted(variables)}
+
+    def _retired(self, size):
+        # whether the conclusions have grown the engine to size enough to rebuild it
+        retired = size - self.premise_size
+        return retired > max(self.premise_size, self.max_retired)
+
+    def _refuted(self, conclusions):
+        # whether each simplified conclusion is false in a known model of the premises
+        if not self.consistent:
+            return [False] * len(conclusions)
+        mask = (1 << self.n_models) - 1
+        columns = self.model_columns.copy()
+        for conclusion in conclusions:
+            columns.update(self._columns(conclusion))
+        return [mask ^ simulate(conclusion, columns, mask) != 0 for conclusion in conclusions]
+
+    def _columns(self, conclusion):
+        # the model columns of the variables of a conclusion. Variables which are not in the
+        # premises can take any value in a model of the premises, so they are false.
+        return {name: self.model_columns.get(name, 0) for name in conclusion.get_var_names()}
+
+    def _sat_model(self):
+        model = self.solver.get_model()
+        return {name: model[var] for name, var in self.encoder.var_ids.items()}
+
+    def _add_model(self, model):
+        # keeps a model of the premises, restricted to their variables, as a new bit of every column
+        if self.n_models >= self.max_models:
+            return
+        bit = 1 << self.n_models
+        for name in self.variables:
+            if model.get(name, False):
+                self.model_columns[name] |= bit
+        self.n_models += 1
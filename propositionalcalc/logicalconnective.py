@@ -1,83 +1,112 @@
-from .proposition import Proposition
+from .proposition import Proposition, max_reduce_depth
 
 class Negation(Proposition):
-        
+
+    __slots__ = ('proposition',)
+
     def __init__(self, proposition):
-        self.proposition = proposition
+        object.__setattr__(self, 'proposition', proposition)
+
+    @classmethod
+    def _intern_key(cls, proposition):
+        return proposition
+
+    def __reduce__(self):
+        if self.get_depth() > max_reduce_depth:
+            return self._reduce_flat()
+        return (Negation, (self.proposition,))
 
-    def evaluate(self, variable_values = None):
-        return not self.proposition.evaluate(variable_values)
+    def get_children(self):
+        return (self.proposition,)
 
-    def get_var_names(self):
-        return self.proposition.get_var_names()
+    def _emit(self, lines, indent, register, slots, shared):
+        self.proposition._emit_operand(lines, indent, register, slots, shared)
+        lines.append('    ' * indent + 'r' + str(register) + ' = not r' + str(register))
 
-    def __str__(self):
-        return "¬" + str(self.proposition)
+    def _str_parts(self):
+        return ("¬", self.proposition)
 
 class DualLogicalConnective(Proposition):
-    
+
+    __slots__ = ('left_proposition', 'right_proposition')
+
     def __init__(self, left_proposition, right_proposition):
-        self.left_proposition = left_proposition
-        self.right_proposition = right_proposition
+        object.__setattr__(self, 'left_proposition', left_proposition)
+        object.__setattr__(self, 'right_proposition', right_proposition)
 
-    def get_var_names(self):
-        left_names = self.left_proposition.get_var_names()
-        right_names = self.right_proposition.get_var_names()
-        return left_names.union(right_names)
+    @classmethod
+    def _intern_key(cls, left_proposition, right_proposition):
+        return (left_proposition, right_proposition)
 
-class Conjunction(DualLogicalConnective):
+    def __reduce__(self):
+        if self.get_depth() > max_reduce_depth:
+            return self._reduce_flat()
+        return (type(self), (self.left_proposition, self.right_proposition))
 
-    def __init__(self, left_proposition, right_proposition):
-        super().__init__(left_proposition, right_proposition)
+    def get_children(self):
+        return (self.left_proposition, self.right_proposition)
 
-    def evaluate(self, variable_values = None):
-        left_val = self.left_proposition.evaluate(variable_values)
-        right_val = self.right_proposition.evaluate(variable_values)
-        return left_val and right_val
+    def _str_parts(self):
+        return ("(", self.left_proposition, self.symbol, self.right_proposition, ")")
 
-    def __str__(self):
-        return "(" + str(self.left_proposition) + "∧" + str(self.right_proposition) + ")"
+class Conjunction(DualLogicalConnective):
 
-class Disjunction(DualLogicalConnective):
+    __slots__ = ()
+
+    symbol = "∧"
 
     def __init__(self, left_proposition, right_proposition):
         super().__init__(left_proposition, right_proposition)
 
-    def evaluate(self, variable_values = None):
-        left_val = self.left_proposition.evaluate(variable_values)
-        right_val = self.right_proposition.evaluate(variable_values)
-        return left_val or right_val
+    def _emit(self, lines, indent, register, slots, shared):
+        # the right proposition is only evaluated when the left one is true
+        self.left_proposition._emit_operand(lines, indent, register, slots, shared)
+        lines.append('    ' * indent + 'if r' + str(register) + ':')
+        self.right_proposition._emit_operand(lines, indent + 1, register, slots, shared)
 
-    def __str__(self):
-        return "(" + str(self.left_proposition) + "∨" + str(self.right_proposition) + ")"
+class Disjunction(DualLogicalConnective):
 
-class Conditional(DualLogicalConnective):
+    __slots__ = ()
+
+    symbol = "∨"
 
     def __init__(self, left_proposition, right_proposition):
         super().__init__(left_proposition, right_proposition)
 
-    def evaluate(self, variable_values = None):
-        left_val = self.left_proposition.evaluate(variable_values)
-        right_val = self.right_proposition.evaluate(variable_values)
-        return not left_val or (left_val and right_val)
+    def _emit(self, lines, indent, register, slots, shared):
+        # the right proposition is only evaluated when the left one is false
+        self.left_proposition._emit_operand(lines, indent, register, slots, shared)
+        lines.append('    ' * indent + 'if not r' + str(register) + ':')
+        self.right_proposition._emit_operand(lines, indent + 1, register, slots, shared)
 
-    def __str__(self):
-        return "(" + str(self.left_proposition) + "→" + str(self.right_proposition) + ")"
-    
-class Biconditional(DualLogicalConnective):
+class Conditional(DualLogicalConnective):
 
-    def __init__(self, left_proposition, right_proposition):
-        super().__init__(left_proposition, right_proposition)
+    __slots__ = ()
 
-    def evaluate(self, variable_values = None):
-        left_val = self.left_proposition.evaluate(variable_values)
-        right_val = self.right_proposition.evaluate(variable_values)
-        return left_val == right_val
+    symbol = "→"
 
-    def __str__(self):
-        return "(" + str(self.left_proposition) + "↔" + str(self.right_proposition) + ")"
+    def __init__(self, left_proposition, right_proposition):
+        super().__init__(left_proposition, right_proposition)
 
+    def _emit(self, lines, indent, register, slots, shared):
+        # the right proposition is only evaluated when the left one is true
+        self.left_proposition._emit_operand(lines, indent, register, slots, shared)
+        lines.append('    ' * indent + 'if r' + str(register) + ':')
+        self.right_proposition._emit_operand(lines, indent + 1, register, slots, shared)
+        lines.append('    ' * indent + 'else:')
+        lines.append('    ' * (indent + 1) + 'r' + str(register) + ' = True')
+    
+class Biconditional(DualLogicalConnective):
 
+    __slots__ = ()
 
+    symbol = "↔"
 
+    def __init__(self, left_proposition, right_proposition):
+        super().__init__(left_proposition, right_proposition)
 
+    def _emit(self, lines, indent, register, slots, shared):
+        # both sides are always needed, the right side uses the next register
+        self.left_proposition._emit_operand(lines, indent, register, slots, shared)
+        self.right_proposition._emit_operand(lines, indent, register + 1, slots, shared)
+        lines.append('    ' * indent + 'r' + str(register) + ' = r' + str(register) + ' == r' + str(register + 1))
@@ -0,0 +1,323 @@
+from collections import Counter
+from .proposition import Variable, Constant
+from .logicalconnective import Negation, Conjunction, Disjunction, Conditional
+from .bdd import BDD
+from .cnf import CNF, TseitinEncoder
+from .unionfind import DisjointSets
+
+class ModelCounter:
+    """ An exact model counter (#SAT) for formulas in conjunctive normal form.
+
+    Counting is DPLL-style: unit clauses are propagated, the remaining clauses are
+    split into connected components which share no variables, and the count of a
+    formula is the product of the counts of its components. A component is counted by
+    branching on its most frequent variable. Component counts are cached by their
+    clauses, so a component which appears again in another branch is counted once.
+
+    The counting steps are generators which yield the generator of each subproblem
+    and receive its count, and run resumes them from an explicit stack, so formulas
+    needing more nested decisions than the recursion limit can be counted.
+    """
+
+    def __init__(self, decision_vars = None):
+        """ Creates a model counter.
+        Params
+        ------
+        decision_vars: the variables to branch on first. The other variables should be
+                       determined by them through unit propagation, like the auxiliary
+                       variables of a Tseitin encoding. Defaults to every variable.
+        """
+        self.decision_vars = decision_vars
+        # number of models of each component, keyed by its frozenset of clauses
+        self.cache = {}
+        self.decisions = 0
+
+    def count(self, clauses, n_vars):
+        """ Counts the assignments of variables 1 to n_vars which satisfy every clause.
+        Params
+        ------
+        clauses: an iterable of clauses, each an iterable of DIMACS literals.
+        n_vars: the number of variables. Variables which no clause uses double the count.
+        """
+        formula = set()
+        for clause in clauses:
+            clause = set(clause)
+            for lit in clause:
+                if lit == 0 or abs(lit) > n_vars:
+                    raise ValueError("Clause contains an unknown literal ", lit)
+            if not clause:
+                return 0
+            # clauses containing a literal and its negation are always true
+            if not any(-lit in clause for lit in clause):
+                formula.add(tuple(sorted(clause)))
+        formula = frozenset(formula)
+        return self.run(self._count(formula)) << (n_vars - len(clause_vars(formula)))
+
+    def run(self, step):
+        """ Runs a counting step and every subproblem it yields, and returns its count. """
+        stack = [step]
+        count = None
+        while stack:
+            try:
+                sub_step = stack[-1].send(count)
+            except StopIteration as stop:
+                stack.pop()
+                count = stop.value
+                continue
+            stack.append(sub_step)
+            count = None
+        return count
+
+    def _count(self, clauses):
+        # number of models over the variables of the clauses
+        n_vars = len(clause_vars(clauses))
+        clauses, n_assigned = propagate(clauses)
+        if clauses is None:
+            return 0
+        components = split_components(clauses)
+        total = 1 << (n_vars - n_assigned - sum(len(variables) for variables, component in components))
+        for variables, component in components:
+            total *= yield self._count_component(component, variables)
+            if total == 0:
+                return 0
+        return total
+
+    def _count_component(self, component, variables):
+        count = self.cache.get(component)
+        if count is not None:
+            return count
+        self.decisions += 1
+        occurrences = Counter(abs(lit) for clause in component for lit in clause)
+        if self.decision_vars is not None:
+            occurrences = Counter({var: n for var, n in occurrences.items() if var in self.decision_vars}) or occurrences
+        var = occurrences.most_common(1)[0][0]
+        count = 0
+        for lit in (var, -var):
+            reduced = assign(component, lit)
+            if reduced is not None:
+                # variables which the assignment removed from every clause are free
+                count += (yield self._count(reduced)) << (len(variables) - 1 - len(clause_vars(reduced)))
+        self.cache[component] = count
+        return count
+
+def clause_vars(clauses):
+    """ Returns the set of variables used in the clauses. """
+    return {abs(lit) for clause in clauses for lit in clause}
+
+def assign(clauses, lit):
+    """ Simplifies clauses by setting a literal to true.
+    Returns
+    -------
+    clauses: a frozenset of the remaining clauses, or None if a clause became empty.
+    """
+    reduced = []
+    for clause in clauses:
+        if lit in clause:
+            continue
+        if -lit in clause:
+            clause = tuple(other for other in clause if other != -lit)
+            if not clause:
+                return None
+        reduced.append(clause)
+    return frozenset(reduced)
+
+def propagate(clauses):
+    """ Assigns the literals of unit clauses until there are none left.
+    The clauses are indexed by their literals once, so each assignment only visits the
+    clauses containing its negation, and the remaining clauses are built once at the end.
+    Returns
+    -------
+    clauses: the remaining clauses, or None if there was a conflict.
+    n_assigned: the number of variables assigned.
+    """
+    units = [clause[0] for clause in clauses if len(clause) == 1]
+    if not units:
+        return clauses, 0
+    occurrences = {}
+    for clause in clauses:
+        for lit in clause:
+            occurrences.setdefault(lit, []).append(clause)
+    assigned = set()
+    while units:
+        lit = units.pop()
+        if lit in assigned:
+            continue
+        if -lit in assigned:
+            return None, len(assigned)
+        assigned.add(lit)
+        for clause in occurrences.get(-lit, ()):
+            unassigned = []
+            for other in clause:
+                if other in assigned:
+                    break
+                if -other not in assigned:
+                    unassigned.append(other)
+            else:
+                if not unassigned:
+                    return None, len(assigned)
+                if len(unassigned) == 1:
+                    units.append(unassigned[0])
+    falsified = {-lit for lit in assigned}
+    reduced = frozenset(tuple(lit for lit in clause if lit not in falsified) if falsified.intersection(clause) else clause
+                        for clause in clauses if assigned.isdisjoint(clause))
+    return reduced, len(assigned)
+
+def split_components(clauses):
+    """ Splits clauses into groups which share no variables.
+    Returns
+    -------
+    components: a list of (variables, clauses) pairs, with the clauses as a frozenset.
+    """
+    sets = DisjointSets()
+    for clause in clauses:
+        sets.union(abs(lit) for lit in clause)
+    groups = {}
+    for clause in clauses:
+        groups.setdefault(sets.find(abs(clause[0])), []).append(clause)
+    variables = sets.sets()
+    return [(variables[root], frozenset(group)) for root, group in groups.items()]
+
+# names of the engines which can count the models of a group of conjuncts
+engines = ('auto', 'dpll', 'bdd')
+
+def count_models(propositions, var_names = None, engine = 'auto'):
+    """ Counts the assignments which make a proposition, or every proposition in a list, true.
+    Conjunctions are split into conjuncts, which are grouped by the variables they share,
+    and the count is the product of the counts of the groups.
+    Params
+    ------
+    propositions: a proposition or a list of propositions.
+    var_names: the variable names to count assignments of. It must contain every variable
+               of the propositions. Defaults to the variables of the propositions.
+    engine: 'dpll' to count every group with a ModelCounter, Tseitin encoding the conjuncts
+            which are not clauses (see clause_literals), 'bdd' to count every group with a
+            binary decision diagram, or 'auto' to count the groups whose conjuncts are all
+            clauses with a ModelCounter and the others with a diagram. The auxiliary variables
+            of a Tseitin encoding join its clauses into one component, so diagrams count
+            formulas such as negated CNF far faster.
+    """
+    if engine not in engines:
+        raise ValueError("Unknown engine ", engine)
+    if not isinstance(propositions, (list, tuple)):
+        propositions = [propositions]
+    prop_vars = set()
+    for prop in propositions:
+        prop_vars |= prop.get_var_names()
+    if var_names is None:
+        n_vars = len(prop_vars)
+    else:
+        var_names = set(name.lower() for name in var_names)
+        missing = prop_vars - var_names
+        if missing:
+            raise ValueError("Parameter var_names does not contain variables ", sorted(missing))
+        n_vars = len(var_names)
+
+    count = 1
+    # variables of clauses satisfied by a true constant are not in any group, but still counted
+    n_counted = 0
+    for group_vars, group in group_conjuncts(split_conjuncts(propositions)):
+        if not group_vars:
+            # conjuncts without variables are constant
+            count *= all(conjunct.evaluate() for conjunct in group)
+        else:
+            count *= count_group(group, group_vars, engine)
+            n_counted += len(group_vars)
+        if count == 0:
+            return 0
+    return count << (n_vars - n_counted)
+
+def split_conjuncts(propositions):
+    """ Returns a list of the propositions with every conjunction split into its conjuncts. """
+    conjuncts = []
+    stack = list(reversed(propositions))
+    while stack:
+        conjunct = stack.pop()
+        if isinstance(conjunct, Conjunction):
+            stack.append(conjunct.right_proposition)
+            stack.append(conjunct.left_proposition)
+        else:
+            conjuncts.append(conjunct)
+    return conjuncts
+
+def group_conjuncts(conjuncts):
+    """ Groups conjuncts by the variables they share, directly or through other conjuncts.
+    Returns
+    -------
+    groups: a list of (variables, conjuncts) pairs. The conjuncts without variables are one group.
+    """
+    sets = DisjointSets()
+    conjunct_vars = [conjunct.get_var_names() for conjunct in conjuncts]
+    for names in conjunct_vars:
+        sets.union(names)
+
+    groups = {}
+    for conjunct, names in zip(conjuncts, conjunct_vars):
+        root = sets.find(next(iter(names))) if names else None
+        groups.setdefault(root, (set(), []))
+        groups[root][0].update(names)
+        groups[root][1].append(conjunct)
+    return list(groups.values())
+
+def count_group(conjuncts, group_vars, engine = 'auto'):
+    """ Counts the assignments of the variables of a group of conjuncts which make them all true.
+    See count_models for the engines.
+    """
+    if engine != 'bdd':
+        cnf = CNF()
+        var_ids = {name: cnf.new_var(name) for name in sorted(group_vars)}
+        encoder = None
+        for conjunct in conjuncts:
+            clause = clause_literals(var_ids, conjunct)
+            if clause is None:
+                if engine == 'auto':
+                    break
+                if encoder is None:
+                    encoder = TseitinEncoder(cnf)
+                    encoder.var_ids.update(var_ids)
+                encoder.add_proposition(conjunct)
+            elif clause is not True:
+                cnf.add_clause(clause)
+        else:
+            # the auxiliary variables are determined by the group's variables, so only those are decided
+            return ModelCounter(set(var_ids.values())).count(cnf.clauses, cnf.n_vars)
+
+    bdd = BDD()
+    nodes = [bdd.from_proposition(conjunct) for conjunct in conjuncts]
+    # conjoined from the bottom of the variable order up, see Argument
+    node = BDD.TRUE
+    for conjunct_node in sorted(nodes, key=lambda conjunct_node: bdd.levels[conjunct_node], reverse=True):
+        node = bdd.conjoin(conjunct_node, node)
+    return bdd.count_models(node, len(group_vars))
+
+def clause_literals(var_ids, prop):
+    """ Returns the literals of a proposition which is a clause, True if the proposition is
+    always true, or None if it is not a clause. Besides disjunctions of literals, clauses
+    written as conditionals, such as (~a & ~b) -> c, and negated conjunctions, such as
+    ~(a & b), are recognized.
+    Params
+    ------
+    var_ids: a dictionary with the DIMACS variable of each variable name.
+    """
+    literals = []
+    # each node with whether it is under an odd number of negations and antecedents
+    stack = [(prop, False)]
+    while stack:
+        node, negated = stack.pop()
+        if isinstance(node, Negation):
+            stack.append((node.proposition, not negated))
+        elif isinstance(node, Variable):
+            literals.append(-var_ids[node.name] if negated else var_ids[node.name])
+        elif isinstance(node, Constant):
+            if node.value != negated:
+                return True
+        elif isinstance(node, Disjunction if not negated else Conjunction):
+            # ~(a & b) is ~a | ~b
+            stack.append((node.right_proposition, negated))
+            stack.append((node.left_proposition, negated))
+        elif isinstance(node, Conditional) and not negated:
+            # a -> b is ~a | b
+            stack.append((node.right_proposition, False))
+            stack.append((node.left_proposition, True))
+        else:
+            return None
+    return literals
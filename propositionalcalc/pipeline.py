@@ -0,0 +1,145 @@
+import csv
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .argument import Argument
+from .propositionparser import parse_proposition
+
+# separator between the premises in the premises column of a CSV file
+csv_premise_separator = ';'
+
+def read_arguments(file, format = 'jsonl'):
+    """ Reads arguments from a text file object one at a time.
+    Params
+    ------
+    file: the file object to read.
+    format: 'jsonl' for one JSON object per line with a 'premises' list of strings and a
+            'conclusion' string, or 'csv' for a file with a header row and 'premises' and
+            'conclusion' columns, where premises are separated by ';'.
+            Any other fields, such as an 'id', are passed through.
+    Yields
+    ------
+    record: a dictionary with the premise strings, the conclusion string and the other fields,
+            or a ValueError for a line which is not valid JSON or a row which is not valid CSV,
+            so one bad line does not stop the others. validate_record turns it into an error result.
+    """
+    if format == 'jsonl':
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except (ValueError, RecursionError) as error:
+                # json raises RecursionError for values nested too deeply
+                record = ValueError("Invalid JSON on line " + str(line_number) + ": " + str(error))
+            yield record
+    elif format == 'csv':
+        reader = csv.DictReader(file)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as error:
+                # such as a field over the size limit, the reader continues with the next row
+                yield ValueError("Invalid CSV row after line " + str(reader.line_num) + ": " + str(error))
+                continue
+            premises = row.get('premises') or ''
+            row['premises'] = [premise for premise in premises.split(csv_premise_separator) if premise.strip()]
+            yield row
+    else:
+        raise ValueError("Unknown format ", format)
+
+def validate_record(record, engine = 'sat'):
+    """ Parses and validates one argument record.
+    Returns
+    -------
+    result: the record's fields other than the premises and conclusion, with 'valid' and
+            'counterexample' added. If the argument cannot be read or parsed, 'valid' is None
+            and 'error' holds the reason.
+    """
+    if isinstance(record, ValueError):
+        return {'valid': None, 'error': str(record)}
+    if not isinstance(record, dict):
+        return {'valid': None, 'error': "The argument record is not an object: " + json.dumps(record)[:200]}
+    result = {key: value for key, value in record.items() if key not in ('premises', 'conclusion')}
+    premises = record.get('premises')
+    if not isinstance(premises, list) or not all(isinstance(premise, str) for premise in premises):
+        result['valid'] = None
+        result['error'] = "The premises of the argument are not a list of strings: " + json.dumps(premises)[:200]
+        return result
+    if not isinstance(record.get('conclusion'), str):
+        result['valid'] = None
+        result['error'] = "The conclusion of the argument is not a string: " + json.dumps(record.get('conclusion'))[:200]
+        return result
+    try:
+        premises = [parse_proposition(premise) for premise in record['premises']]
+        conclusion = parse_proposition(record['conclusion'])
+    except ValueError as error:
+        result['valid'] = None
+        result['error'] = str(error)
+        return result
+    argument = Argument(premises, conclusion)
+    result['valid'] = argument.is_valid(engine)
+    result['counterexample'] = argument.counterexample
+    return result
+
+def validate_batch(records, engine = 'sat'):
+    """ Validates a list of argument records. This runs in a worker process of the pipeline. """
+    return [validate_record(record, engine) for record in records]
+
+def validate_arguments(records, workers = None, engine = 'sat', batch_size = 100, max_in_flight = None):
+    """ Validates a stream of argument records, yielding the results in input order.
+    Params
+    ------
+    records: an iterable of argument records, see read_arguments.
+    workers: the number of processes which parse and validate the arguments.
+             Defaults to validating them in this process.
+    engine: the engine used by Argument.is_valid.
+    batch_size: the number of records sent to a worker at a time.
+    max_in_flight: the maximum number of batches submitted to the pool and not yet yielded,
+                   which bounds the memory used by pending work. Defaults to 4 per worker.
+    Yields
+    ------
+    result: the result of validate_record for each record.
+    """
+    if workers is None or workers <= 1:
+        for record in records:
+            yield validate_record(record, engine)
+        return
+
+    if max_in_flight is None:
+        max_in_flight = workers * 4
+    pending = deque()
+    with ProcessPoolExecutor(workers) as pool:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == batch_size:
+                pending.append(pool.submit(validate_batch, batch, engine))
+                batch = []
+                # wait for the oldest batch before reading further, so results stay in order
+                while len(pending) >= max_in_flight:
+                    yield from pending.popleft().result()
+        if batch:
+            pending.append(pool.submit(validate_batch, batch, engine))
+        while pending:
+            yield from pending.popleft().result()
+
+def validate_file(input_file, output_file, format = 'jsonl', workers = None, engine = 'sat', batch_size = 100):
+    """ Validates the arguments in an input file and writes one JSON result per line to an output file.
+    Returns
+    -------
+    counts: a dictionary with the number of 'valid', 'invalid' and 'error' arguments.
+    """
+    counts = {'valid': 0, 'invalid': 0, 'error': 0}
+    records = read_arguments(input_file, format)
+    for result in validate_arguments(records, workers, engine, batch_size):
+        if result['valid'] is None:
+            counts['error'] += 1
+        elif result['valid']:
+            counts['valid'] += 1
+        else:
+            counts['invalid'] += 1
+        output_file.write(json.dumps(result) + '\n')
+    return counts
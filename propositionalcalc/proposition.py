@@ -1,18 +1,120 @@
-from abc import ABC, abstractmethod
+import threading
+import weakref
+from abc import ABCMeta, abstractmethod
 from .truthtable import TruthTable
+from . import instrumentation
 
-class Proposition(ABC):
+try:
+    import numpy as np
+except ImportError: # numpy is optional, evaluate_batch falls back to pure python
+    np = None
+
+# propositions deeper than this are not compiled to python source, which allows at most
+# 100 levels of indentation, and are evaluated by their bound program instead
+max_compile_depth = 90
+
+# propositions deeper than this are pickled and copied as flat arrays,
+# since pickle and copy recurse once per level of the tree
+max_reduce_depth = 200
+
+# values which propositions compute on first use, kept in weak tables rather than on every
+# instance so only the propositions asked for them hold them. An entry dies with its proposition,
+# and no value refers to its proposition, so the tables do not keep any proposition alive.
+# the variable names and string of each proposition
+var_names_cache = weakref.WeakKeyDictionary()
+str_cache = weakref.WeakKeyDictionary()
+# a dictionary with the bound program or compiled function of each proposition for each variable order
+bound_cache = weakref.WeakKeyDictionary()
+compiled_cache = weakref.WeakKeyDictionary()
+
+def clear_caches():
+    """ Empties the tables of the values computed by propositions, such as strings, bound
+    programs and simplified forms, so the next use of a proposition computes them again.
+    """
+    # imported here because the simplify module depends on the proposition classes
+    from .simplify import _simplified
+    for cache in (var_names_cache, str_cache, bound_cache, compiled_cache, _simplified):
+        cache.clear()
+
+class PropositionFactory(ABCMeta):
+    """ Metaclass which interns propositions as they are constructed.
+
+    Calling a proposition class returns the existing node when a structurally identical
+    proposition is still alive, so identical subtrees are the same object and parsed
+    propositions form a DAG. Since children are interned first, a node is identified by
+    its class and the identity of its children, and its structural hash is computed once.
+    """
+
+    _interned = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __call__(cls, *args, **kwargs):
+        key = (cls, cls._intern_key(*args, **kwargs))
+        with PropositionFactory._lock:
+            node = PropositionFactory._interned.get(key)
+            if node is None:
+                node = super().__call__(*args, **kwargs)
+                object.__setattr__(node, '_hash', hash(key))
+                PropositionFactory._interned[key] = node
+        return node
+
+class Proposition(metaclass=PropositionFactory):
     """
     Abstract base class for propositions.
+
+    Propositions are interned, so structurally identical propositions are the same
+    object and compare equal by identity. They are immutable: their public attributes
+    cannot be reassigned after construction. Their variable names, string, depth and
+    size are computed on first use. Depth and size are cached on every node, the other
+    values in weak tables shared by all propositions, see str_cache.
     """
 
+    # propositions use slots instead of a per instance __dict__ to save memory
+    __slots__ = ('_hash', '_depth', '_size', '__weakref__')
+
     @abstractmethod
     def __init__(self):
         pass
 
+    @classmethod
     @abstractmethod
+    def _intern_key(cls, *args, **kwargs):
+        """ Returns a hashable key identifying the proposition built from the constructor arguments.
+        """
+        pass
+
+    @abstractmethod
+    def __reduce__(self):
+        """ Returns the constructor and arguments used to rebuild the proposition,
+        so copies and unpickled propositions are interned as well.
+        """
+        pass
+
+    def _reduce_flat(self):
+        """ Returns the reduce value rebuilding this proposition from its flat arrays, see flatast. """
+        # imported here because the flatast module depends on this module
+        from .flatast import FlatProposition, VariableTable, from_arrays
+        table = VariableTable()
+        flat = FlatProposition.from_proposition(self, table)
+        return (from_arrays, (flat.opcodes, flat.left, flat.right, table.names))
+
+    def __hash__(self):
+        return self._hash
+
+    def __setattr__(self, name, value):
+        # public attributes are set once in __init__ with object.__setattr__, which also skips
+        # this check while constructing, private ones hold caches
+        if not name.startswith('_') and hasattr(self, name):
+            raise AttributeError("Propositions are immutable, cannot set " + name)
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError("Propositions are immutable, cannot delete " + name)
+
     def evaluate(self, variable_values = None):
         """ Evaluates the proposition to a single boolean value.
+        This binds the proposition to its sorted variable names once and passes the
+        values positionally, see bind.
         Params
         ------
         variable_values: a dictionary with the variable symbols as the key and
@@ -21,65 +123,430 @@ class Proposition(ABC):
         -------
         truth: a boolean indicating whether the proposition is true or false.
         """
-        pass
+        bound = self.bind()
+        lowered = {name.lower(): value for name, value in (variable_values or {}).items()}
+        try:
+            # the bound program combines values with bitwise operators, which only match
+            # the logical ones on booleans
+            values = [bool(lowered[name]) for name in bound.var_order]
+        except KeyError as error:
+            raise ValueError("Parameter variable_values does not contain value for variable ", error.args[0])
+        if instrumentation.active is not None:
+            instrumentation.active.record_evaluations(bound.node_counts())
+        return bound.evaluate(values)
+
+    def bind(self, var_order = None):
+        """ Resolves every variable of the proposition to a positional slot.
+        Bound propositions are cached for each proposition and variable order, see bound_cache.
+        Params
+        ------
+        var_order: the variable names in slot order.
+                   Defaults to the sorted variable names of this proposition.
+        Returns
+        -------
+        bound: a BoundProposition whose evaluate method takes a tuple or list with a
+               boolean for each variable in var_order, and whose evaluate_bitwise
+               method takes a bitset column for each one.
+        """
+        key = None if var_order is None else tuple(name.lower() for name in var_order)
+        cache = bound_cache.get(self)
+        if cache is None:
+            cache = bound_cache[self] = {}
+        bound = cache.get(key)
+        if bound is not None:
+            return bound
+
+        # imported here because the flatast module depends on this module
+        from .flatast import FlatProposition, VariableTable
+        # a table of its own, so bound programs do not keep names in the shared default table
+        flat = FlatProposition.from_proposition(self, VariableTable())
+        bound = flat.bind(sorted(flat.get_var_names()) if key is None else key)
+        cache[key] = bound
+        return bound
+
+    def evaluate_bitwise(self, columns, mask):
+        """ Evaluates the proposition over many rows at once using bitwise operations.
+        The bound program of the proposition is run on the columns, see bind, so the
+        proposition is not walked recursively and shared subformulas are computed once.
+        Params
+        ------
+        columns: a dictionary with the variable names as the key and a bitset
+                 (an int, where bit i is the value in row i) as the value of the variable.
+        mask: a bitset with a 1 in every row, used to complement columns.
+        Returns
+        -------
+        column: a bitset with the truth value of the proposition in each row.
+        """
+        bound = self.bind()
+        try:
+            values = [columns[name] for name in bound.var_order]
+        except KeyError as error:
+            raise ValueError("Parameter columns does not contain value for variable ", error.args[0])
+        return bound.evaluate_bitwise(values, mask)
+
+    def evaluate_batch(self, assignments, var_order = None):
+        """ Evaluates the proposition for many assignments at once.
+        The proposition tree is walked once and each node is applied to whole columns.
+        Params
+        ------
+        assignments: a 2-D array of booleans where each row is an assignment and each
+                     column holds the values of one variable. If numpy is installed,
+                     this may be any array-like, otherwise a sequence of row sequences.
+        var_order: the variable names in column order.
+                   Defaults to the sorted variable names of this proposition.
+        Returns
+        -------
+        truth: a boolean numpy vector with the truth value for each row,
+               or a list of booleans if numpy is not installed.
+        """
+        if var_order is None:
+            var_order = sorted(self.get_var_names())
+        var_order = [name.lower() for name in var_order]
+        if np is not None:
+            assignments = np.asarray(assignments, dtype=bool)
+            if assignments.ndim != 2 or assignments.shape[1] != len(var_order):
+                raise ValueError("Parameter assignments must have one column for each variable in var_order")
+            columns = {name: assignments[:, i] for i, name in enumerate(var_order)}
+            mask = np.ones(assignments.shape[0], dtype=bool)
+            return np.array(self.evaluate_bitwise(columns, mask), dtype=bool)
+
+        # pure python fallback: pack each column into an int bitset
+        # each column is built from a string of bits in one pass, since setting bits one at
+        # a time copies the growing int for every row
+        n_rows = len(assignments)
+        for row in assignments:
+            if len(row) != len(var_order):
+                raise ValueError("Parameter assignments must have one column for each variable in var_order")
+        columns = {}
+        for i, name in enumerate(var_order):
+            # row 0 is the lowest bit, so it is the last character
+            bits = ''.join(['1' if row[i] else '0' for row in reversed(assignments)])
+            columns[name] = int(bits, 2) if bits else 0
+        col = self.evaluate_bitwise(columns, (1 << n_rows) - 1)
+        return [bit == '1' for bit in format(col, '0' + str(n_rows) + 'b')[::-1]] if n_rows else []
 
     @abstractmethod
-    def get_var_names(self):
-        """ Returns a set containing all the variable names used in this proposition.
+    def get_children(self):
+        """ Returns a tuple with the propositions this proposition is built from.
         """
         pass
 
+    def get_var_names(self):
+        """ Returns a frozenset containing all the variable names used in this proposition.
+        The set is cached, see var_names_cache. Subformulas whose sets are cached are not walked again.
+        """
+        cached = var_names_cache.get(self)
+        if cached is not None:
+            return cached
+        names = set()
+        seen = set()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            cached = var_names_cache.get(node)
+            if cached is not None:
+                names |= cached
+            elif isinstance(node, Variable):
+                names.add(node.name)
+            else:
+                stack.extend(node.get_children())
+        # only this node caches its set, caching every subformula's set could take quadratic memory
+        names = frozenset(names)
+        var_names_cache[self] = names
+        return names
+
+    def get_depth(self):
+        """ Returns the number of nodes on the longest path from this proposition to a variable or constant.
+        Depths are cached on every subformula.
+        """
+        self._measure()
+        return self._depth
+
+    def get_size(self):
+        """ Returns the number of nodes in this proposition written out as a tree,
+        where a shared subformula counts once for every place it appears.
+        Sizes are cached on every subformula.
+        """
+        self._measure()
+        return self._size
+
+    def _measure(self):
+        # computes the depth and size of every subformula which does not have them yet, bottom up
+        if hasattr(self, '_size'):
+            return
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if hasattr(node, '_size'):
+                continue
+            children = node.get_children()
+            if not expanded and children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children)
+                continue
+            node._depth = 1 + max((child._depth for child in children), default=0)
+            node._size = 1 + sum(child._size for child in children)
+
     @abstractmethod
+    def _str_parts(self):
+        """ Returns a tuple of the strings and subformulas which make up the string of this proposition.
+        """
+        pass
+
     def __str__(self):
+        # the string is built from a flat list of parts, so long chains take linear time,
+        # and it is cached for this proposition only so the cache takes linear memory
+        cached = str_cache.get(self)
+        if cached is not None:
+            return cached
+        parts = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+                continue
+            cached = str_cache.get(item)
+            if cached is not None:
+                parts.append(cached)
+            else:
+                stack.extend(reversed(item._str_parts()))
+        string = ''.join(parts)
+        str_cache[self] = string
+        return string
+
+    @abstractmethod
+    def _emit(self, lines, indent, register, slots, shared):
+        """ Appends the python statements which compute this proposition to lines.
+        Params
+        ------
+        lines: the list of source lines being generated.
+        indent: the indentation level of the statements.
+        register: the index of the local variable r<register> which receives the value.
+        slots: a dictionary mapping each variable name to the index of its argument.
+        shared: a dictionary with the name of the local variable holding the value of each
+                subformula which is computed once before the others, see compile.
+        """
         pass
 
-    def get_truth_table(self):
+    def _emit_operand(self, lines, indent, register, slots, shared):
+        # emits this proposition as the operand of a connective, which reads the local
+        # of a shared subformula instead of computing it again
+        local = shared.get(self)
+        if local is None:
+            self._emit(lines, indent, register, slots, shared)
+        else:
+            lines.append('    ' * indent + 'r' + str(register) + ' = ' + local)
+
+    def _shared_subformulas(self):
+        # the connectives which are an operand of more than one connective, children first
+        order = []
+        seen = set()
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.get_children())
+        references = {}
+        for node in order:
+            for child in node.get_children():
+                references[child] = references.get(child, 0) + 1
+        return [node for node in order if references.get(node, 0) > 1 and node.get_children()]
+
+    def compile(self, var_order):
+        """ Compiles the proposition into a python function for fast repeated evaluation.
+        The function takes one positional boolean per variable in var_order and
+        short-circuits like the python 'and' and 'or' operators, except that subformulas
+        which appear in several places are computed once, before the rest.
+        Compiled functions are cached for each proposition and variable order, see compiled_cache.
+        Params
+        ------
+        var_order: the variable names in the order of the function's arguments.
+        Returns
+        -------
+        function: a function taking positional booleans and returning the truth value.
+        """
+        var_order = tuple(name.lower() for name in var_order)
+        cache = compiled_cache.get(self)
+        if cache is None:
+            cache = compiled_cache[self] = {}
+        function = cache.get(var_order)
+        if function is not None:
+            return function
+
+        slots = {name: i for i, name in enumerate(var_order)}
+        missing = self.get_var_names() - slots.keys()
+        if missing:
+            raise ValueError("Parameter var_order does not contain variables ", sorted(missing))
+        function = None
+        # _emit recurses and nests a block per level, so only shallow propositions are compiled
+        if self.get_depth() <= max_compile_depth:
+            lines = []
+            # subformulas shared by several connectives are computed once into locals s<i>,
+            # so the source grows with the number of nodes rather than the number of paths
+            shared = {}
+            for i, node in enumerate(self._shared_subformulas()):
+                node._emit(lines, 1, 0, slots, shared)
+                shared[node] = 's' + str(i)
+                lines.append('    s' + str(i) + ' = r0')
+            self._emit(lines, 1, 0, slots, shared)
+            args = ', '.join('v' + str(i) for i in range(len(var_order)))
+            source = 'def compiled_proposition(' + args + '):\n' + '\n'.join(lines) + '\n    return r0\n'
+            try:
+                namespace = {}
+                exec(compile(source, '<proposition>', 'exec'), namespace)
+                function = namespace['compiled_proposition']
+            except (SyntaxError, RecursionError, MemoryError):
+                pass
+        if function is None:
+            # the tree is too deep for the python compiler, evaluate it directly instead
+            bound = self.bind(var_order)
+
+            def function(*values):
+                return bound.evaluate(values)
+        cache[var_order] = function
+        return function
+
+    def simplify(self):
+        """ Returns an equivalent proposition simplified with the laws of boolean algebra,
+        such as constant folding, double negation, idempotence, complement and absorption.
+        See simplify.simplify.
+        """
+        # imported here because the simplify module depends on the proposition classes
+        from .simplify import simplify
+        return simplify(self)
+
+    def is_satisfiable(self, engine = 'sat'):
+        """ Determines whether some assignment of the variables makes the proposition true.
+        Random assignments are simulated bit-parallel first, and the exact engine only runs
+        if none of them is a model. See simulation.find_model.
+        Params
+        ------
+        engine: the exact engine, 'sat' or 'bdd'.
+        """
+        # imported here because the simulation module depends on the proposition classes
+        from .simulation import find_model
+        return find_model(self, engine) is not None
+
+    def is_tautology(self, engine = 'sat'):
+        """ Determines whether every assignment of the variables makes the proposition true.
+        Random assignments are simulated first to look for one which makes it false.
+        """
+        from .logicalconnective import Negation
+        from .simulation import find_model
+        return find_model(Negation(self), engine) is None
+
+    def is_equivalent(self, other, engine = 'sat'):
+        """ Determines whether the proposition has the same truth value as another one under
+        every assignment. Random assignments are simulated first to look for one where they differ.
+        """
+        from .logicalconnective import Negation, Biconditional
+        from .simulation import find_model
+        return find_model(Negation(Biconditional(self, other)), engine) is None
+
+    def count_models(self, var_names = None, engine = 'auto'):
+        """ Counts the assignments which make the proposition true, without enumerating them.
+        Params
+        ------
+        var_names: the variable names to count assignments of. It must contain every variable
+                   of the proposition. Defaults to the variables of the proposition.
+        engine: 'auto', 'dpll' or 'bdd', see modelcount.count_models.
+        """
+        # imported here because the modelcount module depends on the proposition classes
+        from .modelcount import count_models
+        if var_names is None:
+            var_names = self.get_var_names()
+        else:
+            missing = self.get_var_names() - set(name.lower() for name in var_names)
+            if missing:
+                raise ValueError("Parameter var_names does not contain variables ", sorted(missing))
+        # the variables which simplify away are still counted through var_names
+        return count_models(self.simplify(), var_names, engine)
+
+    def get_truth_table(self, engine = 'bitwise'):
         """ Returns a truth table for the proposition.
+        Params
+        ------
+        engine: the engine used to compute the proposition's column, 'bitwise' or 'bdd'.
+                See TruthTable.add_proposition.
         """
         var_names = self.get_var_names()
         truth_table = TruthTable(var_names)
-        truth_table.add_proposition(self)
+        truth_table.add_proposition(self, engine)
         return truth_table
 
 class Variable(Proposition):
     """ Propositional Logic Variable that can be true or false
     """
 
+    __slots__ = ('name',)
+
     def __init__(self, name):
         """ Creates a variable with the given name. 
         Variable names are not case sensistive and should only contain letters.
         """
-        self.name = name.lower()
+        object.__setattr__(self, 'name', name.lower())
 
-    def evaluate(self, variable_values):
-        for name, value in variable_values.items():
-            if name.lower() == self.name:
-                return value
-        raise ValueError("Parameter variable_values does not contain value for variable ", self.name)
+    @classmethod
+    def _intern_key(cls, name):
+        return name.lower()
 
-    def get_var_names(self):
-        return set([self.name])
+    def __reduce__(self):
+        return (Variable, (self.name,))
 
-    def __str__(self):
-        return self.name
+    def evaluate_bitwise(self, columns, mask):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise ValueError("Parameter columns does not contain value for variable ", self.name)
+
+    def get_children(self):
+        return ()
+
+    def _emit(self, lines, indent, register, slots, shared):
+        lines.append('    ' * indent + 'r' + str(register) + ' = v' + str(slots[self.name]))
+
+    def _str_parts(self):
+        return (self.name,)
 
 class Constant(Proposition):
     """ Propositonal Logic constant that is always either true or false
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         """ Creates a constant expression given its boolean value.
         """
-        self.value = value
+        object.__setattr__(self, 'value', bool(value))
 
-    def evaluate(self, variable_values = None):
-        return self.value
+    @classmethod
+    def _intern_key(cls, value):
+        return bool(value)
 
-    def get_var_names(self):
-        return set()
+    def __reduce__(self):
+        return (Constant, (self.value,))
 
-    def __str__(self):
+    def evaluate_bitwise(self, columns, mask):
+        return mask if self.value else mask ^ mask
+
+    def get_children(self):
+        return ()
+
+    def _emit(self, lines, indent, register, slots, shared):
+        lines.append('    ' * indent + 'r' + str(register) + ' = ' + str(bool(self.value)))
+
+    def _str_parts(self):
         if self.value:
-            return "True"
+            return ("True",)
         else:
-            return "False"
\ No newline at end of file
+            return ("False",)
\ No newline at end of file
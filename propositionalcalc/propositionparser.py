@@ -1,5 +1,8 @@
 from .proposition import Proposition, Variable, Constant
 from .logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+from . import instrumentation
+import re
+import time
 from enum import Enum
 
 class Symbol():
@@ -17,6 +20,10 @@ class Symbol():
         CONDITIONAL = 8,
         BICONDITIONAL = 9
 
+        # members are singletons, so identity hashing is valid and much faster
+        # than the default name hashing when symbol types are used as dictionary keys
+        __hash__ = object.__hash__
+
 
     # dictionary containing all valid strings for each logical operation
     logical_symbol_strings = {
@@ -32,33 +39,38 @@ class Symbol():
     # character length of the longest logical symbol
     logical_symbol_max_length = 3
 
+    # type of each logical symbol string
+    symbol_types = {sym_string: symbol_type
+                    for symbol_type, sym_strings in logical_symbol_strings.items()
+                    for sym_string in sym_strings}
+
     def __init__(self, string, type = None):
         """ Creates a symbol object. If no type is provided, this infers the type of symbol.
         """
         self.string = string
         if type is not None:
             self.type = type
-        else:
-            if string.isalpha():
-                if string.lower() == 'true':
-                    self.type = Symbol.SymbolType.CONSTANT_TRUE
-                elif string.lower() == 'false':
-                    self.type = Symbol.SymbolType.CONSTANT_FALSE
-                else:
-                    self.type = Symbol.SymbolType.VARIABLE_NAME
+        elif string.isalpha():
+            if string.lower() == 'true':
+                self.type = Symbol.SymbolType.CONSTANT_TRUE
+            elif string.lower() == 'false':
+                self.type = Symbol.SymbolType.CONSTANT_FALSE
             else:
-                for symbol_type, sym_strings in self.logical_symbol_strings.items():
-                    for sym_string in sym_strings:
-                        if sym_string == string:
-                            self.type = symbol_type
-                            break
-                    else: # else excecutes when for loop does not break
-                        continue
-                    break
+                self.type = Symbol.SymbolType.VARIABLE_NAME
+        elif string in Symbol.symbol_types:
+            self.type = Symbol.symbol_types[string]
+        else:
+            raise ValueError("Invalid symbol used in proposition:", string)
 
     def __str__(self):
         return self.string
- 
+
+# matches optional whitespace followed by either a name made of letters, a logical symbol
+# or any other character, which is invalid
+# longer logical symbols are listed first so '<->' is not read as '<' and '->'
+symbol_pattern = re.compile(r'\s*(?:([^\W\d_]+)|(' + '|'.join(
+    re.escape(sym_string) for sym_string in sorted(Symbol.symbol_types, key=len, reverse=True)) + r')|(\S))')
+
 def next_symbol(x):
     """ Given a string to parse, this extracts the left most complete symbol.
     A symbol could be a logical symbol, a paranthesis, or a variable name.
@@ -72,39 +84,13 @@ def next_symbol(x):
     symbol: a symbol object representing the symbol.
     string: the remaining part of the string.
     """
-    # get first non-space character of string
-    i = 0
-    while (x[i] == ' '):
-        i += 1
-    first_char = x[i] 
-    # if first character is letter, keep looking for letters part of a variable name
-    if first_char.isalpha():
-        symbol = first_char
-        for j in range(i + 1, len(x)):
-            if x[j].isalpha():
-                # another letter found, add it symbol
-                symbol += x[j]
-            else:
-                # non-letter found, return the symbol and the rest of the string
-                return Symbol(symbol), x[j:]
-        # end of string reached return symbol and empty string
-        return Symbol(symbol), ''
-    else:
-        # look for logical symbol
-        symbol = ''
-        for j in range(i, len(x)):
-            symbol += x[j]
-            for symbol_type, symbol_strings in Symbol.logical_symbol_strings.items():
-                if symbol in symbol_strings:
-                    # the current symbol is a valid logical symbol, return it
-                    return Symbol(symbol, symbol_type), '' if j == len(x) - 1 else x[j+1:]
-                if len(symbol) > Symbol.logical_symbol_max_length:
-                    raise ValueError("Invalid symbol used in proposition:", symbol)
-        # end of string reached, no valid symbol found, raise Error
-        raise ValueError("Invalid symbol used in proposition:", symbol)
+    match = symbol_pattern.match(x)
+    if match is None or match.group(3) is not None:
+        raise ValueError("Invalid symbol used in proposition:", x.split()[0] if x.strip() else x)
+    return Symbol(match.group(1) or match.group(2)), x[match.end():]
 
 def string_to_symbol_list(x):
-    """ Parses a string into a list of symbols.
+    """ Parses a string into a list of symbols in a single pass.
     Params
     -----------
     x: the string to parse.
@@ -114,11 +100,26 @@ def string_to_symbol_list(x):
     symbols: a list of symbol objects.
     """
     symbols = []
-    while x is not None and x != '':
-        symbol, x = next_symbol(x)
+    # symbols are not modified, so repeated symbol strings share one symbol object
+    known_symbols = {}
+    for match in symbol_pattern.finditer(x):
+        string = match.group(1) or match.group(2)
+        if string is None:
+            raise ValueError("Invalid symbol used in proposition:", x[match.start(3):].split()[0])
+        symbol = known_symbols.get(string)
+        if symbol is None:
+            symbol = known_symbols[string] = Symbol(string)
         symbols.append(symbol)
     return symbols
 
+# binding strength of each binary connective, higher binds tighter
+connective_precedence = {
+    Symbol.SymbolType.CONJUNCTION: (4, Conjunction),
+    Symbol.SymbolType.DISJUNCTION: (3, Disjunction),
+    Symbol.SymbolType.CONDITIONAL: (2, Conditional),
+    Symbol.SymbolType.BICONDITIONAL: (1, Biconditional),
+}
+
 def symbol_list_to_proposition(L):
     """ Parses a list of ordered symbols and propositions to an proposition.
     This follows the following order of operations when building the proposition:
@@ -128,6 +129,11 @@ def symbol_list_to_proposition(L):
     4. Disjunction
     5. Conditional
     6. Biconditional
+
+    Chains of the same connective group to the left, except for conditionals,
+    which group to the right: 'a -> b -> c' is 'a -> (b -> c)'.
+    The list is parsed in one pass with explicit operator and operand stacks,
+    so deeply nested propositions do not recurse.
     
     Params
     -----------
@@ -137,100 +143,74 @@ def symbol_list_to_proposition(L):
     -----------
     proposition: A proposition object representing the operations in the list.
     """
-
-    # base cases - symbol list contains one value
-    if len(L) == 1:
-        if issubclass(type(L[0]), Proposition):
-            return L[0]
-        elif isinstance(L[0], Symbol) and L[0].type == Symbol.SymbolType.VARIABLE_NAME:
-            return Variable(L[0].string)
-        elif isinstance(L[0], Symbol) and L[0].type == Symbol.SymbolType.CONSTANT_TRUE:
-            return Constant(True)
-        elif isinstance(L[0], Symbol) and L[0].type == Symbol.SymbolType.CONSTANT_FALSE:
-            return Constant(False)
+    operands = []
+    # pending negations, open paranthesis and binary connective symbol types
+    operators = []
+    expect_operand = True
+
+    def reduce_binary():
+        connective = connective_precedence[operators.pop()][1]
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(connective(left, right))
+
+    def reduce_negations():
+        while operators and operators[-1] == Symbol.SymbolType.NEGATION:
+            operators.pop()
+            operands.append(Negation(operands.pop()))
+
+    for symbol in L:
+        if isinstance(symbol, Symbol):
+            symbol_type = symbol.type
+        elif isinstance(symbol, Proposition):
+            symbol_type = None
         else:
             raise ValueError("Invalid Proposition String")
-   
-    simplified_list = []
-    # first we scan for open paranthesis
-    # we will create a simplified list where we condense
-    # everything inside a paranthesis to a proposition
-    i = 0
-    while (i < len(L)):
-        if isinstance(L[i], Symbol) and L[i].type == Symbol.SymbolType.OPEN_PARANTHESIS:
-            # we found an opened paranthesis
-            # scan for the closing paranthesis and save all symbols between
-            opened_paranthesis = 1
-            inner_symbols = []
-            # when the closing paranthesis is found, opened_paranthesis == 0
-            for j in range(i+1, len(L)):
-                if L[j].type == Symbol.SymbolType.OPEN_PARANTHESIS:
-                    opened_paranthesis += 1
-                elif L[j].type == Symbol.SymbolType.CLOSE_PARANTHESIS:
-                    opened_paranthesis -= 1
-                if opened_paranthesis == 0:
+
+        if expect_operand:
+            if symbol_type is None:
+                operands.append(symbol)
+            elif symbol_type == Symbol.SymbolType.VARIABLE_NAME:
+                operands.append(Variable(symbol.string))
+            elif symbol_type == Symbol.SymbolType.CONSTANT_TRUE:
+                operands.append(Constant(True))
+            elif symbol_type == Symbol.SymbolType.CONSTANT_FALSE:
+                operands.append(Constant(False))
+            elif symbol_type in (Symbol.SymbolType.NEGATION, Symbol.SymbolType.OPEN_PARANTHESIS):
+                operators.append(symbol_type)
+                continue
+            else:
+                raise ValueError("Invalid Proposition String")
+            # negation binds tighter than every binary connective
+            reduce_negations()
+            expect_operand = False
+        elif symbol_type in connective_precedence:
+            precedence = connective_precedence[symbol_type][0]
+            right_associative = symbol_type == Symbol.SymbolType.CONDITIONAL
+            while operators and operators[-1] in connective_precedence:
+                top_precedence = connective_precedence[operators[-1]][0]
+                if top_precedence < precedence or (top_precedence == precedence and right_associative):
                     break
-                else:
-                    inner_symbols.append(L[j])
-            if opened_paranthesis != 0:
+                reduce_binary()
+            operators.append(symbol_type)
+            expect_operand = True
+        elif symbol_type == Symbol.SymbolType.CLOSE_PARANTHESIS:
+            while operators and operators[-1] in connective_precedence:
+                reduce_binary()
+            if not operators or operators[-1] != Symbol.SymbolType.OPEN_PARANTHESIS:
                 raise ValueError("Mismatched Paranthesis")
-            # convert the symbols between the paranthesis to a proposition recusively
-            prop = symbol_list_to_proposition(inner_symbols)
-            # append the proposition to the list
-            simplified_list.append(prop)
-            # i must be increased by 1 for the open paranthesis, 1 for the close paranthesis
-            # and 1 for each symbol condensed to the proposition
-            i += 2 + len(inner_symbols)
-        else:
-            # we did not find a paranthesis, append the symbol to the simplified list
-            simplified_list.append(L[i])
-            # increment i
-            i += 1
-
-    # now we have a simplified list with no paranthesis
-    L = simplified_list.copy()
-    # the list contains symbols and propositions
-    # here we will follow order of operations
-
-    # first we scan for negations and create a new simplified list
-    simplified_list = []
-    i = 0
-    while (i < len(L)):
-        if isinstance(L[i], Symbol) and L[i].type == Symbol.SymbolType.NEGATION:
-            prop = Negation(symbol_list_to_proposition([L[i + 1]]))
-            simplified_list.append(prop)
-            i += 2
+            operators.pop()
+            reduce_negations()
         else:
-            simplified_list.append(L[i])
-            i += 1
-
-    # now we have a simplified list with no negations
-    L = simplified_list.copy()
-    # next we scan for remaining operations in order
-    connectives = {
-        Conjunction: Symbol.SymbolType.CONJUNCTION,
-        Disjunction: Symbol.SymbolType.DISJUNCTION,
-        Conditional: Symbol.SymbolType.CONDITIONAL,
-        Biconditional: Symbol.SymbolType.BICONDITIONAL,
-    }
-
-    for connective, symbol_type in connectives.items():
-        simplified_list = []
-        i = 0
-        while (i < len(L)):
-            if i + 1 < len(L) and type(L[i+1]) == Symbol and L[i+1].type == symbol_type:
-                expr = connective(symbol_list_to_proposition([L[i]]), symbol_list_to_proposition([L[i + 2]]))
-                simplified_list.append(expr)
-                i += 3
-            else:
-                simplified_list.append(L[i])
-                i += 1
-        L = simplified_list.copy()
+            raise ValueError("Invalid Proposition String")
 
-    assert len(L) == 1, "Invalid Proposition String"
-    # At this point, the list should be length 1
-    # Return the propostion contained in the list
-    return L[0]
+    if expect_operand:
+        raise ValueError("Invalid Proposition String")
+    while operators:
+        if operators[-1] not in connective_precedence:
+            raise ValueError("Mismatched Paranthesis")
+        reduce_binary()
+    return operands[0]
 
 def parse_proposition(x):
     """ Parses a string into an propositional calculus proposition.
@@ -263,4 +243,12 @@ def parse_proposition(x):
     -----------
     proposition: An proposition object representing the string.
     """
-    return symbol_list_to_proposition(string_to_symbol_list(x))
+    stats = instrumentation.active
+    if stats is None:
+        return symbol_list_to_proposition(string_to_symbol_list(x))
+    start = time.perf_counter()
+    symbols = string_to_symbol_list(x)
+    tokenized = time.perf_counter()
+    proposition = symbol_list_to_proposition(symbols)
+    stats.record_parse(tokenized - start, time.perf_counter() - tokenized)
+    return proposition
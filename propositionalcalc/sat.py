@@ -0,0 +1,340 @@
+import heapq
+
+class SATSolver:
+    """ A CDCL (conflict driven clause learning) SAT solver.
+
+    Clauses are lists of non-zero ints in the DIMACS convention: variable v is the
+    literal v and its negation is the literal -v. The solver uses two watched literals
+    for propagation, first-UIP clause learning, VSIDS branching with phase saving,
+    Luby restarts and periodic removal of learnt clauses.
+    Clauses can be added between calls to solve, and solve accepts assumption literals,
+    so the solver can be reused across related problems.
+    """
+
+    # number of conflicts in one unit of the luby restart sequence
+    restart_base = 100
+    # activity decay factor applied to the variable activity increment after each conflict
+    var_decay = 0.95
+
+    def __init__(self):
+        """ Creates a solver with no variables and no clauses. """
+        self.n_vars = 0
+        # clauses are stored as lists of internal literals 2 * v + sign
+        self.clauses = []
+        # literal block distance of each learnt clause, keyed by clause index
+        self.learnts = {}
+        self.watches = [[], []]
+        # value of each internal literal, None when unassigned
+        self.values = [None, None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.order_heap = []
+        self.var_inc = 1.0
+        self.max_learnts = 1000
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+
+    def new_var(self):
+        """ Adds a variable to the solver and returns its positive literal. """
+        self.n_vars += 1
+        self.watches.extend(([], []))
+        self.values.extend((None, None))
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        heapq.heappush(self.order_heap, (0.0, self.n_vars))
+        return self.n_vars
+
+    def add_clause(self, clause):
+        """ Adds a clause, given as an iterable of DIMACS literals, to the solver.
+        Returns False if the solver is now known to be unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self._backtrack(0)
+        lits = []
+        for dimacs_lit in set(clause):
+            if dimacs_lit == 0 or abs(dimacs_lit) > self.n_vars:
+                raise ValueError("Clause contains an unknown literal ", dimacs_lit)
+            lit = self._internal(dimacs_lit)
+            value = self.values[lit]
+            if value is True or lit ^ 1 in lits:
+                # the clause is already satisfied or is a tautology
+                return True
+            if value is None and lit not in lits:
+                lits.append(lit)
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            self._enqueue(lits[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self._attach(lits)
+        return self.ok
+
+    def solve(self, assumptions = ()):
+        """ Determines whether the clauses are satisfiable.
+        Params
+        ------
+        assumptions: DIMACS literals which are assumed to be true for this call only.
+        Returns
+        -------
+        satisfiable: True if a satisfying assignment was found, False otherwise.
+                     When True, the assignment is available through get_model.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        assumptions = [self._internal(lit) for lit in assumptions]
+        restarts = 0
+        conflict_limit = self.restart_base * luby(restarts)
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, backtrack_level, lbd = self._analyze(conflict)
+                self._backtrack(backtrack_level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    index = self._attach(learnt)
+                    self.learnts[index] = lbd
+                    self._enqueue(learnt[0], index)
+                self.var_inc /= self.var_decay
+                continue
+
+            if conflicts >= conflict_limit:
+                restarts += 1
+                conflict_limit = self.restart_base * luby(restarts)
+                conflicts = 0
+                self._backtrack(0)
+                if len(self.learnts) > self.max_learnts:
+                    self._reduce_learnts()
+                continue
+
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                lit = assumptions[level]
+                if self.values[lit] is False:
+                    self._backtrack(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if self.values[lit] is None:
+                    self._enqueue(lit, None)
+                continue
+
+            var = self._pick_branch_var()
+            if var is None:
+                self.model = {v: self.values[2 * v] for v in range(1, self.n_vars + 1)}
+                self._backtrack(0)
+                return True
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(2 * var + (not self.phase[var]), None)
+
+    def get_model(self):
+        """ Returns the satisfying assignment found by the last call to solve as a
+        dictionary from variable to boolean, or None if the last call was unsatisfiable.
+        """
+        return self.model
+
+    def _internal(self, dimacs_lit):
+        return 2 * abs(dimacs_lit) + (dimacs_lit < 0)
+
+    def _attach(self, lits):
+        self.clauses.append(lits)
+        index = len(self.clauses) - 1
+        self.watches[lits[0]].append(index)
+        self.watches[lits[1]].append(index)
+        return index
+
+    def _enqueue(self, lit, reason):
+        var = lit >> 1
+        self.values[lit] = True
+        self.values[lit ^ 1] = False
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """ Propagates all enqueued literals. Returns the index of a conflicting clause or None. """
+        values = self.values
+        clauses = self.clauses
+        watches = self.watches
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            watch_list = watches[false_lit]
+            i = j = 0
+            n = len(watch_list)
+            while i < n:
+                index = watch_list[i]
+                i += 1
+                clause = clauses[index]
+                # keep the false literal in the second position
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if values[first] is True:
+                    watch_list[j] = index
+                    j += 1
+                    continue
+                # look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if values[clause[k]] is not False:
+                        clause[1], clause[k] = clause[k], false_lit
+                        watches[clause[1]].append(index)
+                        break
+                else:
+                    watch_list[j] = index
+                    j += 1
+                    if values[first] is False:
+                        # conflict, keep the remaining watches and stop
+                        while i < n:
+                            watch_list[j] = watch_list[i]
+                            i += 1
+                            j += 1
+                        del watch_list[j:]
+                        self.qhead = len(trail)
+                        return index
+                    self._enqueue(first, index)
+            del watch_list[j:]
+        return None
+
+    def _analyze(self, conflict):
+        """ Derives a first-UIP learnt clause from a conflict.
+        Returns the learnt clause, the level to backtrack to and its literal block distance.
+        """
+        seen = set()
+        learnt = [None]
+        level = len(self.trail_lim)
+        counter = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in (clause if lit is None else clause[1:]):
+                var = other >> 1
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self._bump(var)
+                    if self.levels[var] >= level:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+            # find the next literal on the trail which is part of the conflict
+            while self.trail[index] >> 1 not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reasons[lit >> 1]]
+        learnt[0] = lit ^ 1
+
+        learnt = self._minimize(learnt)
+        backtrack_level = 0
+        if len(learnt) > 1:
+            # the literal with the highest level is watched along with the asserting literal
+            highest = max(range(1, len(learnt)), key=lambda k: self.levels[learnt[k] >> 1])
+            learnt[1], learnt[highest] = learnt[highest], learnt[1]
+            backtrack_level = self.levels[learnt[1] >> 1]
+        lbd = len(set(self.levels[other >> 1] for other in learnt))
+        return learnt, backtrack_level, lbd
+
+    def _minimize(self, learnt):
+        """ Removes literals implied by the other literals of a learnt clause. """
+        learnt_vars = set(lit >> 1 for lit in learnt)
+        minimized = [learnt[0]]
+        for lit in learnt[1:]:
+            reason = self.reasons[lit >> 1]
+            if reason is None or any(other >> 1 not in learnt_vars and self.levels[other >> 1] > 0
+                                     for other in self.clauses[reason][1:]):
+                minimized.append(lit)
+        return minimized
+
+    def _bump(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            # rescale every activity to avoid overflow
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.var_inc *= 1e-100
+            self.order_heap = [(-self.activity[v], v) for v in range(1, self.n_vars + 1)]
+            heapq.heapify(self.order_heap)
+        else:
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+
+    def _pick_branch_var(self):
+        """ Returns the unassigned variable with the highest activity, or None if all are assigned. """
+        if len(self.order_heap) > 4 * self.n_vars + 64:
+            # drop the stale entries which accumulate as activities are bumped
+            self.order_heap = [(-self.activity[v], v) for v in range(1, self.n_vars + 1)
+                               if self.values[2 * v] is None]
+            heapq.heapify(self.order_heap)
+        heap = self.order_heap
+        while heap:
+            negative_activity, var = heapq.heappop(heap)
+            # skip stale entries left behind when the activity was bumped
+            if self.values[2 * var] is None and -negative_activity == self.activity[var]:
+                return var
+        return None
+
+    def _backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = lit >> 1
+            self.values[lit] = None
+            self.values[lit ^ 1] = None
+            self.reasons[var] = None
+            self.phase[var] = not lit & 1
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def _reduce_learnts(self):
+        """ Removes the half of the learnt clauses with the highest literal block distance.
+        Must be called at decision level 0, where no learnt clause is the reason for a decision.
+        """
+        ranked = sorted(self.learnts, key=lambda index: (self.learnts[index], len(self.clauses[index])))
+        for index in ranked[len(ranked) // 2:]:
+            if self.learnts[index] > 2:
+                self.clauses[index] = None
+                del self.learnts[index]
+        for var in range(1, self.n_vars + 1):
+            reason = self.reasons[var]
+            if reason is not None and self.clauses[reason] is None:
+                self.reasons[var] = None
+        self.watches = [[] for _ in range(2 * self.n_vars + 2)]
+        for index, clause in enumerate(self.clauses):
+            if clause is not None:
+                self.watches[clause[0]].append(index)
+                self.watches[clause[1]].append(index)
+        self.max_learnts = int(self.max_learnts * 1.1)
+
+def luby(i):
+    """ Returns the i-th element (starting at 0) of the luby sequence 1, 1, 2, 1, 1, 2, 4, ... """
+    size, power = 1, 1
+    while size < i + 1:
+        size = 2 * size + 1
+        power *= 2
+    while size - 1 != i:
+        size = (size - 1) // 2
+        power //= 2
+        i %= size
+    return power
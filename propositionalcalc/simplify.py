@@ -0,0 +1,154 @@
+import weakref
+from .proposition import Constant
+from .logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+
+# simplified form of each proposition which has been simplified
+# a proposition which is already simplest maps to _unchanged, so the value never keeps its key alive
+_simplified = weakref.WeakKeyDictionary()
+_unchanged = object()
+
+def simplify(prop):
+    """ Returns an equivalent proposition with the following laws applied until nothing changes:
+    constant folding, double negation, flattening conjunction and disjunction chains,
+    idempotence (x ∧ x = x), complement (x ∧ ¬x = False, x ∨ ¬x = True) and absorption
+    (x ∧ (x ∨ y) = x, x ∨ (x ∧ y) = x), plus the same laws for conditionals and biconditionals.
+    Variables which only appear in parts that simplify away are not in the result.
+    Results are memoized for each node, and the proposition is walked without recursion.
+    """
+    result = _simplify_pass(prop)
+    # a pass builds each node from simplified operands, so this rarely takes more than one more pass
+    while True:
+        again = _simplify_pass(result)
+        if again is result:
+            break
+        result = again
+    if result is not prop:
+        _simplified[prop] = result
+    return result
+
+def _simplify_pass(prop):
+    # simplifies every node of prop bottom up, from the simplified forms of its children
+    # children is None until the node is expanded, then its children are simplified first
+    stack = [(prop, None)]
+    while stack:
+        node, children = stack.pop()
+        if node in _simplified:
+            continue
+        if children is None:
+            children = _children(node)
+            if children:
+                stack.append((node, children))
+                stack.extend((child, None) for child in children)
+                continue
+        result = _simplify_node(node, [_lookup(child) for child in children])
+        _simplified[node] = _unchanged if result is node else result
+    return _lookup(prop)
+
+def _lookup(node):
+    result = _simplified[node]
+    return node if result is _unchanged else result
+
+def _children(node):
+    if isinstance(node, (Conjunction, Disjunction)):
+        # a whole chain is simplified at once from its operands, instead of at every link
+        return _flatten(type(node), node)
+    return node.get_children()
+
+def _simplify_node(node, children):
+    # children are the simplified children of node
+    if isinstance(node, Negation):
+        return negate(children[0])
+    if isinstance(node, Conjunction):
+        return conjoin(children)
+    if isinstance(node, Disjunction):
+        return disjoin(children)
+    if isinstance(node, Conditional):
+        return implies(children[0], children[1])
+    if isinstance(node, Biconditional):
+        return iff(children[0], children[1])
+    return node
+
+def negate(prop):
+    """ Returns the simplified negation of a simplified proposition. """
+    if isinstance(prop, Constant):
+        return Constant(not prop.value)
+    if isinstance(prop, Negation):
+        return prop.proposition
+    return Negation(prop)
+
+def conjoin(operands):
+    """ Returns the simplified conjunction of a list of simplified propositions. """
+    return _chain(Conjunction, Disjunction, operands)
+
+def disjoin(operands):
+    """ Returns the simplified disjunction of a list of simplified propositions. """
+    return _chain(Disjunction, Conjunction, operands)
+
+def _chain(connective, dual, operands):
+    # the neutral constant is dropped and the absorbing constant absorbs the chain
+    absorbing = connective is Disjunction
+    flat = []
+    for operand in operands:
+        flat.extend(_flatten(connective, operand))
+    unique = {}
+    for operand in flat:
+        if isinstance(operand, Constant):
+            if operand.value == absorbing:
+                return operand
+            continue
+        unique.setdefault(operand, None)
+    for operand in unique:
+        # complement
+        if isinstance(operand, Negation) and operand.proposition in unique:
+            return Constant(absorbing)
+    # absorption: an operand which is a dual chain containing another operand is redundant
+    kept = [operand for operand in unique
+            if not (isinstance(operand, dual) and any(inner in unique for inner in _flatten(dual, operand)))]
+    if not kept:
+        return Constant(not absorbing)
+    result = kept[0]
+    for operand in kept[1:]:
+        result = connective(result, operand)
+    return result
+
+def _flatten(connective, prop):
+    # the operands of a chain of one connective, from left to right
+    operands = []
+    stack = [prop]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, connective):
+            stack.append(node.right_proposition)
+            stack.append(node.left_proposition)
+        else:
+            operands.append(node)
+    return operands
+
+def implies(left, right):
+    """ Returns the simplified conditional of two simplified propositions. """
+    if isinstance(left, Constant):
+        return right if left.value else Constant(True)
+    if isinstance(right, Constant):
+        return Constant(True) if right.value else negate(left)
+    if left is right:
+        return Constant(True)
+    if _complements(left, right):
+        # ¬x → x is x and x → ¬x is ¬x
+        return right
+    return Conditional(left, right)
+
+def iff(left, right):
+    """ Returns the simplified biconditional of two simplified propositions. """
+    if isinstance(left, Constant):
+        return right if left.value else negate(right)
+    if isinstance(right, Constant):
+        return left if right.value else negate(left)
+    if left is right:
+        return Constant(True)
+    if _complements(left, right):
+        return Constant(False)
+    return Biconditional(left, right)
+
+def _complements(left, right):
+    return (isinstance(left, Negation) and left.proposition is right) \
+        or (isinstance(right, Negation) and right.proposition is left)
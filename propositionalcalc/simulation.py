@@ -0,0 +1,84 @@
+import random
+from .sat import SATSolver
+from .cnf import TseitinEncoder
+from .bdd import BDD
+
+# number of random assignments simulated at once, each one a bit of every column
+default_samples = 256
+
+def random_columns(var_names, samples = default_samples, rng = None):
+    """ Returns a random bitset column of the given width for each variable name.
+    Row i of the columns is one random assignment of the variables.
+    """
+    if rng is None:
+        rng = random.Random(0)
+    return {name: rng.getrandbits(samples) for name in sorted(var_names)}
+
+def simulate(prop, columns, mask):
+    """ Evaluates a proposition on bitset columns, without recursion. See Proposition.bind. """
+    bound = prop.bind()
+    return bound.evaluate_bitwise([columns[name] for name in bound.var_order], mask)
+
+def get_row(columns, i):
+    """ Returns the assignment in row i of bitset columns as a dictionary. """
+    return {name: (col >> i) & 1 == 1 for name, col in columns.items()}
+
+def lowest_row(col):
+    """ Returns the index of the first row which is true in a non-zero bitset column. """
+    return (col & -col).bit_length() - 1
+
+def sample_counterexample(premises, conclusion, samples = default_samples, rng = None):
+    """ Looks for an assignment where all premises are true and the conclusion is false
+    among random assignments simulated bit-parallel.
+    Returns
+    -------
+    counterexample: an assignment of the variables of the propositions, or None if no
+                    sampled assignment is a counterexample, which proves nothing.
+    """
+    var_names = set(conclusion.get_var_names())
+    for premise in premises:
+        var_names |= premise.get_var_names()
+    columns = random_columns(var_names, samples, rng)
+    mask = (1 << samples) - 1
+    col = mask ^ simulate(conclusion, columns, mask)
+    for premise in premises:
+        if not col:
+            return None
+        col &= simulate(premise, columns, mask)
+    return get_row(columns, lowest_row(col)) if col else None
+
+def find_model(prop, engine = 'sat', samples = default_samples):
+    """ Returns an assignment of the variables of a proposition which makes it true,
+    or None if it is unsatisfiable.
+    Random assignments are simulated first, which quickly finds a model of a proposition
+    with many of them. Only if none is found is the exact engine run.
+    Params
+    ------
+    engine: the exact engine, 'sat' or 'bdd'.
+    samples: the number of random assignments to simulate, 0 to go straight to the engine.
+    """
+    if engine not in ('sat', 'bdd'):
+        raise ValueError("Unknown engine ", engine)
+    var_names = prop.get_var_names()
+    prop = prop.simplify()
+    if samples > 0:
+        columns = random_columns(var_names, samples)
+        col = simulate(prop, columns, (1 << samples) - 1)
+        if col:
+            return get_row(columns, lowest_row(col))
+
+    if engine == 'sat':
+        solver = SATSolver()
+        encoder = TseitinEncoder(solver)
+        encoder.add_proposition(prop)
+        if not solver.solve():
+            return None
+        model = solver.get_model()
+        model = {name: model[var] for name, var in encoder.var_ids.items()}
+    else:
+        bdd = BDD()
+        model = bdd.get_model(bdd.from_proposition(prop))
+        if model is None:
+            return None
+    # variables which simplified away can take any value
+    return {name: model.get(name, False) for name in sorted(var_names)}
@@ -1,11 +1,21 @@
 import unittest
 
 from .testargument import TestArgument
+from .testbdd import TestBDD
+from .testcnf import TestCNF
+from .testflatast import TestFlatAST
+from .testinstrumentation import TestInstrumentation
+from .testknowledgebase import TestKnowledgeBase
+from .testmodelcount import TestModelCount
 from .testparser import TestParser
+from .testpipeline import TestPipeline
 from .testproposition import TestProposition
+from .testsat import TestSAT
+from .testsimplify import TestSimplify
 from .testtruthtable import TestTruthTable
+from .testunionfind import TestUnionFind
 
-test_cases = [TestArgument, TestParser, TestProposition, TestTruthTable]
+test_cases = [TestArgument, TestBDD, TestCNF, TestFlatAST, TestInstrumentation, TestKnowledgeBase, TestModelCount, TestParser, TestPipeline, TestProposition, TestSAT, TestSimplify, TestTruthTable, TestUnionFind]
 test_suite = unittest.TestSuite()
 
 for test_case in test_cases:
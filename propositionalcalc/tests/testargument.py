@@ -1,5 +1,6 @@
+import threading
 import unittest
-from ..argument import Argument
+from ..argument import Argument, split_premises, set_stop_event, find_counterexample_row
 from ..propositionparser import parse_proposition as parse
 
 class TestArgument(unittest.TestCase):
@@ -97,10 +98,206 @@ class TestArgument(unittest.TestCase):
         argument = Argument([parse('p <-> q'), parse('r || q'), parse('~r')], parse('p'))
         self.assertTrue(argument.is_valid())
 
+    def test_engines(self):
+        arguments = [
+            Argument([parse('p -> q')], parse('q -> p')),
+            Argument([parse('p -> q'), parse('q -> r')], parse('p -> r')),
+            Argument([parse("p -> (q || ~r)"), parse("q -> (p & r)")], parse('p->r')),
+            Argument([parse('~p & q'), parse('r -> q'), parse('~r -> s'), parse('s -> t')], parse('t')),
+            Argument([parse('p & ~p')], parse('q')),
+            Argument([], parse('p || true')),
+        ]
+        for arg in arguments:
+            for engine in Argument.engines:
+                # with and without the random simulation before the engine
+                arg.simulation_samples = 256
+                expected = arg.is_valid('truthtable')
+                self.assertEqual(arg.is_valid(engine), expected)
+                arg.simulation_samples = 0
+                self.assertEqual(arg.is_valid(engine), expected)
+        self.assertRaises(ValueError, arguments[0].is_valid, 'unknown')
 
-        
+    def test_counterexample(self):
+        argument = Argument([parse("p -> (q || ~r)"), parse("q -> (p & r)")], parse('p->r'))
+        argument.simulation_samples = 0
+        for engine in Argument.engines:
+            counterexample = argument.get_counterexample(engine)
+            self.assertEqual(set(counterexample), {'p', 'q', 'r'})
+            for premise in argument.premises:
+                self.assertTrue(premise.evaluate(counterexample))
+            self.assertFalse(argument.conclusion.evaluate(counterexample))
+        self.assertIsNone(Argument([parse('p->q'), parse('p')], parse('q')).get_counterexample())
+
+    def test_workers(self):
+        valid = Argument([parse("p -> (q || ~r)"), parse("q -> (p & r)"), parse('r <-> t')], parse('(p & t) <-> q'))
+        self.assertTrue(valid.is_valid('truthtable', workers=2))
+        invalid = Argument([parse("p -> (q || ~r)"), parse("q -> (p & r)")], parse('p->r'))
+        self.assertFalse(invalid.is_valid('truthtable', workers=3))
+        counterexample = invalid.get_counterexample('truthtable', workers=2)
+        self.assertFalse(invalid.conclusion.evaluate(counterexample))
+        # the premise groups which share no variables with the conclusion are checked by the same pool
+        groups = Argument([parse('a -> b'), parse('c || d'), parse('e <-> f'), parse('p -> q')], parse('p -> (q || r)'))
+        self.assertTrue(groups.is_valid('truthtable', workers=2))
+        groups = Argument([parse('a -> b'), parse('c || d'), parse('p -> q')], parse('q -> p'))
+        self.assertFalse(groups.is_valid('truthtable', workers=2))
+        counterexample = groups.get_counterexample('truthtable', workers=2)
+        self.assertEqual(set(counterexample), {'a', 'b', 'c', 'd', 'p', 'q'})
+        for premise in groups.premises:
+            self.assertTrue(premise.evaluate(counterexample))
+        self.assertFalse(groups.conclusion.evaluate(counterexample))
+
+    def test_stop_event(self):
+        # a worker stops checking rows once another worker has found a counterexample
+        event = threading.Event()
+        set_stop_event(event)
+        try:
+            premises, conclusion = [parse('p -> q')], parse('q -> p')
+            self.assertEqual(find_counterexample_row(['p', 'q'], premises, conclusion), 1)
+            event.set()
+            self.assertIsNone(find_counterexample_row(['p', 'q'], premises, conclusion))
+        finally:
+            set_stop_event(None)
+
+    def test_many_variables(self):
+        # a chain of 40 implications is far too large for a truth table
+        names = ['v' + chr(ord('a') + i // 26) + chr(ord('a') + i % 26) for i in range(41)]
+        premises = [parse(a + ' -> ' + b) for a, b in zip(names, names[1:])]
+        argument = Argument(premises, parse(names[0] + ' -> ' + names[-1]))
+        self.assertTrue(argument.is_valid())
+        self.assertIsNone(argument.truth_table)
+        argument = Argument(premises, parse(names[-1] + ' -> ' + names[0]))
+        self.assertFalse(argument.is_valid())
+
+        # the diagram of a chain of 1500 implications is deeper than the recursion limit
+        names = ['v' + chr(ord('a') + i // 676) + chr(ord('a') + i // 26 % 26) + chr(ord('a') + i % 26)
+                 for i in range(1500)]
+        premises = [parse(a + ' -> ' + b) for a, b in zip(names, names[1:])]
+        self.assertTrue(Argument(premises, parse(names[0] + ' -> ' + names[-1])).is_valid('bdd'))
+        self.assertFalse(Argument(premises, parse(names[-1] + ' -> ' + names[0])).is_valid('bdd'))
+
+    def test_incremental(self):
+        argument = Argument([parse('p -> q')], parse('p -> r'))
+        self.assertFalse(argument.is_valid())
+        argument.add_premise(parse('q -> r'))
+        self.assertTrue(argument.is_valid())
+        self.assertEqual(argument.variables, {'p', 'q', 'r'})
+        argument.set_conclusion(parse('r -> p'))
+        self.assertFalse(argument.is_valid())
+        counterexample = argument.get_counterexample()
+        self.assertEqual(set(counterexample), {'p', 'q', 'r'})
+        self.assertFalse(argument.conclusion.evaluate(counterexample))
+        argument.set_conclusion(parse('p -> r'))
+        argument.remove_premise(parse('q -> r'))
+        self.assertFalse(argument.is_valid())
+        self.assertRaises(ValueError, argument.remove_premise, parse('q -> r'))
+        # the premise p & ~p makes every argument valid until it is removed
+        argument.add_premise(parse('p & ~p'))
+        self.assertTrue(argument.is_valid())
+        argument.remove_premise(parse('p & ~p'))
+        self.assertFalse(argument.is_valid())
+        self.assertEqual(argument.get_truth_table().n_vars, 3)
+
+        # the engines agree after edits
+        argument.add_premise(parse('q -> r'))
+        for engine in Argument.engines:
+            self.assertTrue(argument.is_valid(engine))
+
+    def test_incremental_many_variables(self):
+        # re-checking after each edit of a long chain reuses one solver
+        names = ['v' + chr(ord('a') + i // 26) + chr(ord('a') + i % 26) for i in range(101)]
+        argument = Argument([], parse(names[0] + ' -> ' + names[-1]))
+        # without simulation, the invalid arguments are also checked by the solver
+        argument.simulation_samples = 0
+        solver = None
+        for a, b in zip(names, names[1:]):
+            self.assertFalse(argument.is_valid())
+            solver = solver or argument.solver
+            argument.add_premise(parse(a + ' -> ' + b))
+        self.assertTrue(argument.is_valid())
+        self.assertIs(argument.solver, solver)
+        argument.remove_premise(parse(names[50] + ' -> ' + names[51]))
+        self.assertFalse(argument.is_valid())
+
+    def test_incremental_growth(self):
+        # premises which are added again reuse their encoding
+        argument = Argument([parse('a -> b')], parse('a -> c'))
+        argument.simulation_samples = 0
+        self.assertFalse(argument.is_valid())
+        argument.add_premise(parse('b -> c'))
+        self.assertTrue(argument.is_valid())
+        n_vars = argument.solver.n_vars
+        for _ in range(10):
+            argument.remove_premise(parse('b -> c'))
+            self.assertFalse(argument.is_valid())
+            argument.add_premise(parse('b -> c'))
+            self.assertTrue(argument.is_valid())
+        self.assertEqual(argument.solver.n_vars, n_vars)
+        argument.remove_premise(parse('b -> c'))
+
+        # the solver is rebuilt before the encodings of removed premises dominate it
+        argument.max_retired = 64
+        solvers = set()
+        for i in range(300):
+            premise = parse('(b & x{0}) -> (c || ~x{0})'.format(chr(ord('a') + i % 26)) + ' & (y -> b)' * (i % 3))
+            argument.add_premise(premise)
+            self.assertFalse(argument.is_valid())
+            argument.add_premise(parse('b -> c'))
+            self.assertTrue(argument.is_valid())
+            argument.remove_premise(premise)
+            argument.remove_premise(parse('b -> c'))
+            solvers.add(id(argument.solver))
+            self.assertLessEqual(argument.solver.n_vars, 4 * argument.max_retired)
+        self.assertGreater(len(solvers), 1)
+        self.assertFalse(argument.is_valid())
+        # the encoder does not remember the guarded propositions
+        self.assertEqual(argument.encoder.literals, {})
+
+    def test_simulation(self):
+        # a wide invalid argument is answered from the random assignments
+        names = ['v' + chr(ord('a') + i // 26) + chr(ord('a') + i % 26) for i in range(60)]
+        argument = Argument([parse(' || '.join(names[:30])), parse(' || '.join(names[30:]))], parse(names[0]))
+        argument.simulation_samples = 64
+        counterexample = argument.get_counterexample('truthtable')
+        self.assertEqual(len(counterexample), 60)
+        self.assertFalse(argument.conclusion.evaluate(counterexample))
+        for premise in argument.premises:
+            self.assertTrue(premise.evaluate(counterexample))
+        self.assertIsNone(argument.solver)
+
+    def test_components(self):
+        premises = [parse('a -> b'), parse('b -> c'), parse('x || y'), parse('y -> z'), parse('q'), parse('true')]
+        related, unrelated = split_premises(premises, parse('a -> c'))
+        self.assertEqual(related, premises[:2])
+        self.assertEqual(unrelated, [premises[2:4], premises[4:5], premises[5:]])
+
+        # an unsatisfiable premise unrelated to the conclusion makes the argument valid
+        argument = Argument([parse('p -> q'), parse('x & ~y'), parse('y || ~x')], parse('q -> p'))
+        for engine in Argument.engines:
+            self.assertTrue(argument.is_valid(engine))
+        argument.add_premise(parse('false'))
+        self.assertTrue(argument.is_valid('truthtable'))
 
+        argument = Argument([parse('p -> q'), parse('x & ~y'), parse('y || z'), parse('r')], parse('q -> p'))
+        for engine in Argument.engines:
+            counterexample = argument.get_counterexample(engine)
+            self.assertEqual(set(counterexample), {'p', 'q', 'r', 'x', 'y', 'z'})
+            for premise in argument.premises:
+                self.assertTrue(premise.evaluate(counterexample))
+            self.assertFalse(argument.conclusion.evaluate(counterexample))
 
+    def test_clusters(self):
+        # six unrelated clusters of 10 variables are six small tables instead of one with 2^60 rows
+        premises = []
+        for cluster in 'abcdef':
+            names = ['v' + cluster + chr(ord('a') + i) for i in range(10)]
+            premises.extend(parse(a + ' -> ' + b) for a, b in zip(names, names[1:]))
+        valid = Argument(premises, parse('vaa -> vaj'))
+        self.assertTrue(valid.is_valid('truthtable'))
+        invalid = Argument(premises, parse('vaj -> vaa'))
+        counterexample = invalid.get_counterexample('truthtable')
+        self.assertEqual(len(counterexample), 60)
+        for premise in premises:
+            self.assertTrue(premise.evaluate(counterexample))
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
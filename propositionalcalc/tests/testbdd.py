@@ -0,0 +1,83 @@
+import unittest
+from ..bdd import BDD
+from ..proposition import Variable
+from ..logicalconnective import Conjunction, Conditional
+from ..truthtable import TruthTable
+from ..propositionparser import parse_proposition as parse
+
+class TestBDD(unittest.TestCase):
+
+    def test_canonical(self):
+        bdd = BDD()
+        f = bdd.from_proposition(parse('p -> q'))
+        g = bdd.from_proposition(parse('~q -> ~p'))
+        h = bdd.from_proposition(parse('~p || q'))
+        self.assertTrue(bdd.is_equivalent(f, g))
+        self.assertEqual(g, h)
+        self.assertFalse(bdd.is_equivalent(f, bdd.from_proposition(parse('q -> p'))))
+        self.assertTrue(bdd.is_tautology(bdd.from_proposition(parse('(p -> q) <-> (~p || q)'))))
+        self.assertFalse(bdd.is_satisfiable(bdd.from_proposition(parse('p & ~p'))))
+        self.assertEqual(bdd.size(bdd.from_proposition(parse('p & ~p'))), 1)
+
+    def test_count_models(self):
+        props = ['p -> q', '(p <-> q) & (q || r)', '~(a & b) & (c || true)', 'false']
+        for string in props:
+            prop = parse(string)
+            bdd = BDD()
+            node = bdd.from_proposition(prop)
+            table = prop.get_truth_table()
+            self.assertEqual(bdd.count_models(node, table.n_vars),
+                             bin(table.get_proposition_bitset(prop)).count('1'))
+        # only the variables at the first n_vars levels are counted
+        bdd = BDD(['p', 'q', 'r'])
+        node = bdd.from_proposition(parse('p -> q'))
+        self.assertEqual(bdd.count_models(node, 2), 3)
+        self.assertEqual(bdd.count_models(node), 6)
+        self.assertRaises(ValueError, bdd.count_models, node, 1)
+        self.assertRaises(ValueError, bdd.count_models, bdd.from_proposition(parse('r')), 2)
+
+    def test_many_variables(self):
+        # an implication chain over 300 variables has a linear size diagram
+        names = ['v' + chr(ord('a') + i // 26 // 26) + chr(ord('a') + i // 26 % 26) + chr(ord('a') + i % 26)
+                 for i in range(300)]
+        bdd = BDD(names, cache_size=64)
+        chain = Conditional(Variable(names[0]), Variable(names[1]))
+        for a, b in zip(names[1:], names[2:]):
+            chain = Conjunction(chain, Conditional(Variable(a), Variable(b)))
+        node = bdd.from_proposition(chain)
+        self.assertLessEqual(len(bdd.cache), 64)
+        # the satisfying assignments are a run of false variables followed by true variables
+        self.assertEqual(bdd.count_models(node), 301)
+        model = bdd.get_model(node)
+        self.assertTrue(chain.evaluate(model))
+        conclusion = bdd.from_proposition(Conditional(Variable(names[0]), Variable(names[-1])))
+        self.assertTrue(bdd.is_tautology(bdd.implies(node, conclusion)))
+
+    def test_deep(self):
+        # a diagram with a node for each of 3000 variables is counted and evaluated without recursion
+        names = ['v' + str(i) for i in range(3000)]
+        prop = Variable(names[-1])
+        for name in reversed(names[:-1]):
+            prop = Conjunction(Variable(name), prop)
+        bdd = BDD(names)
+        node = bdd.from_proposition(prop)
+        self.assertEqual(bdd.size(node), 3002)
+        self.assertEqual(bdd.count_models(node), 1)
+        columns = {name: 0b10 for name in names}
+        columns[names[0]] = 0b11
+        self.assertEqual(bdd.to_bitset(node, columns, 0b11), 0b10)
+        # operations on it walk every level without recursion as well
+        negated = bdd.negate(node)
+        self.assertEqual(bdd.count_models(negated), (1 << 3000) - 1)
+        self.assertEqual(bdd.conjoin(node, negated), BDD.FALSE)
+        self.assertTrue(bdd.is_tautology(bdd.iff(negated, bdd.negate(node))))
+
+    def test_truth_table_engine(self):
+        prop = parse('(x <-> y) & (~y || (x -> z))')
+        table = TruthTable(['x', 'y', 'z'])
+        bitwise_col = prop.evaluate_bitwise(table.columns, table.mask)
+        self.assertEqual(prop.get_truth_table('bdd').get_proposition_bitset(prop), bitwise_col)
+        self.assertRaises(ValueError, prop.get_truth_table, 'unknown')
+
+if __name__ == '__main__':
+    unittest.main()
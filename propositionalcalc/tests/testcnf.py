@@ -0,0 +1,91 @@
+import io
+import itertools
+import unittest
+from ..cnf import CNF, TseitinEncoder, read_dimacs, to_cnf
+from ..sat import SATSolver
+from ..propositionparser import parse_proposition as parse
+
+class TestCNF(unittest.TestCase):
+
+    def test_equisatisfiable(self):
+        props = ['(p <-> q) & (q -> r)', '~(p || q) & (p -> q)', '(p & ~p) || (q & ~q)',
+                 'p <-> ~p', '~(a & b) <-> (~a || ~b)', 'true & (false || x)']
+        for string in props:
+            prop = parse(string)
+            names = sorted(prop.get_var_names())
+            satisfiable = any(prop.evaluate(dict(zip(names, values)))
+                              for values in itertools.product([False, True], repeat=len(names)))
+            solver = to_cnf(prop).to_solver()
+            self.assertEqual(solver.solve(), satisfiable, string)
+
+    def test_models(self):
+        # every assignment of the proposition variables extends to a model exactly when it satisfies the proposition
+        prop = parse('(p -> (q || ~r)) & (q -> (p & r))')
+        cnf = to_cnf(prop)
+        var_ids = cnf.get_var_ids()
+        for values in itertools.product([False, True], repeat=3):
+            assignment = dict(zip(['p', 'q', 'r'], values))
+            solver = cnf.to_solver()
+            assumptions = [var_ids[name] if value else -var_ids[name] for name, value in assignment.items()]
+            self.assertEqual(solver.solve(assumptions), prop.evaluate(assignment))
+
+    def test_shared_subformulas(self):
+        cnf = CNF()
+        encoder = TseitinEncoder(cnf)
+        guard = '~(movie || hiking)'
+        first = encoder.encode(parse('tennis -> ' + guard))
+        n_vars = cnf.n_vars
+        second = encoder.encode(parse('tennis -> ' + guard))
+        self.assertEqual(first, second)
+        self.assertEqual(cnf.n_vars, n_vars)
+        self.assertEqual(encoder.encode(parse('hiking || movie')), encoder.encode(parse('movie || hiking')))
+
+    def test_guarded(self):
+        solver = SATSolver()
+        encoder = TseitinEncoder(solver)
+        encoder.add_proposition(parse('p -> q'))
+        n_literals = len(encoder.literals)
+        guard = solver.new_var()
+        lit = encoder.encode_guarded(parse('(p -> q) & ~q & r'), guard)
+        # the subformula p -> q of the premise is reused, the new ones are not remembered
+        self.assertEqual(len(encoder.literals), n_literals)
+        self.assertTrue(solver.solve([guard, lit]))
+        model = solver.get_model()
+        self.assertEqual((model[encoder.var_ids['q']], model[encoder.var_ids['r']]), (False, True))
+        self.assertFalse(solver.solve([guard, lit, encoder.var_ids['p']]))
+        # once retired, the clauses no longer constrain the literal
+        solver.add_clause([-guard])
+        self.assertTrue(solver.solve([lit, encoder.var_ids['q']]))
+
+    def test_deep(self):
+        prop = parse(' -> '.join(['a', '~b', 'c'] * 2000))
+        solver = SATSolver()
+        encoder = TseitinEncoder(solver)
+        encoder.add_proposition(prop)
+        self.assertTrue(solver.solve())
+        model = solver.get_model()
+        self.assertTrue(prop.evaluate({name: model[var] for name, var in encoder.var_ids.items()}))
+
+    def test_dimacs_round_trip(self):
+        cnf = to_cnf([parse('raining -> (wet & ~sunny)'), parse('wet <-> ~tennis')])
+        file = io.StringIO()
+        cnf.to_dimacs(file)
+        file.seek(0)
+        read = CNF.from_dimacs(file)
+        self.assertEqual(read.n_vars, cnf.n_vars)
+        self.assertEqual(read.clauses, cnf.clauses)
+        self.assertEqual(read.get_var_ids(), cnf.get_var_ids())
+        self.assertEqual(set(read.names.values()), {'raining', 'wet', 'sunny', 'tennis'})
+
+    def test_read_dimacs(self):
+        text = 'c a comment\np cnf 3 2\n1 -2\n 3 0 -1 0\n'
+        items = list(read_dimacs(io.StringIO(text)))
+        self.assertEqual(items, [('header', 3, 2), ('clause', [1, -2, 3]), ('clause', [-1])])
+        self.assertRaises(ValueError, CNF().add_clause, [1])
+        solver = SATSolver()
+        CNF.from_dimacs(io.StringIO(text)).to_solver(solver)
+        self.assertTrue(solver.solve())
+        self.assertFalse(solver.get_model()[1])
+
+if __name__ == '__main__':
+    unittest.main()
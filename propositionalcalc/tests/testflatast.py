@@ -0,0 +1,70 @@
+import itertools
+import unittest
+from ..flatast import FlatProposition, IncrementalEvaluator, VariableTable, VARIABLE
+from ..proposition import Variable
+from ..logicalconnective import Conjunction, Disjunction
+from ..propositionparser import parse_proposition as parse
+
+class TestFlatAST(unittest.TestCase):
+
+    def test_round_trip(self):
+        for string in ['p', 'true', '~(p -> q) <-> (r || false)', '(x <-> y) & (~y || (x -> z))']:
+            prop = parse(string)
+            flat = FlatProposition.from_proposition(prop)
+            self.assertIs(flat.to_proposition(), prop)
+            self.assertEqual(flat.get_var_names(), prop.get_var_names())
+
+    def test_evaluate(self):
+        prop = parse('(x <-> y) & (~y || (x -> z)) & ~false')
+        flat = FlatProposition.from_proposition(prop)
+        for values in itertools.product([False, True], repeat=3):
+            assignment = dict(zip(['X', 'y', 'z'], values))
+            self.assertEqual(flat.evaluate(assignment), prop.evaluate(assignment))
+        table = prop.get_truth_table()
+        self.assertEqual(flat.evaluate_bitwise(table.columns, table.mask), table.get_proposition_bitset(prop))
+        self.assertRaises(ValueError, flat.evaluate, {'x': True})
+
+    def test_shared_subformulas(self):
+        guard = parse('~(movie || hiking)')
+        prop = Conjunction(Disjunction(guard, Variable('tennis')), guard)
+        flat = FlatProposition.from_proposition(prop)
+        # movie, hiking, the disjunction, the negation, tennis, the outer disjunction and the conjunction
+        self.assertEqual(len(flat), 7)
+        self.assertEqual(list(flat.opcodes).count(VARIABLE), 3)
+
+    def test_bytes(self):
+        table = VariableTable()
+        prop = parse('a -> (b <-> ~c)')
+        flat = FlatProposition.from_proposition(prop, table)
+        self.assertEqual(table.names, ['a', 'b', 'c'])
+        copy = FlatProposition.from_bytes(flat.to_bytes(), table)
+        self.assertEqual(copy.opcodes, flat.opcodes)
+        self.assertEqual(copy.right, flat.right)
+        self.assertIs(copy.to_proposition(), prop)
+
+    def test_deep(self):
+        prop = parse(' || '.join(['a', 'b'] * 20000))
+        flat = FlatProposition.from_proposition(prop)
+        self.assertTrue(flat.evaluate({'a': False, 'b': True}))
+        self.assertIs(flat.to_proposition(), prop)
+
+    def test_incremental(self):
+        props = [parse('(x <-> y) & (~y || (x -> z)) & ~false'), parse('~y || (x -> z)'), parse('x & x')]
+        evaluator = IncrementalEvaluator(props, ['x', 'y', 'z'])
+        values = [False, False, False]
+        self.assertEqual(evaluator.get_values(), [prop.evaluate({'x': False, 'y': False, 'z': False}) for prop in props])
+        for slot in [0, 2, 1, 2, 0, 0, 1, 1, 2]:
+            evaluator.flip(slot)
+            values[slot] = not values[slot]
+            assignment = dict(zip(['x', 'y', 'z'], values))
+            self.assertEqual(evaluator.get_values(), [prop.evaluate(assignment) for prop in props])
+        evaluator.reset([True, True, True])
+        self.assertEqual(evaluator.get_values(), [True, True, True])
+        self.assertRaises(ValueError, IncrementalEvaluator, props, ['x', 'y'])
+
+    def test_slots(self):
+        for prop in [Variable('a'), parse('true'), parse('~a'), parse('a & b')]:
+            self.assertFalse(hasattr(prop, '__dict__'))
+
+if __name__ == '__main__':
+    unittest.main()
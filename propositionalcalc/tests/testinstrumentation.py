@@ -0,0 +1,86 @@
+import threading
+import unittest
+from .. import instrumentation
+from ..argument import Argument
+from ..logicalconnective import Conjunction, Negation, Biconditional
+from ..proposition import Variable
+from ..propositionparser import parse_proposition as parse
+from ..truthtable import TruthTable
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_disabled(self):
+        self.assertIsNone(instrumentation.active)
+        parse('p -> q')
+        self.assertIsNone(instrumentation.active)
+
+    def test_parse(self):
+        with instrumentation.enabled() as stats:
+            self.assertIs(instrumentation.active, stats)
+            parse('p -> q')
+            parse('(a & b) || c')
+        self.assertIsNone(instrumentation.active)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['parse_calls'], 2)
+        self.assertGreater(snapshot['parse_tokenize_seconds'], 0)
+        self.assertGreater(snapshot['parse_build_seconds'], 0)
+        # calls outside the block are not recorded
+        parse('p')
+        self.assertEqual(stats.snapshot()['parse_calls'], 2)
+
+    def test_evaluations(self):
+        x, y = Variable('x'), Variable('y')
+        shared = Negation(x)
+        prop = Biconditional(shared, Conjunction(shared, y))
+        with instrumentation.enabled() as stats:
+            prop.evaluate({'x': False, 'y': True})
+        # the bound program evaluates the shared negation once
+        self.assertEqual(stats.snapshot()['node_evaluations'],
+                         {'Variable': 2, 'Negation': 1, 'Conjunction': 1, 'Biconditional': 1})
+
+        with instrumentation.enabled() as stats:
+            table = TruthTable(['x', 'y'])
+            table.add_proposition(prop)
+        snapshot = stats.snapshot()
+        # the bitwise evaluation computes the shared negation once as well
+        self.assertEqual(snapshot['node_evaluations'], {'Variable': 2, 'Negation': 1, 'Conjunction': 1, 'Biconditional': 1})
+        self.assertEqual(snapshot['truth_table_columns'], 3)
+        self.assertEqual(snapshot['truth_table_rows'], 8)
+
+        with instrumentation.enabled() as stats:
+            table = TruthTable(['x', 'y'], streaming=True)
+            table.add_proposition(prop)
+            list(table.iter_chunks(chunk_bits=1))
+        snapshot = stats.snapshot()
+        # the variable columns and the proposition share their variable nodes
+        self.assertEqual(snapshot['node_evaluations'], {'Variable': 4, 'Negation': 2, 'Conjunction': 2, 'Biconditional': 2})
+        self.assertEqual(snapshot['truth_table_columns'], 6)
+
+    def test_arguments(self):
+        stats = instrumentation.Stats(track_memory=True)
+        stats.max_slowest_arguments = 2
+        with instrumentation.enabled(stats):
+            for i in range(3):
+                Argument([parse('p -> q'), parse('p')], parse('q')).is_valid()
+            Argument([parse('p -> q')], parse('q -> p')).is_valid('truthtable')
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['argument_checks'], 4)
+        self.assertGreater(snapshot['argument_peak_memory'], 0)
+        self.assertEqual(len(snapshot['slowest_arguments']), 2)
+        seconds, peak_memory, description = snapshot['slowest_arguments'][0]
+        self.assertGreaterEqual(seconds, snapshot['slowest_arguments'][1][0])
+        self.assertIn('∴', description)
+        stats.reset()
+        self.assertEqual(stats.snapshot()['argument_checks'], 0)
+
+    def test_enable(self):
+        stats = instrumentation.enable()
+        try:
+            # the stats are shared by every thread and can be polled while recording
+            thread = threading.Thread(target=parse, args=('p & q',))
+            thread.start()
+            thread.join()
+            self.assertEqual(stats.snapshot()['parse_calls'], 1)
+        finally:
+            instrumentation.disable()
+        self.assertIsNone(instrumentation.active)
@@ -0,0 +1,83 @@
+import threading
+import unittest
+from ..knowledgebase import KnowledgeBase
+from ..argument import Argument
+from ..propositionparser import parse_proposition as parse
+from .. import instrumentation
+
+class TestKnowledgeBase(unittest.TestCase):
+
+    def setUp(self):
+        self.premises = [parse("raining -> (wet & ~sunny)"), parse("~raining -> ~wet"),
+                         parse("wet <-> cancelled"), parse("~cancelled -> ~(movie || hiking)")]
+        self.conclusions = [parse(string) for string in
+                            ["movie -> ~sunny", "raining", "wet -> raining", "hiking -> cancelled",
+                             "sunny -> ~movie", "cancelled || tennis", "true", "false", "tennis || ~tennis"]]
+
+    def test_entails(self):
+        for engine in KnowledgeBase.engines:
+            kb = KnowledgeBase(self.premises, engine)
+            for conclusion in self.conclusions:
+                argument = Argument(self.premises, conclusion)
+                self.assertEqual(kb.entails(conclusion), argument.is_valid('truthtable'))
+                counterexample = kb.get_counterexample(conclusion)
+                if counterexample is not None:
+                    self.assertEqual(set(counterexample), argument.variables)
+                    self.assertFalse(conclusion.evaluate(counterexample))
+                    for premise in self.premises:
+                        self.assertTrue(premise.evaluate(counterexample))
+        self.assertRaises(ValueError, KnowledgeBase, self.premises, 'truthtable')
+
+    def test_known_models(self):
+        kb = KnowledgeBase(self.premises)
+        self.assertEqual(kb.n_models, 1)
+        self.assertFalse(kb.entails(parse("raining")))
+        self.assertFalse(kb.entails(parse("~raining")))
+        # both models are kept, and refute these without the solver
+        self.assertEqual(kb.n_models, 2)
+        with instrumentation.enabled() as stats:
+            self.assertEqual(kb.entails_many([parse("wet"), parse("~wet"), parse("wet -> raining")]),
+                             [False, False, True])
+        self.assertEqual(stats.snapshot()['argument_checks'], 1)
+
+    def test_inconsistent(self):
+        kb = KnowledgeBase([parse("p"), parse("p -> q"), parse("~q")])
+        self.assertTrue(kb.entails(parse("r")))
+        self.assertTrue(KnowledgeBase([parse("false")], 'bdd').entails(parse("r")))
+        self.assertEqual(kb.entails_many([parse("r"), parse("~r")]), [True, True])
+
+    def test_many_queries(self):
+        # conclusions do not grow the engine for good, it is rebuilt once they have added too much
+        names = ['raining', 'wet', 'sunny', 'cancelled', 'movie', 'hiking', 'tennis']
+        conclusions = [parse('(' + a + ' -> ' + b + ') || (' + c + ' & ~' + a + ')')
+                       for a in names for b in names for c in names]
+        for engine in KnowledgeBase.engines:
+            kb = KnowledgeBase(self.premises, engine)
+            kb.max_retired = 64
+            kb.max_models = 0
+            n_literals = len(kb.encoder.literals) if engine == 'sat' else None
+            for conclusion in conclusions:
+                self.assertEqual(kb.entails(conclusion), Argument(self.premises, conclusion).is_valid('truthtable'))
+                if engine == 'sat':
+                    self.assertLessEqual(kb.solver.n_vars, 2 * kb.premise_size + 64 + 16)
+                    self.assertEqual(len(kb.encoder.literals), n_literals)
+                else:
+                    self.assertLessEqual(len(kb.bdd.levels), 2 * kb.premise_size + 64 + 64)
+
+    def test_threads(self):
+        kb = KnowledgeBase(self.premises)
+        expected = [Argument(self.premises, conclusion).is_valid() for conclusion in self.conclusions]
+        results = []
+
+        def query():
+            results.append(kb.entails_many(self.conclusions))
+            results.append([kb.entails(conclusion) for conclusion in self.conclusions])
+        threads = [threading.Thread(target=query) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [expected] * 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import inspect
+import random
+import sys
+import unittest
+from ..proposition import Variable, Constant
+from ..logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+from ..argument import Argument
+from ..modelcount import ModelCounter, count_models, clause_literals
+from ..truthtable import TruthTable
+from ..cnf import to_cnf
+
+def random_proposition(rng, var_names, depth):
+    if depth == 0 or rng.random() < 0.2:
+        return Variable(rng.choice(var_names))
+    if rng.random() < 0.2:
+        return Negation(random_proposition(rng, var_names, depth - 1))
+    connective = rng.choice([Conjunction, Disjunction, Conditional, Biconditional])
+    return connective(random_proposition(rng, var_names, depth - 1), random_proposition(rng, var_names, depth - 1))
+
+class TestModelCount(unittest.TestCase):
+
+    def test_count_clauses(self):
+        counter = ModelCounter()
+        self.assertEqual(counter.count([], 3), 8)
+        self.assertEqual(counter.count([[1, 2]], 2), 3)
+        self.assertEqual(counter.count([[1, 2], [-1], [-2]], 2), 0)
+        self.assertEqual(counter.count([[1, -1]], 1), 2)
+        self.assertEqual(counter.count([[1], [2, 3]], 4), 6)
+        self.assertEqual(counter.count([[]], 1), 0)
+        self.assertRaises(ValueError, counter.count, [[1, 3]], 2)
+
+    def test_random(self):
+        rng = random.Random(0)
+        var_names = ['a', 'b', 'c', 'd', 'e']
+        for _ in range(200):
+            prop = random_proposition(rng, var_names, 4)
+            table = TruthTable(prop.get_var_names())
+            table.add_proposition(prop)
+            expected = bin(table.get_proposition_bitset(prop)).count('1')
+            self.assertEqual(prop.count_models(), expected)
+            self.assertEqual(prop.count_models(var_names), expected << (5 - table.n_vars))
+
+    def test_constants(self):
+        self.assertEqual(Constant(True).count_models(), 1)
+        self.assertEqual(Constant(False).count_models(), 0)
+        self.assertEqual(Constant(True).count_models(['x', 'y']), 4)
+        self.assertEqual(count_models([Variable('x'), Negation(Variable('x'))]), 0)
+        self.assertEqual(Conjunction(Variable('x'), Disjunction(Constant(False), Constant(False))).count_models(), 0)
+        self.assertEqual(Conjunction(Variable('x'), Disjunction(Constant(True), Variable('y'))).count_models(), 2)
+        self.assertRaises(ValueError, Variable('x').count_models, ['y'])
+
+    def test_components(self):
+        # 40 independent clauses over 80 variables, each with 3 models
+        prop = Constant(True)
+        for i in range(40):
+            prop = Conjunction(prop, Disjunction(Variable('a' + str(i)), Variable('b' + str(i))))
+        self.assertEqual(prop.count_models(), 3 ** 40)
+
+    def test_negated_clauses(self):
+        # the negation of 40 clauses over 22 variables is not a clause, and by default is counted with a diagram
+        rng = random.Random(1)
+        names = ['v' + chr(ord('a') + i) for i in range(22)]
+        clauses = Constant(True)
+        for _ in range(40):
+            literals = [Variable(rng.choice(names)) for _ in range(3)]
+            literals = [Negation(literal) if rng.random() < 0.5 else literal for literal in literals]
+            clauses = Conjunction(clauses, Disjunction(Disjunction(literals[0], literals[1]), literals[2]))
+        negated = Negation(clauses)
+        table = TruthTable(negated.get_var_names())
+        table.add_proposition(negated)
+        self.assertEqual(negated.count_models(), bin(table.get_proposition_bitset(negated)).count('1'))
+        self.assertEqual(negated.count_models() + clauses.count_models(), 1 << table.n_vars)
+        self.assertEqual(negated.count_models(engine='bdd'), negated.count_models())
+
+    def test_clause_shapes(self):
+        a, b, c = Variable('a'), Variable('b'), Variable('c')
+        var_ids = {'a': 1, 'b': 2, 'c': 3}
+        self.assertEqual(clause_literals(var_ids, Disjunction(a, Negation(b))), [1, -2])
+        # conditionals and negated conjunctions of literals are clauses too
+        self.assertEqual(clause_literals(var_ids, Conditional(Conjunction(Negation(a), Negation(b)), c)), [1, 2, 3])
+        self.assertEqual(clause_literals(var_ids, Negation(Conjunction(a, Negation(b)))), [-1, 2])
+        self.assertEqual(clause_literals(var_ids, Negation(Negation(a))), [1])
+        self.assertEqual(clause_literals(var_ids, Conditional(a, Constant(False))), [-1])
+        self.assertIs(clause_literals(var_ids, Conditional(Constant(False), a)), True)
+        self.assertIsNone(clause_literals(var_ids, Biconditional(a, b)))
+        self.assertIsNone(clause_literals(var_ids, Negation(Disjunction(a, b))))
+        self.assertIsNone(clause_literals(var_ids, Negation(Conditional(a, b))))
+        self.assertIsNone(clause_literals(var_ids, Conditional(Disjunction(a, b), c)))
+
+    def test_engines(self):
+        rng = random.Random(2)
+        var_names = ['a', 'b', 'c', 'd', 'e']
+        for _ in range(100):
+            prop = Conjunction(random_proposition(rng, var_names, 3), random_proposition(rng, var_names, 3))
+            counts = [count_models(prop, var_names, engine) for engine in ('auto', 'dpll', 'bdd')]
+            self.assertEqual(counts[1:], counts[:1] * 2)
+        self.assertRaises(ValueError, count_models, Variable('x'), None, 'truthtable')
+        self.assertRaises(ValueError, Variable('x').count_models, None, 'truthtable')
+
+    def test_simplified_variables(self):
+        # y simplifies away, but is still counted
+        x, y = Variable('x'), Variable('y')
+        self.assertEqual(Conjunction(x, Disjunction(y, Negation(y))).count_models(), 2)
+        self.assertEqual(Conjunction(x, Disjunction(y, Negation(y))).count_models(['x', 'y', 'z']), 4)
+        self.assertRaises(ValueError, Conjunction(x, Disjunction(y, Negation(y))).count_models, ['x'])
+
+    def test_nested_decisions(self):
+        # each variable of a nested implication is a decision nested in the one before it,
+        # and the counter keeps its decisions on an explicit stack rather than the call stack
+        names = ['v' + chr(ord('a') + i // 26) + chr(ord('a') + i % 26) for i in range(40)]
+        prop = Variable(names[-1])
+        for name in reversed(names[:-1]):
+            prop = Conditional(Variable(name), prop)
+        cnf = to_cnf(prop)
+        counter = ModelCounter(set(cnf.get_var_ids().values()))
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack()) + 50)
+        try:
+            count = counter.count(cnf.clauses, cnf.n_vars)
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertEqual(count, (1 << 40) - 1)
+        self.assertEqual(prop.count_models(), (1 << 40) - 1)
+
+    def test_count_counterexamples(self):
+        p, q = Variable('p'), Variable('q')
+        self.assertEqual(Argument([Conditional(p, q), p], q).count_counterexamples(), 0)
+        # affirming the consequent fails when p is false and q is true
+        self.assertEqual(Argument([Conditional(p, q), q], p).count_counterexamples(), 1)
+        self.assertEqual(Argument([], Conjunction(p, q)).count_counterexamples(), 3)
@@ -43,6 +43,34 @@ class TestParser(unittest.TestCase):
         parsed_prop = parse_proposition('x & ~False <-> true')
         self.assertEqual(str(parsed_prop), str(expected_prop))
 
+    def test_chains(self):
+        a, b, c = Variable("a"), Variable("b"), Variable("c")
+        self.assertIs(parse_proposition('a & b & c'), Conjunction(Conjunction(a, b), c))
+        self.assertIs(parse_proposition('a || b ∨ c'), Disjunction(Disjunction(a, b), c))
+        self.assertIs(parse_proposition('a <-> b <-> c'), Biconditional(Biconditional(a, b), c))
+        # conditionals group to the right
+        self.assertIs(parse_proposition('a -> b -> c'), Conditional(a, Conditional(b, c)))
+        self.assertIs(parse_proposition('~~a & !(b)'), Conjunction(Negation(Negation(a)), Negation(b)))
+
+    def test_invalid(self):
+        for string in ['', 'a &', '& a', 'a b', '(a', 'a)', '()', '~', 'a % b', 'a <- b', 'a1']:
+            self.assertRaises(ValueError, parse_proposition, string)
+
+    def test_large_input(self):
+        # 100k tokens and deep nesting must not recurse
+        names = ['a', 'b', 'c', 'd']
+        string = ' & '.join(names[i % 4] for i in range(50000))
+        prop = parse_proposition(string)
+        depth = 0
+        while isinstance(prop, Conjunction):
+            prop = prop.left_proposition
+            depth += 1
+        self.assertEqual(depth, 49999)
+        prop = parse_proposition('(' * 20000 + 'a' + ')' * 20000)
+        self.assertIs(prop, Variable('a'))
+        prop = parse_proposition('~(' * 20000 + 'a' + ')' * 20000)
+        self.assertIsInstance(prop, Negation)
+
 if __name__ == '__main__':
     unittest.main()
 
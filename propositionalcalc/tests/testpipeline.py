@@ -0,0 +1,114 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from ..pipeline import read_arguments, validate_arguments, validate_file
+from ..__main__ import main
+
+jsonl_input = '''{"id": 1, "premises": ["p -> q", "p"], "conclusion": "q"}
+{"id": 2, "premises": ["p -> q"], "conclusion": "q -> p"}
+
+{"id": 3, "premises": ["p -> "], "conclusion": "q"}
+{"id": 4, "premises": [], "conclusion": "p || ~p"}
+'''
+
+csv_input = '''id,premises,conclusion
+1,p -> q;p,q
+2,p -> q,q -> p
+3,,p || ~p
+'''
+
+class TestPipeline(unittest.TestCase):
+
+    def test_read_arguments(self):
+        records = list(read_arguments(io.StringIO(jsonl_input)))
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0]['premises'], ['p -> q', 'p'])
+        records = list(read_arguments(io.StringIO(csv_input), 'csv'))
+        self.assertEqual([record['premises'] for record in records], [['p -> q', 'p'], ['p -> q'], []])
+        self.assertEqual(records[1]['conclusion'], 'q -> p')
+        self.assertRaises(ValueError, list, read_arguments(io.StringIO(''), 'xml'))
+
+    def test_validate(self):
+        results = list(validate_arguments(read_arguments(io.StringIO(jsonl_input))))
+        self.assertEqual([result['id'] for result in results], [1, 2, 3, 4])
+        self.assertEqual([result['valid'] for result in results], [True, False, None, True])
+        self.assertEqual(results[1]['counterexample'], {'p': False, 'q': True})
+        self.assertIn('error', results[2])
+
+    def test_invalid_records(self):
+        lines = jsonl_input + '{"id": 5, "premises": [\n[1, 2]\n"p"\n{"id": 6, "premises": ["p"], "conclusion": "p"}\n'
+        results = list(validate_arguments(read_arguments(io.StringIO(lines))))
+        # the malformed JSON line and the records which are not objects are errors, the rest still run
+        self.assertEqual([result['valid'] for result in results], [True, False, None, True, None, None, None, True])
+        self.assertIn('line 6', results[4]['error'])
+        self.assertIn('not an object', results[5]['error'])
+        self.assertEqual(results[7]['id'], 6)
+        parallel = list(validate_arguments(read_arguments(io.StringIO(lines)), workers=2, batch_size=3))
+        self.assertEqual(parallel, results)
+
+        # a line nested too deeply for json and a field too long for csv are errors as well
+        lines = '[' * 100000 + '\n{"id": 7, "premises": ["p"], "conclusion": "p"}\n'
+        results = list(validate_arguments(read_arguments(io.StringIO(lines))))
+        self.assertEqual([result['valid'] for result in results], [None, True])
+        self.assertIn('line 1', results[0]['error'])
+        lines = csv_input + '4,' + 'p' * 200000 + ',q\n5,p,p\n'
+        results = list(validate_arguments(read_arguments(io.StringIO(lines), 'csv')))
+        self.assertEqual([result['valid'] for result in results], [True, False, True, None, True])
+        self.assertIn('Invalid CSV', results[3]['error'])
+
+    def test_invalid_fields(self):
+        records = [{'id': 1, 'premises': 'p -> q', 'conclusion': 'q'},
+                   {'id': 2, 'premises': ['p', 3], 'conclusion': 'p'},
+                   {'id': 3, 'conclusion': 'p'},
+                   {'id': 4, 'premises': ['p'], 'conclusion': ['p']},
+                   {'id': 5, 'premises': ['p'], 'conclusion': 'p'}]
+        results = list(validate_arguments(records))
+        self.assertEqual([result['valid'] for result in results], [None, None, None, None, True])
+        self.assertIn('premises of the argument are not a list of strings', results[0]['error'])
+        self.assertIn('premises of the argument are not a list of strings', results[1]['error'])
+        self.assertIn('premises of the argument are not a list of strings', results[2]['error'])
+        self.assertIn('conclusion of the argument is not a string', results[3]['error'])
+
+    def test_workers(self):
+        records = [{'id': i, 'premises': ['p' + 'x' * (i % 7) + ' -> q'], 'conclusion': 'q' if i % 2 else 'r'}
+                   for i in range(250)]
+        serial = list(validate_arguments(records))
+        parallel = list(validate_arguments(records, workers=2, batch_size=7, max_in_flight=3))
+        self.assertEqual(parallel, serial)
+        self.assertEqual([result['id'] for result in parallel], list(range(250)))
+
+    def test_validate_file(self):
+        output = io.StringIO()
+        counts = validate_file(io.StringIO(csv_input), output, 'csv')
+        self.assertEqual(counts, {'valid': 2, 'invalid': 1, 'error': 0})
+        lines = output.getvalue().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], ['1', '2', '3'])
+
+    def test_main(self):
+        directory = tempfile.mkdtemp()
+        input_path = os.path.join(directory, 'args.jsonl')
+        output_path = os.path.join(directory, 'results.jsonl')
+        with open(input_path, 'w') as file:
+            file.write(jsonl_input)
+        try:
+            status = main(['validate', '--input', input_path, '--output', output_path, '--workers', '2'])
+            # the unparsable argument is reported with a non-zero status
+            self.assertEqual(status, 1)
+            with open(output_path) as file:
+                results = [json.loads(line) for line in file]
+            self.assertEqual([result['valid'] for result in results], [True, False, None, True])
+            # the counts are only printed when asked for
+            errors = io.StringIO()
+            with contextlib.redirect_stderr(errors):
+                main(['validate', '--input', input_path, '--output', output_path])
+            self.assertEqual(errors.getvalue(), '')
+            with contextlib.redirect_stderr(errors):
+                main(['validate', '--input', input_path, '--output', output_path, '--summary'])
+            self.assertEqual(errors.getvalue(), '2 valid, 1 invalid, 1 errors\n')
+        finally:
+            os.remove(input_path)
+            os.remove(output_path)
+            os.rmdir(directory)
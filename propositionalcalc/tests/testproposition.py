@@ -1,6 +1,12 @@
+import copy
+import gc
+import pickle
 import unittest
+import weakref
 from ..proposition import Variable, Constant
 from ..logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+from .. import proposition
+from .. import flatast
 
 class TestProposition(unittest.TestCase):
 
@@ -104,6 +110,216 @@ class TestProposition(unittest.TestCase):
         self.assertFalse(prop.evaluate({'x': True, 'y': False}))
         self.assertTrue(prop.evaluate({'x': False, 'y': True}))
         self.assertTrue(prop.evaluate({'x': False, 'y': False}))
-      
+
+    def test_evaluate_batch(self):
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        prop = Conjunction(Biconditional(x, y), Disjunction(Negation(y), Conditional(x, z)))
+        rows = [[x_val, y_val, z_val] for x_val in (True, False) for y_val in (True, False) for z_val in (True, False)]
+        expected = [prop.evaluate({'x': row[0], 'y': row[1], 'z': row[2]}) for row in rows]
+        self.assertEqual(list(prop.evaluate_batch(rows)), expected)
+        # columns follow the given variable order
+        reordered = [[row[2], row[0], row[1]] for row in rows]
+        self.assertEqual(list(prop.evaluate_batch(reordered, ['Z', 'x', 'y'])), expected)
+        self.assertEqual(list(Constant(False).evaluate_batch([[], []])), [False, False])
+
+    def test_evaluate_batch_fallback(self):
+        numpy_module = proposition.np
+        proposition.np = None
+        try:
+            x, y = Variable("x"), Variable("y")
+            prop = Conditional(x, y)
+            rows = [(True, True), (True, False), (False, True), (False, False)]
+            self.assertEqual(prop.evaluate_batch(rows), [True, False, True, True])
+            self.assertRaises(ValueError, prop.evaluate_batch, [(True,)])
+            self.assertEqual(prop.evaluate_batch([]), [])
+            rows = [((i * 7) % 3 == 0, i % 2 == 1) for i in range(3000)]
+            self.assertEqual(prop.evaluate_batch(rows), [prop.evaluate({'x': x_val, 'y': y_val}) for x_val, y_val in rows])
+        finally:
+            proposition.np = numpy_module
+
+    def test_compile(self):
+        x, y = Variable("x"), Variable("y")
+        prop = Conjunction(Biconditional(x, y), Disjunction(Negation(y), Conditional(x, Constant(True))))
+        function = prop.compile(['z', 'Y', 'x'])
+        self.assertIs(function, prop.compile(('z', 'y', 'x')))
+        for x_val in (True, False):
+            for y_val in (True, False):
+                for z_val in (True, False):
+                    expected = prop.evaluate({'x': x_val, 'y': y_val, 'z': z_val})
+                    self.assertEqual(function(z_val, y_val, x_val), expected)
+        self.assertRaises(ValueError, prop.compile, ['x'])
+
+        # shared subformulas are computed once, so a DAG with 2 ** 20 paths compiles to a short function
+        dag = x
+        for i in range(20):
+            dag = Disjunction(Conjunction(dag, y), Conjunction(Negation(y), dag)) if i % 2 else Biconditional(dag, dag)
+        function = dag.compile(['x', 'y'])
+        for x_val in (True, False):
+            for y_val in (True, False):
+                self.assertEqual(function(x_val, y_val), dag.evaluate({'x': x_val, 'y': y_val}))
+
+        # right nested chains are too deep for the python compiler and use the fallback
+        deep = x
+        for i in range(150):
+            deep = Conjunction(y, deep)
+        function = deep.compile(['x', 'y'])
+        self.assertTrue(function(True, True))
+        self.assertFalse(function(False, True))
+
+    def test_bind(self):
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        prop = Conjunction(Biconditional(x, y), Disjunction(Negation(y), Conditional(x, z)))
+        bound = prop.bind(['z', 'Y', 'x'])
+        self.assertIs(bound, prop.bind(('z', 'y', 'x')))
+        self.assertEqual(bound.var_order, ('z', 'y', 'x'))
+        self.assertEqual(prop.bind().var_order, ('x', 'y', 'z'))
+        for x_val in (True, False):
+            for y_val in (True, False):
+                for z_val in (True, False):
+                    expected = (x_val == y_val) and (not y_val or (not x_val or z_val))
+                    self.assertEqual(bound.evaluate((z_val, y_val, x_val)), expected)
+                    self.assertEqual(bound.evaluate([z_val, y_val, x_val]), expected)
+                    self.assertEqual(prop.evaluate({'X': x_val, 'y': y_val, 'z': z_val, 'w': True}), expected)
+        # bitset columns for the rows z y x = TTT, FTT, TFF, FFF
+        self.assertEqual(bound.evaluate_bitwise([0b0101, 0b0011, 0b0011], 0b1111), 0b1101)
+        self.assertRaises(ValueError, prop.bind, ['x', 'y'])
+        self.assertRaises(ValueError, bound.evaluate, (True, True))
+        self.assertRaises(ValueError, prop.evaluate, {'x': True, 'y': True})
+
+        # binding does not recurse, so it works on trees too deep to evaluate recursively
+        deep = x
+        for i in range(5000):
+            deep = Negation(deep)
+        self.assertTrue(deep.evaluate({'x': True}))
+        self.assertFalse(deep.bind(['x']).evaluate([False]))
+
+        # bound programs keep their variable names to themselves
+        names = list(flatast.default_variable_table.names)
+        Conjunction(Variable("bound_only"), x).bind()
+        self.assertEqual(flatast.default_variable_table.names, names)
+
+    def test_truthy_values(self):
+        # values are taken as booleans, like the connectives they are combined with
+        x, y = Variable("x"), Variable("y")
+        self.assertIs(Conjunction(x, y).evaluate({'x': 1, 'y': 2}), True)
+        self.assertIs(Biconditional(x, y).evaluate({'x': 1, 'y': 2}), True)
+        self.assertIs(Disjunction(x, y).evaluate({'x': None, 'y': 0}), False)
+        self.assertIs(Negation(x).evaluate({'x': None}), True)
+        self.assertIs(Conditional(x, y).evaluate({'x': 'yes', 'y': ''}), False)
+        self.assertIs(Biconditional(x, y).bind().evaluate([3, None]), False)
+        self.assertIs(flatast.FlatProposition.from_proposition(Biconditional(x, y)).evaluate({'x': 1, 'y': 2}), True)
+
+    def test_cached_properties(self):
+        x, y = Variable("x"), Variable("y")
+        shared = Negation(x)
+        prop = Biconditional(Conjunction(shared, y), shared)
+        self.assertEqual(prop.get_var_names(), frozenset({'x', 'y'}))
+        self.assertIsInstance(prop.get_var_names(), frozenset)
+        self.assertIs(prop.get_var_names(), prop.get_var_names())
+        self.assertEqual(Constant(True).get_var_names(), frozenset())
+        self.assertEqual(str(prop), "((¬x∧y)↔¬x)")
+        self.assertIs(str(prop), str(prop))
+        self.assertEqual(prop.get_depth(), 4)
+        self.assertEqual(prop.get_size(), 7)
+        self.assertEqual(shared.get_size(), 2)
+        self.assertEqual(x.get_depth(), 1)
+
+        # long chains are handled without recursion
+        chain = x
+        for i in range(5000):
+            chain = Conjunction(y, chain)
+        self.assertEqual(str(chain), "(y∧" * 5000 + "x" + ")" * 5000)
+        self.assertEqual(chain.get_var_names(), {'x', 'y'})
+        self.assertEqual(chain.get_depth(), 5001)
+        self.assertEqual(chain.get_size(), 10001)
+
+        # the strings, variable names, bound programs and functions are kept in weak tables,
+        # not on the nodes, and an entry dies with its proposition
+        self.assertFalse(hasattr(prop, '_str'))
+        node = Disjunction(x, Variable('fresh'))
+        str(node)
+        node.get_var_names()
+        node.bind()
+        node.compile(['x', 'fresh'])
+        tables = (proposition.str_cache, proposition.var_names_cache,
+                  proposition.bound_cache, proposition.compiled_cache)
+        for table in tables:
+            self.assertIn(node, table)
+        ref = weakref.ref(node)
+        del node
+        gc.collect()
+        self.assertIsNone(ref())
+        for table in tables:
+            self.assertNotIn(Disjunction(x, Variable('fresh')), table)
+        self.assertEqual(str(prop), "((¬x∧y)↔¬x)")
+        self.assertEqual(prop.get_var_names(), frozenset({'x', 'y'}))
+
+    def test_deep(self):
+        # every traversal uses an explicit stack, so trees far deeper than the recursion limit work
+        x, y, z = Variable("x"), Variable("y"), Variable("z")
+        deep = z
+        for i in range(20000):
+            deep = Conditional(y, Negation(deep)) if i % 2 else Disjunction(Conjunction(deep, x), Negation(x))
+        expected = [deep.evaluate({'x': x_val, 'y': y_val, 'z': z_val})
+                    for x_val in (False, True) for y_val in (False, True) for z_val in (False, True)]
+        self.assertEqual(deep.get_truth_table().get_proposition_col(deep), expected)
+        self.assertEqual(deep.get_truth_table('bdd').get_proposition_col(deep), expected)
+        self.assertEqual(deep.compile(['x', 'y', 'z'])(True, False, True), expected[5])
+        self.assertTrue(deep.is_satisfiable('sat'))
+        self.assertEqual(deep.is_tautology('bdd'), all(expected))
+        self.assertEqual(str(deep).count("→"), 10000)
+        self.assertEqual(deep.get_var_names(), {'x', 'y', 'z'})
+        self.assertIs(pickle.loads(pickle.dumps(deep)), deep)
+        self.assertIs(copy.deepcopy(deep), deep)
+
+    def test_immutable(self):
+        x = Variable("x")
+        prop = Conjunction(x, Negation(x))
+        with self.assertRaises(AttributeError):
+            x.name = "y"
+        with self.assertRaises(AttributeError):
+            prop.left_proposition = Variable("z")
+        with self.assertRaises(AttributeError):
+            Negation(x).proposition = x
+        with self.assertRaises(AttributeError):
+            del Constant(True).value
+        self.assertEqual(x.name, "x")
+
+    def test_decisions(self):
+        x, y = Variable("x"), Variable("y")
+        for engine in ('sat', 'bdd'):
+            self.assertTrue(Disjunction(x, Negation(x)).is_tautology(engine))
+            self.assertFalse(Disjunction(x, y).is_tautology(engine))
+            self.assertTrue(Conjunction(x, y).is_satisfiable(engine))
+            self.assertFalse(Conjunction(x, Negation(x)).is_satisfiable(engine))
+            self.assertTrue(Constant(True).is_tautology(engine))
+            self.assertFalse(Constant(False).is_satisfiable(engine))
+            # De Morgan's law
+            self.assertTrue(Negation(Conjunction(x, y)).is_equivalent(Disjunction(Negation(x), Negation(y)), engine))
+            self.assertTrue(Conditional(x, y).is_equivalent(Disjunction(Negation(x), y), engine))
+            self.assertFalse(Conditional(x, y).is_equivalent(Conditional(y, x), engine))
+            self.assertFalse(x.is_equivalent(y, engine))
+        # only one of 2 ** 40 assignments satisfies this, so the exact engine decides it
+        prop = x
+        for i in range(40):
+            prop = Conjunction(prop, Variable("v" + chr(ord('a') + i // 26) + chr(ord('a') + i % 26)))
+        self.assertTrue(prop.is_satisfiable())
+        self.assertFalse(Conjunction(prop, Negation(x)).is_satisfiable())
+        self.assertRaises(ValueError, x.is_satisfiable, 'truthtable')
+
+    def test_interning(self):
+        self.assertIs(Variable("x"), Variable("X"))
+        self.assertIs(Constant(1), Constant(True))
+        self.assertIsNot(Constant(True), Constant(False))
+        prop = Conjunction(Variable("a"), Negation(Variable("b")))
+        same = Conjunction(Variable("A"), Negation(Variable("b")))
+        self.assertIs(prop, same)
+        self.assertEqual(hash(prop), hash(same))
+        self.assertIsNot(prop, Disjunction(Variable("a"), Negation(Variable("b"))))
+        self.assertIsNot(prop, Conjunction(Negation(Variable("b")), Variable("a")))
+        self.assertEqual(len({prop, same, Variable("a")}), 2)
+        self.assertIs(copy.deepcopy(prop), prop)
+        self.assertIs(pickle.loads(pickle.dumps(prop)), prop)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
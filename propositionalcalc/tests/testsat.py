@@ -0,0 +1,66 @@
+import itertools
+import random
+import unittest
+from ..sat import SATSolver, luby
+
+def brute_force_satisfiable(n_vars, clauses):
+    for values in itertools.product([False, True], repeat=n_vars):
+        if all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in clauses):
+            return True
+    return False
+
+class TestSAT(unittest.TestCase):
+
+    def test_luby(self):
+        self.assertEqual([luby(i) for i in range(15)], [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8])
+
+    def test_random_cnf(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            n_vars = rng.randint(1, 8)
+            clauses = [[rng.choice([-1, 1]) * rng.randint(1, n_vars) for _ in range(rng.randint(1, 3))]
+                       for _ in range(rng.randint(1, 40))]
+            solver = SATSolver()
+            # restart often so restarts and learnt clause removal are exercised
+            solver.restart_base = 1
+            solver.max_learnts = 2
+            for _ in range(n_vars):
+                solver.new_var()
+            for clause in clauses:
+                solver.add_clause(clause)
+            satisfiable = solver.solve()
+            self.assertEqual(satisfiable, brute_force_satisfiable(n_vars, clauses))
+            if satisfiable:
+                model = solver.get_model()
+                for clause in clauses:
+                    self.assertTrue(any(model[abs(lit)] == (lit > 0) for lit in clause))
+
+    def test_pigeonhole(self):
+        # 6 pigeons do not fit in 5 holes
+        solver = SATSolver()
+        holes = 5
+        var = {(i, j): solver.new_var() for i in range(holes + 1) for j in range(holes)}
+        for i in range(holes + 1):
+            solver.add_clause([var[i, j] for j in range(holes)])
+        for j in range(holes):
+            for a, b in itertools.combinations(range(holes + 1), 2):
+                solver.add_clause([-var[a, j], -var[b, j]])
+        self.assertFalse(solver.solve())
+        self.assertIsNone(solver.get_model())
+
+    def test_assumptions(self):
+        solver = SATSolver()
+        a, b, c = solver.new_var(), solver.new_var(), solver.new_var()
+        solver.add_clause([-a, b])
+        solver.add_clause([-b, c])
+        self.assertFalse(solver.solve([a, -c]))
+        # assumptions only hold for a single call
+        self.assertTrue(solver.solve([a]))
+        self.assertTrue(solver.get_model()[c])
+        solver.add_clause([-c])
+        self.assertFalse(solver.solve([a]))
+        self.assertTrue(solver.solve())
+        self.assertRaises(ValueError, solver.add_clause, [4])
+
+if __name__ == '__main__':
+    unittest.main()
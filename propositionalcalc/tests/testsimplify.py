@@ -0,0 +1,87 @@
+import random
+import unittest
+from ..proposition import Variable, Constant
+from ..logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
+from ..argument import Argument
+from ..propositionparser import parse_proposition as parse
+from ..truthtable import TruthTable
+
+def random_proposition(rng, var_names, depth):
+    if depth == 0 or rng.random() < 0.2:
+        choice = rng.random()
+        if choice < 0.15:
+            return Constant(rng.random() < 0.5)
+        return Variable(rng.choice(var_names))
+    if rng.random() < 0.25:
+        return Negation(random_proposition(rng, var_names, depth - 1))
+    connective = rng.choice([Conjunction, Disjunction, Conditional, Biconditional])
+    return connective(random_proposition(rng, var_names, depth - 1), random_proposition(rng, var_names, depth - 1))
+
+class TestSimplify(unittest.TestCase):
+
+    def assertSimplifies(self, string, expected):
+        self.assertIs(parse(string).simplify(), parse(expected))
+
+    def test_laws(self):
+        # constant folding
+        self.assertSimplifies('true & x', 'x')
+        self.assertSimplifies('x || false', 'x')
+        self.assertSimplifies('x & false', 'false')
+        self.assertSimplifies('~true', 'false')
+        self.assertSimplifies('false -> x', 'true')
+        self.assertSimplifies('x -> false', '~x')
+        self.assertSimplifies('false <-> x', '~x')
+        # double negation
+        self.assertSimplifies('~~x', 'x')
+        self.assertSimplifies('~~~x', '~x')
+        # idempotence and flattening
+        self.assertSimplifies('x & (y & x) & y', 'x & y')
+        self.assertSimplifies('(x || y) || (z || x)', 'x || y || z')
+        # complement
+        self.assertSimplifies('x & y & ~x', 'false')
+        self.assertSimplifies('~y || x || y', 'true')
+        self.assertSimplifies('x <-> ~x', 'false')
+        self.assertSimplifies('x -> x', 'true')
+        # absorption
+        self.assertSimplifies('x & (y || x)', 'x')
+        self.assertSimplifies('(x & y) || x', 'x')
+        # nothing to simplify
+        self.assertSimplifies('x -> (y <-> z)', 'x -> (y <-> z)')
+
+    def test_fixpoint(self):
+        # the conditional becomes a double negation, which is removed in turn
+        self.assertSimplifies('~x -> false', 'x')
+        self.assertSimplifies('(~~x & true) <-> (x || false)', 'true')
+        prop = parse('((a & true) || (b & ~~b)) & ~~(c || false)')
+        self.assertIs(prop.simplify(), prop.simplify().simplify())
+
+    def test_random(self):
+        rng = random.Random(0)
+        var_names = ['a', 'b', 'c', 'd']
+        for _ in range(300):
+            prop = random_proposition(rng, var_names, 5)
+            simplified = prop.simplify()
+            self.assertTrue(simplified.get_var_names().issubset(prop.get_var_names()))
+            table = TruthTable(var_names)
+            for i in range(table.n_rows):
+                row = table.get_row(i)
+                self.assertEqual(simplified.evaluate(row), prop.evaluate(row))
+
+    def test_variables(self):
+        prop = parse('(x || ~x) & (y -> y) & z')
+        self.assertEqual(prop.get_var_names(), {'x', 'y', 'z'})
+        self.assertEqual(prop.simplify().get_var_names(), {'z'})
+        # the argument still reports every variable in its counterexample
+        argument = Argument([prop], parse('~z'))
+        counterexample = argument.get_counterexample('truthtable')
+        self.assertEqual(set(counterexample), {'x', 'y', 'z'})
+        self.assertTrue(counterexample['z'])
+        for engine in Argument.engines:
+            self.assertFalse(argument.is_valid(engine))
+        self.assertEqual(argument.count_counterexamples(), 4)
+
+    def test_deep(self):
+        prop = Variable('x')
+        for i in range(5000):
+            prop = Negation(Conjunction(Constant(True), prop))
+        self.assertIs(prop.simplify(), Variable('x'))
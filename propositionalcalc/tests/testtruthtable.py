@@ -1,5 +1,6 @@
 import unittest
 from ..truthtable import TruthTable
+from .. import instrumentation
 from ..proposition import Variable
 from ..logicalconnective import Negation, Conjunction, Disjunction, Conditional, Biconditional
 
@@ -20,6 +21,15 @@ class TestTruthTable(unittest.TestCase):
             row_set.add(row_tuple)
         self.assertEqual(len(row_set), 8)
 
+        # variable names are case insensitive, like the variables of propositions
+        tt = TruthTable(['X', 'y', 'x'])
+        self.assertEqual(tt.n_vars, 2)
+        self.assertEqual(tt.var_names_list, ['x', 'y'])
+        tt.add_proposition(Conjunction(Variable('X'), y))
+        self.assertEqual(tt.get_proposition_col(Conjunction(x, y)), [False, False, False, True])
+        for streaming in (False, True):
+            self.assertEqual(TruthTable(['X', 'Y'], streaming=streaming).get_row(1), {'x': False, 'y': True})
+
     def test_add_proposition(self):
         x, y, z = Variable('x'), Variable('y'), Variable('z')
         tt = TruthTable([x.name, y.name, z.name])
@@ -30,6 +40,9 @@ class TestTruthTable(unittest.TestCase):
         prop_col = tt.get_proposition_col(prop)
         for i in range(len(x_col)):
             self.assertTrue(prop_col[i] == (x_col[i] and y_col[i]))
+        # columns are keyed by the interned proposition
+        self.assertEqual(tt.get_proposition_col(Conjunction(Variable('x'), Variable('y'))), prop_col)
+        self.assertRaises(ValueError, tt.get_proposition_col, Disjunction(x, y))
 
     def test_get_truth_table(self):
         x, y = Variable('x'), Variable('y')
@@ -38,7 +51,105 @@ class TestTruthTable(unittest.TestCase):
         prop_col = tt.get_proposition_col(always_true)
         for truth_val in prop_col:
             self.assertTrue(truth_val)
-        
+
+    def test_bitset_columns(self):
+        x, y = Variable('x'), Variable('y')
+        tt = TruthTable([y.name, x.name])
+        # the first variable in sorted order is the most significant bit of the row index
+        self.assertEqual(tt.get_proposition_col(x), [False, False, True, True])
+        self.assertEqual(tt.get_proposition_col(y), [False, True, False, True])
+        props = [Negation(x), Conjunction(x, y), Disjunction(x, y), Conditional(x, y), Biconditional(x, y)]
+        for prop in props:
+            tt.add_proposition(prop)
+            expected = [prop.evaluate({'x': x_val, 'y': y_val})
+                        for x_val, y_val in zip(tt.get_proposition_col(x), tt.get_proposition_col(y))]
+            self.assertEqual(tt.get_proposition_col(prop), expected)
+
+    def test_wide_table(self):
+        names = ['v' + chr(ord('a') + i) for i in range(20)]
+        tt = TruthTable(names)
+        prop = Variable(names[0])
+        for name in names[1:]:
+            prop = Disjunction(prop, Variable(name))
+        tt.add_proposition(prop)
+        # only the row where every variable is false fails the disjunction
+        self.assertEqual(tt.get_proposition_bitset(prop), tt.mask ^ 1)
+
+    def test_streaming(self):
+        x, y, z = Variable('x'), Variable('y'), Variable('z')
+        props = [Conjunction(x, y), Conditional(Negation(z), Biconditional(x, y))]
+        full = TruthTable(['x', 'y', 'z'])
+        streaming = TruthTable(['x', 'y', 'z'], streaming=True)
+        for prop in props:
+            full.add_proposition(prop)
+            streaming.add_proposition(prop, 'bdd')
+        self.assertEqual(streaming.prop_columns, {})
+        for prop in props:
+            self.assertEqual(streaming.get_proposition_col(prop), full.get_proposition_col(prop))
+        self.assertEqual(list(streaming.iter_rows(chunk_bits=1)), list(full.iter_rows()))
+        rows = list(full.iter_rows(chunk_bits=2))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[3], {x: False, y: True, z: True, props[0]: False, props[1]: True})
+        self.assertEqual(str(streaming), str(full))
+
+    def test_streaming_wide(self):
+        # a 30 variable table would need 2 ** 30 rows if it was stored
+        names = ['v' + chr(ord('a') + i) for i in range(30)]
+        tt = TruthTable(names, streaming=True)
+        prop = Variable(names[0])
+        for name in names[1:]:
+            prop = Conjunction(prop, Variable(name))
+        tt.add_proposition(prop)
+        start, size, columns = next(tt.iter_chunks(chunk_bits=10))
+        self.assertEqual((start, size, columns[prop]), (0, 1024, 0))
+        rows = tt.iter_rows(chunk_bits=4)
+        self.assertEqual(next(rows)[Variable(names[-1])], False)
+        self.assertEqual(next(rows)[Variable(names[-1])], True)
+
+    def test_shared_subformulas(self):
+        movie, hiking, tennis, swim = Variable('movie'), Variable('hiking'), Variable('tennis'), Variable('swim')
+        guard = Negation(Disjunction(movie, hiking))
+        props = [Conditional(guard, tennis), Conjunction(guard, swim), Disjunction(guard, Negation(tennis)),
+                 Biconditional(guard, Conjunction(tennis, swim))]
+        names = ['movie', 'hiking', 'tennis', 'swim']
+        with instrumentation.enabled() as stats:
+            tt = TruthTable(names)
+            tt.add_propositions(props)
+        # the guard and the variables are computed once for all four propositions
+        self.assertEqual(stats.snapshot()['node_evaluations'],
+                         {'Variable': 4, 'Disjunction': 2, 'Negation': 2, 'Conditional': 1,
+                          'Conjunction': 2, 'Biconditional': 1})
+        streaming = TruthTable(names, streaming=True)
+        streaming.add_propositions(props)
+        for prop in props:
+            expected = TruthTable(names)
+            expected.add_proposition(prop)
+            self.assertEqual(tt.get_proposition_bitset(prop), expected.get_proposition_bitset(prop))
+            self.assertEqual(streaming.get_proposition_bitset(prop), expected.get_proposition_bitset(prop))
+
+    def test_gray_rows(self):
+        x, y, z = Variable('x'), Variable('y'), Variable('z')
+        props = [Conjunction(x, y), Conditional(Negation(z), Biconditional(x, y)), Disjunction(z, Negation(z))]
+        tt = TruthTable(['x', 'y', 'z'])
+        tt.add_propositions(props)
+        rows = list(tt.iter_rows())
+        gray_rows = list(tt.iter_gray_rows())
+        self.assertEqual([i for i, row in gray_rows], [0, 1, 3, 2, 6, 7, 5, 4])
+        for i, row in gray_rows:
+            self.assertEqual(row, rows[i])
+
+    def test_workers(self):
+        names = ['a', 'b', 'c', 'd', 'e', 'f']
+        props = [Conjunction(Variable('a'), Negation(Variable('f'))),
+                 Biconditional(Disjunction(Variable('b'), Variable('c')), Conditional(Variable('d'), Variable('e')))]
+        serial = TruthTable(names)
+        parallel = TruthTable(names, workers=2)
+        serial.add_propositions(props)
+        parallel.add_propositions(props, 'bdd')
+        for prop in props:
+            self.assertEqual(parallel.get_proposition_bitset(prop), serial.get_proposition_bitset(prop))
+        self.assertEqual(parallel.slices(2), [(i * 8, i * 8 + 8) for i in range(8)])
+        self.assertEqual(TruthTable(['a']).slices(4), [(0, 1), (1, 2)])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+from ..unionfind import DisjointSets
+
+class TestUnionFind(unittest.TestCase):
+
+    def test_union(self):
+        sets = DisjointSets()
+        self.assertIsNone(sets.union([]))
+        root = sets.union(['a', 'b'])
+        self.assertEqual(sets.find('a'), sets.find('b'))
+        sets.union(['c', 'd'])
+        self.assertNotEqual(sets.find('a'), sets.find('c'))
+        self.assertIn('d', sets)
+        self.assertNotIn('e', sets)
+        # b and c join the two sets
+        merged = sets.union(['e', 'b', 'c'])
+        self.assertEqual({sets.find(item) for item in 'abcde'}, {merged})
+        self.assertEqual(sets.find(root), merged)
+        sets.union(['f'])
+        self.assertEqual(sorted(map(sorted, sets.sets().values())), [['a', 'b', 'c', 'd', 'e'], ['f']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,41 +1,358 @@
+from concurrent.futures import ProcessPoolExecutor
+from . import instrumentation
+
 class TruthTable:
-    """ A class representing truth tables for propositions. """
+    """ A class representing truth tables for propositions.
+
+    The table is stored column by column. Every column is packed into a single
+    arbitrary-width int used as a bitset, where bit i holds the truth value of row i.
+    Proposition columns are keyed by the interned proposition itself.
+
+    A streaming table does not store any columns. Its rows are generated on demand,
+    in chunks of consecutive rows, so memory stays proportional to the chunk size.
+
+    With workers, columns are computed in a process pool. The rows are split into
+    slices by fixing the values of the first variables, and the bitset slice computed
+    for each one is shifted into place.
+    """
 
-    def __init__(self, variable_names):
-        """ Creates a truth table with a column for each unique variable name. """
-        self.var_names = set(variable_names)
+    # default number of row index bits in a chunk, so a chunk holds 2 ** 16 rows
+    default_chunk_bits = 16
+
+    def __init__(self, variable_names, streaming = False, workers = None):
+        """ Creates a truth table with a column for each unique variable name.
+        Params
+        ------
+        variable_names: the names of the variables in the table. Like variables of
+                        propositions, they are case insensitive and stored in lowercase.
+        streaming: if True, columns are computed chunk by chunk when rows are iterated
+                   instead of being stored for all 2 ** n rows.
+        workers: the number of processes used to compute the columns of added propositions.
+                 Defaults to computing them in this process.
+        """
+        self.var_names = set(name.lower() for name in variable_names)
         self.var_names_list = sorted(list(self.var_names))
         self.n_vars = len(self.var_names)
         self.n_rows = 2 ** self.n_vars
+        self.streaming = streaming
+        self.workers = workers
+        # bitset with a 1 in every row, used to complement columns
+        self.mask = (1 << self.n_rows) - 1
+
+        # imported here because the proposition module depends on this module
+        from .proposition import Variable
+
+        # the propositions in the table, starting with the variables, in column order
+        self.propositions = [Variable(var) for var in self.var_names_list]
+        # function computing the bitset column of each proposition from variable columns
+        self.evaluators = {prop: prop.evaluate_bitwise for prop in self.propositions}
+        # (simplified propositions, BoundPropositions) last built by _shared_program
+        self.shared_program = None
+
+        # Initialize the truth table as a dictionary of bitset columns for each variable name
+        # The first variable is the most significant bit of the row index
+        self.columns = {}
+        # bitset column of each proposition in the table
+        self.prop_columns = {}
+        if not streaming:
+            for i, var in enumerate(self.var_names_list):
+                self.columns[var] = variable_column(self.n_vars - 1 - i, self.n_rows)
+            for prop in self.propositions:
+                self.prop_columns[prop] = self.columns[prop.name]
+            if instrumentation.active is not None:
+                instrumentation.active.record_columns(self.n_vars, self.n_rows)
 
-        # Initialize the truth table as a list of dictionaries
-        self.truth_table = []
-
-        for i in range(self.n_rows):
-            row = {}
-            flags = format(i, '0' + str(self.n_vars) + 'b')
-            for var, bit in zip(variable_names, flags):
-                row[var] = bit == '1'
-            self.truth_table.append(row)
-
-    def add_proposition(self, prop):
-        """ Adds a column for a proposition to the truth table. """
-        prop_vars = prop.get_var_names()
-        if not prop_vars.issubset(self.var_names):
-            raise ValueError("Variables in the proposition must be in the table.")
-        
-        if str(prop) in self.truth_table[0]:
+    def add_proposition(self, prop, engine = 'bitwise'):
+        """ Adds a column for a proposition to the truth table.
+        A streaming table only records the proposition, its values are computed during iteration.
+        Params
+        ------
+        prop: the proposition to add.
+        engine: 'bitwise' to evaluate the proposition tree on whole columns, or 'bdd' to
+                build a binary decision diagram first and evaluate its nodes on whole columns,
+                which is faster for large propositions with a compact diagram.
+        """
+        self.add_propositions([prop], engine)
+
+    def add_propositions(self, props, engine = 'bitwise'):
+        """ Adds a column for each proposition in a list to the truth table.
+        With workers, all the new columns are computed by a single process pool.
+        """
+        new_props = []
+        for prop in props:
+            prop_vars = prop.get_var_names()
+            if not prop_vars.issubset(self.var_names):
+                raise ValueError("Variables in the proposition must be in the table.")
+            if prop not in self.evaluators and prop not in new_props:
+                new_props.append(prop)
+
+        evaluators = [self._make_evaluator(prop, engine) for prop in new_props]
+        for prop, evaluator in zip(new_props, evaluators):
+            self.propositions.append(prop)
+            self.evaluators[prop] = evaluator
+        if self.streaming or not new_props:
             return
+        if self.workers is None or self.workers <= 1:
+            self.prop_columns.update(self._evaluate(new_props, self.columns, self.mask))
+            if instrumentation.active is not None:
+                self._record(new_props, self.n_rows)
+            return
+
+        cols = [0] * len(new_props)
+        with ProcessPoolExecutor(self.workers) as pool:
+            futures = [(start, pool.submit(evaluate_slice, self.var_names_list, new_props, engine, start, stop))
+                       for start, stop in self.slices(self.workers)]
+            for start, future in futures:
+                for i, col in enumerate(future.result()):
+                    cols[i] |= col << start
+        for prop, col in zip(new_props, cols):
+            self.prop_columns[prop] = col
+        if instrumentation.active is not None:
+            # the workers evaluate each proposition once per chunk of their slice
+            chunk_size = 1 << TruthTable.default_chunk_bits
+            times = sum(max((stop - start) // chunk_size, 1) for start, stop in self.slices(self.workers))
+            self._record(new_props, self.n_rows, times)
+
+    def _record(self, props, n_rows, times = 1):
+        """ Records the columns of propositions computed for n_rows rows in the active stats.
+        Params
+        ------
+        times: the number of times each proposition was evaluated to compute the columns.
+        """
+        stats = instrumentation.active
+        stats.record_columns(len(props), n_rows)
+        program = self._shared_program(props)
+        if program is not None:
+            stats.record_evaluations(program.node_counts(), times)
+
+    def _shared_program(self, props):
+        """ Returns the BoundPropositions evaluating the propositions which use the bitwise engine
+        together, or None if none of them do. The last one returned is cached.
+        """
+        # only the bitwise engine evaluates a proposition, the one its evaluator is bound to
+        evaluated = []
+        for prop in props:
+            simplified = getattr(self.evaluators[prop], '__self__', None)
+            if simplified is not None:
+                evaluated.append(simplified)
+        if not evaluated:
+            return None
+        key = tuple(evaluated)
+        if self.shared_program is None or self.shared_program[0] != key:
+            # imported here because the flatast module depends on the proposition classes
+            from .flatast import bind_all
+            self.shared_program = (key, bind_all(evaluated, self.var_names_list))
+        return self.shared_program[1]
+
+    def _evaluate(self, props, columns, mask):
+        """ Computes the bitset columns of propositions from variable columns.
+        Propositions using the bitwise engine are evaluated by one program, where each
+        subformula they share is computed once for all of them.
+        Returns
+        -------
+        cols: a dictionary with the column of each proposition, in the order of props.
+        """
+        cols = {}
+        shared = []
+        for prop in props:
+            if hasattr(self.evaluators[prop], '__self__'):
+                shared.append(prop)
+            else:
+                cols[prop] = self.evaluators[prop](columns, mask)
+        if shared:
+            program = self._shared_program(shared)
+            try:
+                var_cols = [columns[name] for name in self.var_names_list]
+            except KeyError as error:
+                raise ValueError("Parameter columns does not contain value for variable ", error.args[0])
+            cols.update(zip(shared, program.evaluate_bitwise(var_cols, mask)))
+        # in the order of props, which is the column order of the rows
+        return {prop: cols[prop] for prop in props}
 
-        for row in self.truth_table:
-            row[str(prop)] = prop.evaluate(row)
+    def _make_evaluator(self, prop, engine):
+        """ Returns a function computing the bitset column of a proposition from variable columns. """
+        if engine == 'bitwise':
+            # the column of the simplified proposition is the same, with less work
+            return prop.simplify().evaluate_bitwise
+        elif engine == 'bdd':
+            # imported here because the bdd module depends on the proposition classes
+            from .bdd import BDD
+            bdd = BDD(self.var_names_list)
+            node = bdd.from_proposition(prop)
+
+            def evaluator(columns, mask):
+                return bdd.to_bitset(node, columns, mask)
+            return evaluator
+        else:
+            raise ValueError("Unknown engine ", engine)
+
+    def slices(self, workers):
+        """ Splits the rows into ranges for a number of workers by fixing the first variables.
+        There are a few more slices than workers so uneven slices balance out.
+        Returns
+        -------
+        slices: a list of (start, stop) row ranges, each with 2 ** k rows for some k.
+        """
+        prefix_bits = min(max(workers * 4 - 1, 0).bit_length(), self.n_vars)
+        size = self.n_rows >> prefix_bits
+        return [(start, start + size) for start in range(0, self.n_rows, size)]
+
+    def get_proposition_bitset(self, prop):
+        """ Gets the bitset representing the column of values for a given proposition.
+        For a streaming table, the column is assembled from every chunk.
+        """
+        if prop not in self.evaluators:
+            raise ValueError("The proposition has not been added to the table.")
+        if not self.streaming:
+            return self.prop_columns[prop]
+        col = 0
+        for start, size, chunk_columns in self.iter_chunks():
+            col |= chunk_columns[prop] << start
+        return col
 
     def get_proposition_col(self, prop):
         """ Gets a list representing the column of values for a given proposition. """
-        return [row[str(prop)] for row in self.truth_table]
+        bits = self._column_string(self.get_proposition_bitset(prop), self.n_rows)
+        return [bit == '1' for bit in bits]
+
+    def get_row(self, i):
+        """ Gets a dictionary with the value of each variable in row i. """
+        return {var: (i >> (self.n_vars - 1 - j)) & 1 == 1 for j, var in enumerate(self.var_names_list)}
+
+    def iter_chunks(self, chunk_bits = None, start = 0, stop = None):
+        """ Iterates over the table in chunks of consecutive rows.
+        Params
+        ------
+        chunk_bits: each chunk holds 2 ** chunk_bits rows. Defaults to default_chunk_bits.
+        start, stop: the range of rows to iterate over. Both must be multiples of the chunk size.
+        Yields
+        ------
+        start: the index of the first row in the chunk.
+        size: the number of rows in the chunk.
+        columns: a dictionary with a bitset for each proposition, where bit i is row start + i.
+        """
+        if chunk_bits is None:
+            chunk_bits = self.default_chunk_bits
+        chunk_bits = min(chunk_bits, self.n_vars)
+        size = 1 << chunk_bits
+        mask = (1 << size) - 1
+        if stop is None:
+            stop = self.n_rows
+        if start % size or stop % size:
+            raise ValueError("The row range must be a multiple of the chunk size.")
+        if not self.streaming:
+            for chunk_start in range(start, stop, size):
+                yield chunk_start, size, {prop: (col >> chunk_start) & mask for prop, col in self.prop_columns.items()}
+            return
+
+        # variables in the low bits of the row index repeat the same pattern in every chunk
+        low_columns = {}
+        for i, var in enumerate(self.var_names_list):
+            bit = self.n_vars - 1 - i
+            if bit < chunk_bits:
+                low_columns[var] = variable_column(bit, size)
+        for chunk_start in range(start, stop, size):
+            # variables in the high bits of the row index are constant within a chunk
+            columns = {}
+            for i, var in enumerate(self.var_names_list):
+                bit = self.n_vars - 1 - i
+                if bit < chunk_bits:
+                    columns[var] = low_columns[var]
+                else:
+                    columns[var] = mask if (chunk_start >> bit) & 1 else 0
+            if instrumentation.active is not None:
+                self._record(self.propositions, size)
+            yield chunk_start, size, self._evaluate(self.propositions, columns, mask)
+
+    def iter_rows(self, chunk_bits = None):
+        """ Iterates over the rows of the table in order.
+        Yields
+        ------
+        row: a dictionary with the truth value of each proposition in the table,
+             including a Variable for each variable.
+        """
+        for start, size, columns in self.iter_chunks(chunk_bits):
+            props = list(columns)
+            cols = [self._column_string(col, size) for col in columns.values()]
+            for bits in zip(*cols):
+                yield {prop: bit == '1' for prop, bit in zip(props, bits)}
+
+    def iter_gray_rows(self):
+        """ Iterates over the rows of the table in Gray code order, where each row differs
+        from the previous one in the value of a single variable.
+        Each proposition keeps the value of every node, and only the nodes above the flipped
+        variable are recomputed, so a row of a large proposition whose variables each appear
+        in a small part of it costs much less than evaluating the whole proposition.
+        This works the same for streaming tables, as no columns are used.
+        Yields
+        ------
+        i: the index of the row, as used by get_row.
+        row: a dictionary with the truth value of each proposition in the table,
+             including a Variable for each variable.
+        """
+        # imported here because the flatast module depends on the proposition classes
+        from .flatast import IncrementalEvaluator
+        props = self.propositions
+        evaluator = IncrementalEvaluator([prop.simplify() for prop in props], self.var_names_list)
+        gray = 0
+        for step in range(self.n_rows):
+            if step:
+                # the bit flipped from one Gray code to the next is the lowest set bit of the step
+                bit = (step & -step).bit_length() - 1
+                gray ^= 1 << bit
+                evaluator.flip(self.n_vars - 1 - bit)
+            yield gray, dict(zip(props, evaluator.get_values()))
+
+    def iter_lines(self, chunk_bits = None):
+        """ Iterates over the lines of the string representation of the table. """
+        yield ' '.join(str(prop) for prop in self.propositions)
+        for start, size, columns in self.iter_chunks(chunk_bits):
+            cols = [self._column_string(col, size) for col in columns.values()]
+            for bits in zip(*cols):
+                yield ' '.join(['T' if bit == '1' else 'F' for bit in bits])
+
+    def write(self, file, chunk_bits = None):
+        """ Writes the string representation of the table to a text file object line by line. """
+        for line in self.iter_lines(chunk_bits):
+            file.write(line + '\n')
+
+    def _column_string(self, col, n_rows):
+        """ Returns a string of '0' and '1' characters for a column, indexed by row. """
+        return format(col, '0' + str(n_rows) + 'b')[::-1]
 
     def __str__(self):
         # Create a string representation of the truth table
-        header = ' '.join(self.var_names_list) + '\n'
-        rows = [' '.join(['T' if col else 'F' for col in row.values()]) for row in self.truth_table]
-        return header + '\n'.join(rows)
+        return '\n'.join(self.iter_lines())
+
+def evaluate_slice(var_names, props, engine, start, stop):
+    """ Computes the bitset columns of propositions over a range of rows of a table.
+    This runs in a worker process of a parallel truth table.
+    Returns
+    -------
+    cols: a list with the column of each proposition, where bit i is row start + i.
+    """
+    table = TruthTable(var_names, streaming=True)
+    table.add_propositions(props, engine)
+    cols = [0] * len(props)
+    chunk_bits = min(TruthTable.default_chunk_bits, (stop - start).bit_length() - 1)
+    for chunk_start, size, columns in table.iter_chunks(chunk_bits, start, stop):
+        for i, prop in enumerate(props):
+            cols[i] |= columns[prop] << (chunk_start - start)
+    return cols
+
+def variable_column(bit, n_rows):
+    """ Returns the bitset column of a variable stored in the given bit of the row index.
+    Params
+    ------
+    bit: the position of the variable's bit in the row index.
+    n_rows: the number of rows in the table. Must be a power of two greater than 2 ** bit.
+    """
+    half = 1 << bit
+    # one period of the column: 2 ** bit false rows followed by 2 ** bit true rows
+    col = ((1 << half) - 1) << half
+    width = half << 1
+    # repeatedly double the pattern until it fills every row
+    while width < n_rows:
+        col |= col << width
+        width <<= 1
+    return col
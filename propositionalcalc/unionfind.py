@@ -0,0 +1,53 @@
+class DisjointSets:
+    """ Disjoint sets of hashable items, such as variable names, which are merged as
+    items are found to be connected. Each set is identified by its root item, which the
+    other items of the set lead to. Premises, conjuncts and clauses are grouped into
+    independent parts by merging the sets of the variables each one uses.
+    """
+
+    def __init__(self):
+        # the item each item points to, roots point to themselves
+        self.parents = {}
+
+    def __contains__(self, item):
+        return item in self.parents
+
+    def find(self, item):
+        """ Returns the root of the set of an item which was added with union. """
+        parents = self.parents
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+        # later finds go straight to the root
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+        return root
+
+    def union(self, items):
+        """ Merges the sets of the items into one, adding the items which are new.
+        Returns
+        -------
+        root: the root of the merged set, or None if there are no items.
+        """
+        parents = self.parents
+        root = None
+        for item in items:
+            if item not in parents:
+                # new items join the set directly
+                if root is None:
+                    root = item
+                parents[item] = root
+                continue
+            other = self.find(item)
+            if root is None:
+                root = other
+            elif other != root:
+                parents[other] = root
+        return root
+
+    def sets(self):
+        """ Returns a dictionary with the set of items of each root. """
+        sets = {}
+        for item in self.parents:
+            sets.setdefault(self.find(item), set()).add(item)
+        return sets